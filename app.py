@@ -1,34 +1,78 @@
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context, url_for
+from werkzeug.security import safe_join
 import os
+import json
+import uuid
+import shutil
 import logging
-from werkzeug.utils import secure_filename
+import threading
 import sys
+from concurrent.futures import ThreadPoolExecutor, Future
 
 # Add current directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-print(f"📁 Working directory: {current_dir}")
-
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+def configure_logging():
+    """The process' only logging setup: LOG_LEVEL (DEBUG, INFO, WARNING...; default INFO)"""
+    level = getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), None)
+    logging.basicConfig(level=level if isinstance(level, int) else logging.INFO)
+
+configure_logging()
+
+from utils.job_queue import create_job_queue, QueueFullError, JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED
+from utils.media_backend import get_ffmpeg, convert_audio, mux_audio, probe_duration, MediaBackendError
+from utils.speech_segmentation import stitch_transcript
+from utils.asr_backend import warm_recognizer, get_asr_stats
+from utils.subtitles import SUBTITLE_FORMATS, ISO_639_2, SubtitleWriter
+from utils.dubbing import run_dubbing_pipeline, join_segment_audio, joined_translation, segment_warning, used_fallback
+from utils.uploads import spool_upload, save_upload_by_hash, upload_extension
+from utils.result_cache import result_key, get_result_cache
+from utils.file_serving import serve_file
+from utils.packaging import package_hls, MASTER_PLAYLIST
+from utils.time_alignment import align_segment_audio, alignment_enabled
+from utils.media_pool import offload, warm_media_pool, get_media_pool_stats, in_media_worker
+from utils.live_translation import LiveSession, get_live_stats
+from utils.audio_stream import SAMPLE_RATE
+from utils.resumable_upload import (
+    ResumableUploadStore, UploadError, OffsetMismatch, parse_checksum, RECOMMENDED_CHUNK_SIZE
+)
+from utils.warmup import warm_imports, get_warmup_stats
+
 logger = logging.getLogger(__name__)
+logger.debug(f"📁 Working directory: {current_dir}")
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['VIDEO_EXTENSIONS'] = {'mp4', 'avi', 'mov', 'webm', 'mkv', 'flv', 'wmv', 'm4v', 'mpeg'}
 app.config['ALLOWED_EXTENSIONS'] = {'mp3', 'wav', 'ogg', 'mp4', 'avi', 'mov', 'webm', 'flac', 'aac', 'wma', 'm4a', 'mkv', 'flv', 'wmv', 'm4v', 'mpeg'}
 
+# Probe FFmpeg once at startup instead of on every conversion
+get_ffmpeg()
+
+# Media workers re-import this module as __mp_main__ when it is run as a script; only the server warms up
+if __name__ != '__mp_main__' and not in_media_worker():
+    # Load the speech recognition models (ASR_BACKEND) in the background, once per worker
+    warm_recognizer()
+
+    # Import googletrans, speech_recognition and gTTS in the background (STARTUP_WARMUP)
+    warm_imports()
+
 # Supported languages
 LANGUAGES = {
     'hi': 'Hindi', 'ta': 'Tamil', 'te': 'Telugu', 'ml': 'Malayalam',
     'bn': 'Bengali', 'mr': 'Marathi', 'gu': 'Gujarati', 'kn': 'Kannada', 'pa': 'Punjabi'
 }
 
+# Limits for /api/translate/text/batch
+MAX_BATCH_TEXTS = 1000
+MAX_BATCH_CHARS = 100000
+
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -96,24 +140,27 @@ def translate_text_fallback(text, target_lang='hi'):
 # Try to import real translation function
 try:
     from utils.fixed_translation import translate_text
-    print("✅ SUCCESS: Loaded real translation engine from fixed_translation.py")
-    
-    # Test the real translation
-    test_result = translate_text("hello", "hi")
-    print(f"   Test translation: '{test_result}'")
-    
+    from utils.batch_translation import translate_batch, translate_batch_with_fallbacks
 except ImportError as e:
-    print(f"❌ Failed to import fixed_translation: {e}")
-    print("⚠️  Using enhanced fallback translation")
+    logger.error(f"❌ Failed to import fixed_translation: {e}")
+    logger.warning("⚠️ Using enhanced fallback translation")
     translate_text = translate_text_fallback
+    def translate_batch(texts, target_lang='hi'):
+        return [translate_text_fallback(text, target_lang) for text in texts]
+    def translate_batch_with_fallbacks(texts, target_lang='hi'):
+        return translate_batch(texts, target_lang), [True] * len(texts)
 except Exception as e:
-    print(f"❌ Error in fixed_translation: {e}")
-    print("⚠️  Using enhanced fallback translation")
+    logger.error(f"❌ Error in fixed_translation: {e}")
+    logger.warning("⚠️ Using enhanced fallback translation")
     translate_text = translate_text_fallback
+    def translate_batch(texts, target_lang='hi'):
+        return [translate_text_fallback(text, target_lang) for text in texts]
+    def translate_batch_with_fallbacks(texts, target_lang='hi'):
+        return translate_batch(texts, target_lang), [True] * len(texts)
 
 # Enhanced MP3 to WAV conversion function
 def convert_mp3_to_wav(mp3_path, wav_path=None):
-    """Convert MP3 to WAV format with multiple fallback methods"""
+    """Convert MP3 to WAV format in a single FFmpeg pass"""
     try:
         if wav_path is None:
             wav_path = mp3_path.replace('.mp3', '.wav')
@@ -124,95 +171,9 @@ def convert_mp3_to_wav(mp3_path, wav_path=None):
             return wav_path
             
         logger.info(f"🔄 Converting MP3 to WAV: {mp3_path} -> {wav_path}")
-        
-        # Method 1: Try pydub with explicit ffmpeg path
-        try:
-            from pydub import AudioSegment
-            
-            # Try to find ffmpeg in common locations
-            ffmpeg_paths = [
-                'ffmpeg',
-                'C:\\ffmpeg\\bin\\ffmpeg.exe',
-                'C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe',
-                '.\\ffmpeg\\bin\\ffmpeg.exe'
-            ]
-            
-            ffmpeg_found = None
-            for path in ffmpeg_paths:
-                try:
-                    import subprocess
-                    result = subprocess.run([path, '-version'], capture_output=True, timeout=5)
-                    if result.returncode == 0:
-                        ffmpeg_found = path
-                        logger.info(f"✅ Found FFmpeg at: {path}")
-                        break
-                except:
-                    continue
-            
-            if ffmpeg_found:
-                # Set ffmpeg path for pydub
-                AudioSegment.converter = ffmpeg_found
-                audio = AudioSegment.from_mp3(mp3_path)
-                audio.export(wav_path, format="wav")
-                logger.info(f"✅ Successfully converted MP3 to WAV using pydub: {wav_path}")
-                
-                # Verify the file was created
-                if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
-                    return wav_path
-                else:
-                    logger.warning("⚠️ WAV file created but appears empty")
-                    raise Exception("Empty WAV file")
-            else:
-                logger.warning("⚠️ FFmpeg not found in common locations")
-                raise ImportError("FFmpeg not available")
-                
-        except Exception as e:
-            logger.warning(f"⚠️ pydub method failed: {e}")
-            
-        # Method 2: Try moviepy (often works without system FFmpeg)
-        try:
-            from moviepy.editor import AudioFileClip
-            audio = AudioFileClip(mp3_path)
-            audio.write_audiofile(wav_path, verbose=False, logger=None, fps=16000)
-            audio.close()
-            logger.info(f"✅ Successfully converted MP3 to WAV using moviepy: {wav_path}")
-            
-            if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
-                return wav_path
-            else:
-                raise Exception("Empty WAV file from moviepy")
-                
-        except Exception as e:
-            logger.warning(f"⚠️ moviepy method failed: {e}")
-            
-        # Method 3: Use subprocess with ffmpeg directly
-        try:
-            import subprocess
-            
-            # Try to run ffmpeg command directly
-            cmd = [
-                'ffmpeg', '-i', mp3_path, '-acodec', 'pcm_s16le', 
-                '-ar', '16000', '-ac', '1', '-y', wav_path
-            ]
-            
-            # Remove 'ffmpeg' if we found a specific path earlier
-            if ffmpeg_found and ffmpeg_found != 'ffmpeg':
-                cmd[0] = ffmpeg_found
-                
-            result = subprocess.run(cmd, capture_output=True, timeout=30)
-            
-            if result.returncode == 0 and os.path.exists(wav_path):
-                logger.info(f"✅ Successfully converted MP3 to WAV using direct ffmpeg: {wav_path}")
-                return wav_path
-            else:
-                raise Exception(f"FFmpeg failed with return code {result.returncode}")
-                
-        except Exception as e:
-            logger.warning(f"⚠️ Direct ffmpeg method failed: {e}")
-            
-        # Method 4: Ultimate fallback - use online service or return error
-        logger.error("❌ All MP3 conversion methods failed")
-        raise Exception("MP3 to WAV conversion failed. Please install FFmpeg or use WAV files.")
+        convert_audio(mp3_path, wav_path)
+        logger.info(f"✅ Successfully converted MP3 to WAV: {wav_path}")
+        return wav_path
                 
     except Exception as e:
         logger.error(f"❌ MP3 to WAV conversion failed: {e}")
@@ -226,36 +187,13 @@ def convert_mp3_to_wav_deployment(mp3_path, wav_path=None):
             wav_path = mp3_path.replace('.mp3', '.wav')
         
         logger.info(f"🔄 Converting MP3 for deployment: {mp3_path}")
-        
-        # Method 1: Try moviepy first (often works in cloud environments)
-        try:
-            from moviepy.editor import AudioFileClip
-            audio = AudioFileClip(mp3_path)
-            audio.write_audiofile(wav_path, verbose=False, logger=None, fps=16000)
-            audio.close()
-            
-            if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
-                logger.info(f"✅ Converted using moviepy: {wav_path}")
-                return wav_path
-        except Exception as e:
-            logger.warning(f"⚠️ Moviepy failed: {e}")
-        
-        # Method 2: Try pydub if available
-        try:
-            from pydub import AudioSegment
-            audio = AudioSegment.from_mp3(mp3_path)
-            audio.export(wav_path, format="wav")
-            logger.info(f"✅ Converted using pydub: {wav_path}")
-            return wav_path
-        except Exception as e:
-            logger.warning(f"⚠️ Pydub failed: {e}")
-        
-        # Method 3: Try direct file copy as fallback
-        logger.warning("⚠️ Using MP3 file directly (conversion not available)")
-        return mp3_path
+        convert_audio(mp3_path, wav_path)
+        logger.info(f"✅ Converted: {wav_path}")
+        return wav_path
         
     except Exception as e:
         logger.error(f"❌ Deployment MP3 conversion failed: {e}")
+        logger.warning("⚠️ Using MP3 file directly (conversion not available)")
         return mp3_path  # Return original file as fallback
 
 def safe_transcribe_audio_deployment(audio_path):
@@ -308,10 +246,8 @@ try:
         text_to_speech,
         cleanup_temp_files
     )
-    print("✅ SUCCESS: Loaded audio_video_utils")
-    
 except ImportError as e:
-    print(f"❌ Failed to import audio_video_utils: {e}")
+    logger.error(f"❌ Failed to import audio_video_utils: {e}")
     # Create fallback functions
     def extract_audio_from_video(video_path, audio_path):
         logger.info(f"Mock: Extracting audio to {audio_path}")
@@ -340,108 +276,49 @@ except ImportError as e:
             except:
                 pass
 
+# Live microphone translation needs WebSocket support (flask-sock)
 try:
-    from utils.lip_sync import apply_lip_sync
-    print("✅ SUCCESS: Loaded lip_sync")
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+    sock = Sock(app)
 except ImportError as e:
-    print(f"❌ Failed to import lip_sync: {e}")
-    def apply_lip_sync(video_path, audio_path, output_path):
-        logger.info(f"Mock lip-sync: {video_path} -> {output_path}")
-        try:
-            from moviepy.editor import VideoFileClip, AudioFileClip
-            video = VideoFileClip(video_path)
-            audio = AudioFileClip(audio_path)
-            final_video = video.set_audio(audio)
-            final_video.write_videofile(output_path, verbose=False, logger=None)
-            video.close()
-            audio.close()
-            final_video.close()
-            return output_path
-        except:
-            import shutil
-            shutil.copy2(video_path, output_path)
-            return output_path
-
-def apply_lip_sync_deployment(video_path, audio_path, output_path):
-    """Lip-sync optimized for deployment environments"""
+    logger.warning(f"⚠️ flask-sock is not installed, live translation disabled: {e}")
+    sock = None
+
+try:
+    from utils.lip_sync import apply_lip_sync, lip_sync_mode
+except ImportError as e:
+    logger.warning(f"⚠️ Failed to import lip_sync, videos are muxed without it: {e}")
+    apply_lip_sync = None
+    def lip_sync_mode():
+        return 'off'
+
+def apply_lip_sync_deployment(video_path, audio_path, output_path, subtitles_path=None,
+                              burn_subtitles=False, subtitle_language=None, shortest=True):
+    """
+    Lip-sync optimized for deployment environments.
+    Returns output_path, or None when muxing failed (nothing is written)
+    """
     try:
         logger.info(f"🎭 Applying lip-sync in deployment: {video_path} + {audio_path}")
         
-        # Method 1: Try moviepy first
-        try:
-            from moviepy.editor import VideoFileClip, AudioFileClip
-            
-            video = VideoFileClip(video_path)
-            audio = AudioFileClip(audio_path)
-            
-            # Set audio to video
-            final_video = video.set_audio(audio)
-            
-            # Write with deployment-friendly settings
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                audio_codec='aac',
-                verbose=False,
-                logger=None,
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True,
-                threads=1  # Use single thread to avoid memory issues
-            )
-            
-            # Close clips to free memory
-            video.close()
-            audio.close()
-            final_video.close()
-            
-            logger.info(f"✅ Lip-sync successful with moviepy: {output_path}")
-            return output_path
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Moviepy lip-sync failed: {e}")
-        
-        # Method 2: Try direct FFmpeg command
+        # Single FFmpeg pass: copy the video stream, encode only the new audio (and subtitles)
         try:
-            import subprocess
-            
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-i', audio_path,
-                '-c:v', 'copy',  # Copy video stream without re-encoding
-                '-c:a', 'aac',
-                '-map', '0:v:0',
-                '-map', '1:a:0',
-                '-shortest',
-                '-y',  # Overwrite output file
-                output_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0 and os.path.exists(output_path):
-                logger.info(f"✅ Lip-sync successful with FFmpeg: {output_path}")
-                return output_path
-            else:
-                raise Exception(f"FFmpeg failed: {result.stderr}")
-                
-        except Exception as e:
-            logger.warning(f"⚠️ FFmpeg lip-sync failed: {e}")
-        
-        # Method 3: Fallback - copy original video
-        logger.warning("⚠️ All lip-sync methods failed, returning original video")
-        import shutil
-        shutil.copy2(video_path, output_path)
+            mux_audio(video_path, audio_path, output_path, shortest=shortest, subtitles_path=subtitles_path,
+                      burn_subtitles=burn_subtitles, subtitle_language=subtitle_language)
+        except MediaBackendError as e:
+            if not subtitles_path:
+                raise
+            logger.warning(f"⚠️ Muxing with subtitles failed, retrying without them: {e}")
+            mux_audio(video_path, audio_path, output_path, shortest=shortest)
+        logger.info(f"✅ Lip-sync successful: {output_path}")
         return output_path
         
     except Exception as e:
         logger.error(f"❌ Lip-sync deployment failed: {e}")
-        # Ultimate fallback
-        import shutil
-        shutil.copy2(video_path, output_path)
-        return output_path
+        return None
 
-print("🎉 All systems ready!")
+logger.info("🎉 All systems ready!")
 
 @app.route('/')
 def index():
@@ -474,6 +351,292 @@ def translate_text_endpoint():
         logger.error(f"❌ Translation error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/translate/text/batch', methods=['POST'])
+def translate_text_batch_endpoint():
+    """Bulk text translation endpoint - many strings in one round trip"""
+    try:
+        data = request.get_json(silent=True) or {}
+        texts = data.get('texts')
+        target_lang = data.get('target_language', 'hi')
+
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'Provide a non-empty list of strings in "texts"'}), 400
+
+        if len(texts) > MAX_BATCH_TEXTS:
+            return jsonify({'error': f'Too many texts (max {MAX_BATCH_TEXTS})'}), 400
+
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'All items in "texts" must be strings'}), 400
+
+        if sum(len(text) for text in texts) > MAX_BATCH_CHARS:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_CHARS} characters)'}), 400
+
+        logger.info(f"📦 Batch translation request: {len(texts)} texts -> {target_lang}")
+        translations = translate_batch(texts, target_lang)
+
+        return jsonify({
+            'success': True,
+            'translations': translations,
+            'count': len(translations),
+            'target_language': target_lang
+        })
+
+    except Exception as e:
+        logger.error(f"❌ Batch translation error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def parse_target_languages(req):
+    """
+    Read target_languages (repeated field or comma-separated list, 'all' for
+    every supported language). Returns (langs, error); langs is None when the
+    field is absent and the single target_language field applies
+    """
+    codes = [code.strip() for value in req.form.getlist('target_languages') for code in value.split(',') if code.strip()]
+    if not codes:
+        return None, None
+    if codes == ['all']:
+        return list(LANGUAGES), None
+    unknown = [code for code in codes if code not in LANGUAGES]
+    if unknown:
+        return None, f"Unsupported target languages: {', '.join(unknown)}. Supported: {', '.join(LANGUAGES)}"
+    return list(dict.fromkeys(codes)), None
+
+def fan_out(fn, langs):
+    """Run fn(lang) for every language in parallel (FANOUT_WORKERS, default 4). Returns {lang: result} in order"""
+    if len(langs) == 1:
+        return {langs[0]: fn(langs[0])}
+    workers = min(len(langs), int(os.environ.get('FANOUT_WORKERS', '4')))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(langs, executor.map(fn, langs)))
+
+RESULT_URL_FIELDS = ('audio_url', 'video_url', 'subtitles_url', 'hls_url')
+
+def result_files_exist(payload):
+    """True when every file a response links to (fan-out manifest outputs included) is still in the upload folder"""
+    entries = [payload] + list((payload.get('outputs') or {}).values())
+    for entry in entries:
+        for field in RESULT_URL_FIELDS:
+            url = entry.get(field)
+            if url and not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], url.split('/', 3)[3])):
+                return False
+    return True
+
+def cached_result(key):
+    """
+    Memoized response for a result key, as long as every file it links to
+    is still in the upload folder
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return None
+    payload = cache.get(key)
+    if payload is None:
+        return None
+    if not result_files_exist(payload):
+        cache.delete(key)
+        return None
+    logger.info(f"♻️ Returning memoized result {key[:12]}")
+    payload['cached'] = True
+    return payload
+
+def segment_event(segment):
+    """Partial result streamed to clients as soon as a segment is transcribed and translated"""
+    return {
+        'index': segment['index'],
+        'start': segment['start'],
+        'end': segment['end'],
+        'text': segment['text'],
+        'translations': segment['translations']
+    }
+
+def new_run_id():
+    """
+    Prefix for one run's intermediate files. Outputs are named after the result
+    key, so concurrent runs of the same request (e.g. a client retrying after a
+    proxy timeout) keep their intermediates apart and only publish finished files
+    """
+    return uuid.uuid4().hex[:8]
+
+def publish_file(temp_path, final_path):
+    """Move a finished output into place atomically; readers never see a partial file"""
+    os.replace(temp_path, final_path)
+    return final_path
+
+def publish_directory(temp_dir, final_dir):
+    """
+    Move a finished output directory into place. If a concurrent run of the
+    same result already published it, that copy is kept and this one dropped
+    """
+    try:
+        os.rename(temp_dir, final_dir)
+    except OSError:
+        if not os.path.isdir(final_dir):
+            raise
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return final_dir
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def run_once(key, fn):
+    """
+    Run fn() for a result key unless a run for the same key is already in
+    progress in this process; then wait for that run and return its result
+    """
+    if not key:
+        return fn()
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if not leader:
+        logger.info(f"⏳ Result {key[:12]} is already being produced, waiting for it")
+        return future.result()
+    try:
+        result = fn()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def remember_result(key, payload):
+    """
+    Memoize a completed response. Callers only pass results with every file
+    produced and no fallback translation (see used_fallback)
+    """
+    cache = get_result_cache()
+    if cache is not None and key and payload.get('success'):
+        cache.put(key, payload)
+
+def process_audio_translation(audio_path, target_lang, report_progress=None, memo_key=None, remove_upload=False):
+    """
+    Run the audio pipeline on a saved upload.
+    Returns (payload, status_code) so it can back both the request handler and queued jobs.
+
+    target_lang is one language code, or a list for a fan-out job that returns
+    a manifest. remove_upload deletes audio_path when done
+    """
+    def report(stage, progress):
+        if report_progress:
+            report_progress(stage, progress)
+
+    def publish(name, data):
+        # Jobs report through a JobReporter, which also streams partial results
+        if hasattr(report_progress, 'event'):
+            report_progress.event(name, data)
+
+    manifest = not isinstance(target_lang, str)
+    langs = list(target_lang) if manifest else [target_lang]
+    output_name = memo_key[:16] if memo_key else os.path.splitext(os.path.basename(audio_path))[0]
+    run_id = new_run_id()
+    temp_files = [audio_path] if remove_upload else []
+
+    try:
+        # Decode through FFmpeg into an overlapped recognize -> translate -> synthesize
+        # pipeline (no WAV files on disk); recognition runs once for all languages
+        logger.info(f"🔊 Transcribing English audio and translating to {', '.join(langs)}...")
+        report('dubbing', 0.1)
+        output_base = os.path.join(app.config['UPLOAD_FOLDER'], f'translated_{output_name}')
+
+        def on_segment(segment):
+            temp_files.extend(path for path in segment['audio_paths'].values() if path)
+            publish('segment', segment_event(segment))
+
+        try:
+            segments, pipeline_stats = run_dubbing_pipeline(
+                audio_path, langs, translate_batch_with_fallbacks, text_to_speech, f'{output_base}_{run_id}_segment',
+                fallback_fn=translate_text_fallback, on_segment=on_segment
+            )
+            transcript = stitch_transcript(segments)
+            logger.info(f"📄 Pipeline completed: {pipeline_stats}")
+        except MediaBackendError as e:
+            logger.error(f"❌ Audio decode error: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Audio file is empty or corrupted: {str(e)}',
+                'original_text': '',
+                'translated_text': ''
+            }, 400
+        except Exception as e:
+            logger.error(f"❌ Transcription error: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Transcription service unavailable: {str(e)}',
+                'original_text': '',
+                'translated_text': ''
+            }, 500
+
+        # Safe check for transcription failure
+        if not transcript or any(phrase in (transcript.lower() if transcript else "") for phrase in ['error', 'could not', 'no speech', 'unavailable', 'failed', 'network']):
+            return {
+                'success': False,
+                'error': f'Transcription failed: {transcript}',
+                'original_text': '',
+                'translated_text': ''
+            }, 400
+
+        def finish_language(lang):
+            # Join the per-segment speech into one file
+            output = {
+                'target_language': lang,
+                'translated_text': joined_translation(segments, lang),
+                'audio_url': None,
+                'preview_url': None,
+                'warning': segment_warning(segments, lang)
+            }
+            joined_path = f'{output_base}_{lang}_{run_id}.mp3'
+            temp_files.append(joined_path)
+            try:
+                audio_path = join_segment_audio(segments, lang, joined_path)
+                if audio_path:
+                    audio_path = publish_file(audio_path, f'{output_base}_{lang}.mp3')
+            except MediaBackendError as e:
+                logger.error(f"❌ TTS error ({lang}): {str(e)}")
+                audio_path = None
+
+            if audio_path:
+                output['audio_url'] = f'/api/download/{os.path.basename(audio_path)}'
+                output['preview_url'] = f'/api/preview/{os.path.basename(audio_path)}'
+            else:
+                logger.warning(f"⚠️ TTS failed for {lang}, providing text-only output")
+                output['warning'] = 'Audio generation failed, but translation completed successfully'
+            publish('output', output)
+            return output
+
+        report('generating_speech', 0.7)
+        outputs = fan_out(finish_language, langs)
+        if manifest:
+            result = {
+                'success': True,
+                'original_text': transcript,
+                'target_languages': langs,
+                'outputs': outputs
+            }
+        else:
+            result = {'success': True, 'original_text': transcript, **outputs[target_lang]}
+
+        if all(output['audio_url'] for output in outputs.values()) and not used_fallback(segments):
+            remember_result(memo_key, result)
+        return result, 200
+
+    except Exception as e:
+        logger.error(f"❌ Audio processing error: {str(e)}")
+        return {
+            'success': False,
+            'error': f'Audio processing failed: {str(e)}',
+            'original_text': '',
+            'translated_text': ''
+        }, 500
+
+    finally:
+        # Clean up temporary files
+        cleanup_temp_files(temp_files)
+
 @app.route('/api/translate/audio', methods=['POST'])
 def translate_audio_endpoint():
     """Audio translation endpoint - Deployment optimized"""
@@ -492,148 +655,363 @@ def translate_audio_endpoint():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Please upload a valid audio or video file.'}), 400
 
-        # Save the uploaded file
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        logger.info(f"💾 File saved: {file_path}")
+        requested_langs, langs_error = parse_target_languages(request)
+        if langs_error:
+            return jsonify({'error': langs_error}), 400
 
-        temp_files = [file_path]
-        processed_audio_path = file_path
+        # Hash the upload while it is written to disk; a known file returns its memoized result
+        upload_path, content_hash = spool_upload(file, app.config['UPLOAD_FOLDER'])
+        key = result_key('audio', content_hash, requested_langs or target_lang)
+        memoized = cached_result(key)
+        if memoized:
+            cleanup_temp_files([upload_path])
+            return jsonify(memoized)
 
-        try:
-            # Handle MP3 files with deployment-friendly approach
-            if filename.lower().endswith('.mp3'):
-                logger.info("🔄 Processing MP3 file for deployment...")
-                wav_path = file_path.replace('.mp3', '.wav')
-                
+        # A concurrent request for the same result waits for the running one
+        result, status_code = run_once(key, lambda: process_audio_translation(
+            upload_path, requested_langs or target_lang, memo_key=key, remove_upload=True
+        ))
+        cleanup_temp_files([upload_path])
+        return jsonify(result), status_code
+
+    except Exception as e:
+        logger.error(f"❌ Audio translation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Audio translation failed: {str(e)}',
+            'original_text': '',
+            'translated_text': ''
+        }), 500
+        
+def package_hls_rendition(video_path, base_name, audio_tracks, run_id):
+    """
+    HLS rendition of a dubbed video in uploads/hls_<base_name>/: one master
+    playlist with every language as an alternate audio track. Returns the
+    playlist URL, or None if packaging failed (the MP4 outputs are unaffected)
+    """
+    if not audio_tracks:
+        return None
+    output_dir = os.path.join(app.config['UPLOAD_FOLDER'], f'hls_{base_name}')
+    # Packaged next to it under the run's name and moved into place once complete
+    temp_dir = f'{output_dir}_{run_id}'
+    try:
+        package_hls(video_path, audio_tracks, temp_dir,
+                    names={lang: LANGUAGES.get(lang, lang) for lang in audio_tracks})
+        master_path = os.path.join(publish_directory(temp_dir, output_dir), MASTER_PLAYLIST)
+    except (MediaBackendError, OSError) as e:
+        logger.error(f"❌ HLS packaging failed: {str(e)}")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None
+    logger.info(f"✅ HLS rendition ready: {master_path}")
+    return f"/api/preview/{os.path.relpath(master_path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')}"
+
+def process_video_translation(video_path, video_filename, target_lang, report_progress=None, options=None,
+                              memo_key=None):
+    """
+    Run the full video pipeline on a saved upload.
+    Returns (payload, status_code) so it can back both the request handler and queued jobs.
+
+    target_lang is one language code, or a list for a fan-out job: recognition
+    runs once, every language is translated, voiced and muxed in parallel and
+    the payload is a manifest with one entry per language.
+
+    options: subtitles ('srt' or 'vtt') and subtitle_mode ('mux' adds a subtitle
+    track, 'burn' renders them into the picture) - both applied in the final mux;
+    hls packages the picture and every language's audio as one HLS master playlist.
+    memo_key: result_key under which a successful response is memoized
+    """
+    def report(stage, progress):
+        if report_progress:
+            report_progress(stage, progress)
+
+    def publish(name, data):
+        # Jobs report through a JobReporter, which also streams partial results
+        if hasattr(report_progress, 'event'):
+            report_progress.event(name, data)
+
+    manifest = not isinstance(target_lang, str)
+    langs = list(target_lang) if manifest else [target_lang]
+    options = options or {}
+    subtitle_format = options.get('subtitles')
+    subtitle_mode = options.get('subtitle_mode')
+    base_name = os.path.splitext(video_filename)[0]
+    upload_folder = app.config['UPLOAD_FOLDER']
+    run_id = new_run_id()
+
+    temp_files = []
+    subtitle_writers = {}
+    subtitle_paths = {}
+
+    try:
+        # Steps 1-4 run as an overlapped pipeline: each speech segment is translated
+        # and synthesized while the next one is still being recognized
+        logger.info(f"🎤 Recognizing, translating and synthesizing segments ({', '.join(langs)})...")
+        report('dubbing', 0.1)
+        if subtitle_format:
+            for lang in langs:
                 try:
-                    # Try conversion but don't fail completely if it doesn't work
-                    processed_audio_path = convert_mp3_to_wav_deployment(file_path, wav_path)
-                    if processed_audio_path != file_path:
-                        temp_files.append(processed_audio_path)
-                    logger.info(f"✅ MP3 processed: {processed_audio_path}")
+                    subtitle_writers[lang] = SubtitleWriter(
+                        os.path.join(upload_folder, f"translated_{base_name}_{lang}_{run_id}.{subtitle_format}"),
+                        subtitle_format
+                    )
+                    temp_files.append(subtitle_writers[lang].path)
                 except Exception as e:
-                    logger.warning(f"⚠️ MP3 conversion failed, using original: {e}")
-                    processed_audio_path = file_path  # Fallback to original MP3
-            else:
-                # For other audio formats
-                processed_audio_path = convert_to_wav(file_path)
-                if processed_audio_path != file_path:
-                    temp_files.append(processed_audio_path)
-
-            # Verify the audio file
-            if not os.path.exists(processed_audio_path) or os.path.getsize(processed_audio_path) == 0:
-                return jsonify({
-                    'success': False,
-                    'error': 'Audio file is empty or corrupted',
-                    'original_text': '',
-                    'translated_text': ''
-                }), 400
-
-            # Transcribe with timeout and better error handling
-            logger.info("🔊 Transcribing English audio...")
+                    logger.error(f"❌ Subtitle generation failed ({lang}): {str(e)}")
+
+        def on_segment(segment):
+            # Cues are written as segments complete, in time order
+            for lang, writer in subtitle_writers.items():
+                writer.add(segment['start'], segment['end'], segment['translations'].get(lang))
+            temp_files.extend(path for path in segment['audio_paths'].values() if path)
+            publish('segment', segment_event(segment))
+
+        try:
+            segments, pipeline_stats = run_dubbing_pipeline(
+                video_path, langs, translate_batch_with_fallbacks, text_to_speech,
+                os.path.join(upload_folder, f"{base_name}_{run_id}_segment"),
+                fallback_fn=translate_text_fallback, on_segment=on_segment
+            )
+            transcript = stitch_transcript(segments)
+            logger.info(f"📄 Pipeline completed: {pipeline_stats}")
+        except MediaBackendError as e:
+            logger.error(f"❌ Audio extraction failed: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Audio extraction failed: {str(e)}. Please check if FFmpeg is installed.',
+                'original_text': '',
+                'translated_text': ''
+            }, 500
+        except Exception as e:
+            logger.error(f"❌ Transcription failed: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Transcription service unavailable: {str(e)}',
+                'original_text': '',
+                'translated_text': ''
+            }, 500
+        finally:
+            for writer in subtitle_writers.values():
+                writer.close()
+
+        for lang, writer in subtitle_writers.items():
             try:
-                transcript = safe_transcribe_audio_deployment(processed_audio_path)
-                logger.info(f"📄 Transcription completed, length: {len(transcript) if transcript else 0}")
-            except Exception as e:
-                logger.error(f"❌ Transcription error: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Transcription service unavailable: {str(e)}',
-                    'original_text': '',
-                    'translated_text': ''
-                }), 500
-
-            # Safe check for transcription failure
-            if not transcript or any(phrase in (transcript.lower() if transcript else "") for phrase in ['error', 'could not', 'no speech', 'unavailable', 'failed', 'network']):
-                return jsonify({
-                    'success': False,
-                    'error': f'Transcription failed: {transcript}',
-                    'original_text': '',
-                    'translated_text': ''
-                }), 400
-
-            # Translate with fallback
-            logger.info(f"🔄 Translating to {target_lang}...")
+                subtitle_paths[lang] = publish_file(
+                    writer.path, os.path.join(upload_folder, f"translated_{base_name}_{lang}.{subtitle_format}")
+                )
+            except OSError as e:
+                logger.error(f"❌ Subtitle generation failed ({lang}): {str(e)}")
+
+        # Check if transcription failed
+        if not transcript or any(phrase in (transcript.lower() if transcript else "") for phrase in ['error', 'could not', 'no speech', 'unavailable', 'failed']):
+            return {
+                'success': False,
+                'error': f'Transcription failed: {transcript}',
+                'original_text': '',
+                'translated_text': ''
+            }, 400
+
+        # Join each language's per-segment speech into one track on the video's timeline
+        report('generating_speech', 0.6)
+        duration = None
+        if alignment_enabled():
             try:
-                translated_text = translate_text(transcript, target_lang)
-                logger.info(f"🌐 Translation completed")
-            except Exception as e:
-                logger.error(f"❌ Translation error: {str(e)}")
-                # Use fallback translation
-                translated_text = translate_text_fallback(transcript, target_lang)
+                duration = probe_duration(video_path)
+            except MediaBackendError as e:
+                logger.warning(f"⚠️ Could not read the video duration, speech will not be aligned: {e}")
+        aligned = {}
 
-            # Text-to-speech with fallback
-            logger.info(f"🗣️ Generating speech in {target_lang}...")
-            audio_output_path = os.path.join(app.config['UPLOAD_FOLDER'], f'translated_{target_lang}_{os.path.splitext(filename)[0]}.mp3')
-            
+        def join_language(lang):
+            path = os.path.join(upload_folder, f"{base_name}_{run_id}_{lang}_translated.mp3")
             try:
-                tts_result = text_to_speech(translated_text, target_lang, audio_output_path)
-                
-                # Handle different return types
-                if isinstance(tts_result, dict) and 'audio_path' in tts_result:
-                    audio_path = tts_result['audio_path']
-                    warning_message = tts_result.get('warning')
+                if duration:
+                    try:
+                        # Decoding and WSOLA are CPU-bound numpy work: run them in a media worker
+                        path, timing = offload(align_segment_audio, segments, lang, path, duration)
+                        aligned[lang] = path is not None
+                        if timing:
+                            logger.debug(f"⏱️ Segment timing ({lang}): {timing}")
+                    except MediaBackendError as e:
+                        logger.warning(f"⚠️ Timing alignment failed ({lang}), concatenating instead: {e}")
+                        path = join_segment_audio(segments, lang, path)
                 else:
-                    audio_path = tts_result
-                    warning_message = None
-                
-                # Verify audio was created
-                if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
-                    logger.warning("⚠️ TTS failed, providing text-only response")
-                    return jsonify({
-                        'success': True,
-                        'original_text': transcript,
-                        'translated_text': translated_text,
-                        'audio_url': None,
-                        'target_language': target_lang,
-                        'warning': 'Audio generation failed, but translation completed successfully'
-                    })
-                
-                return jsonify({
-                    'success': True,
-                    'original_text': transcript,
-                    'translated_text': translated_text,
-                    'audio_url': f'/api/download/{os.path.basename(audio_path)}',
-                    'target_language': target_lang,
-                    'warning': warning_message
-                })
+                    path = join_segment_audio(segments, lang, path)
+            except MediaBackendError as e:
+                logger.error(f"❌ Joining segment audio failed ({lang}): {str(e)}")
+                return None
+            if path:
+                temp_files.append(path)
+                logger.info(f"✅ Translated audio generated: {path}")
+            return path
 
+        audio_paths = fan_out(join_language, langs)
+
+        # Step 5: Apply lip-sync (video + audio merge), all languages in parallel
+        logger.info("🎭 Applying lip-sync...")
+        report('lip_sync', 0.8)
+
+        def finish_language(lang):
+            subtitles_path = subtitle_paths.get(lang)
+            output = {
+                'target_language': lang,
+                'translated_text': joined_translation(segments, lang),
+                'video_url': None,
+                'preview_url': None,
+                'subtitles_url': f'/api/download/{os.path.basename(subtitles_path)}' if subtitles_path else None,
+                'subtitle_format': subtitle_format if subtitles_path else None,
+                'warning': segment_warning(segments, lang)
+            }
+            if not audio_paths[lang]:
+                logger.warning(f"⚠️ TTS failed for {lang}, providing text-only output")
+                output['warning'] = 'Video translation completed but audio generation failed'
+                publish('output', output)
+                return output
+
+            final_video_path = os.path.join(upload_folder, f"translated_{base_name}_{lang}.mp4")
+            output_video_path = os.path.join(upload_folder, f"translated_{base_name}_{lang}_{run_id}.mp4")
+            temp_files.append(output_video_path)
+            subtitle_args = {
+                'subtitles_path': subtitles_path if subtitle_mode else None,
+                'burn_subtitles': subtitle_mode == 'burn',
+                'subtitle_language': ISO_639_2.get(lang)
+            }
+            mode = options.get('lip_sync')
+            if mode and apply_lip_sync is not None:
+                # Re-renders the mouth region and encodes the video once, audio and subtitles included
+                try:
+                    output['lip_sync'] = apply_lip_sync(video_path, audio_paths[lang], output_video_path,
+                                                        mode=mode, **subtitle_args)
+                except Exception as e:
+                    logger.warning(f"⚠️ Lip-sync ({mode}) failed for {lang}, muxing the dubbed audio without it: {e}")
+                    output['warning'] = output['warning'] or 'Lip-sync failed; the video has the dubbed audio only'
+            try:
+                if output.get('lip_sync'):
+                    lip_synced_video_path = output_video_path
+                else:
+                    lip_synced_video_path = apply_lip_sync_deployment(
+                        video_path, audio_paths[lang], output_video_path, **subtitle_args,
+                        # An aligned track already spans the whole video
+                        shortest=not aligned.get(lang)
+                    )
+                if (not lip_synced_video_path or not os.path.exists(lip_synced_video_path)
+                        or os.path.getsize(lip_synced_video_path) == 0):
+                    logger.warning("⚠️ Lip-sync failed, providing original video with separate audio")
+                    # Fallback: return original video path
+                    lip_synced_video_path = video_path
+                else:
+                    lip_synced_video_path = publish_file(lip_synced_video_path, final_video_path)
+                logger.info(f"✅ Lip-sync completed: {lip_synced_video_path}")
             except Exception as e:
-                logger.error(f"❌ TTS error: {str(e)}")
-                # Return success with text only
-                return jsonify({
-                    'success': True,
-                    'original_text': transcript,
-                    'translated_text': translated_text,
-                    'audio_url': None,
-                    'target_language': target_lang,
-                    'warning': 'Translation completed but audio generation failed'
-                })
+                logger.error(f"❌ Lip-sync failed: {str(e)}")
+                # Fallback: use original video
+                lip_synced_video_path = video_path
 
-        except Exception as e:
-            logger.error(f"❌ Audio processing error: {str(e)}")
-            return jsonify({
-                'success': False,
-                'error': f'Audio processing failed: {str(e)}',
-                'original_text': '',
-                'translated_text': ''
-            }), 500
+            output['video_url'] = f'/api/download/{os.path.basename(lip_synced_video_path)}'
+            output['preview_url'] = f'/api/preview/{os.path.basename(lip_synced_video_path)}'
+            output['complete'] = lip_synced_video_path != video_path
+            publish('output', {key: value for key, value in output.items() if key != 'complete'})
+            return output
 
-        finally:
-            # Clean up temporary files
-            cleanup_temp_files(temp_files)
+        outputs = fan_out(finish_language, langs)
+        complete = all(output.pop('complete', False) for output in outputs.values())
+
+        hls_url = None
+        if options.get('hls'):
+            report('packaging', 0.9)
+            audio_tracks = {lang: audio_paths[lang] for lang in langs if audio_paths[lang]}
+            hls_url = package_hls_rendition(video_path, base_name, audio_tracks, run_id)
+            complete = complete and hls_url is not None
+
+        logger.info("✅ Video translation completed successfully!")
+        if manifest:
+            result = {
+                'success': True,
+                'original_text': transcript,
+                'target_languages': langs,
+                'outputs': outputs
+            }
+        else:
+            result = {'success': True, 'original_text': transcript, **outputs[target_lang]}
+        if options.get('hls'):
+            result['hls_url'] = hls_url
+        if complete and not used_fallback(segments):
+            remember_result(memo_key, result)
+        return result, 200
 
     except Exception as e:
-        logger.error(f"❌ Audio translation error: {str(e)}")
-        return jsonify({
+        logger.error(f"❌ Video processing error: {str(e)}")
+        return {
             'success': False,
-            'error': f'Audio translation failed: {str(e)}',
+            'error': f'Video processing failed: {str(e)}',
             'original_text': '',
             'translated_text': ''
-        }), 500
-        
+        }, 500
+
+    finally:
+        # Clean up temporary files (keep final videos and the stored upload)
+        try:
+            cleanup_temp_files([f for f in temp_files if f and os.path.exists(f)])
+        except Exception as e:
+            logger.warning(f"Error cleaning up temporary files: {e}")
+
+def run_video_translation_job(payload, report):
+    """Job handler for queued video translations"""
+    result, status_code = process_video_translation(
+        payload['video_path'], payload['video_filename'], payload['target_lang'], report,
+        payload.get('options'), payload.get('result_key')
+    )
+    result['status_code'] = status_code
+    return result
+
+def run_audio_translation_job(payload, report):
+    """Job handler for queued audio translations"""
+    result, status_code = process_audio_translation(
+        payload['audio_path'], payload['target_lang'], report, payload.get('result_key'),
+        remove_upload=payload.get('remove_upload', False)
+    )
+    result['status_code'] = status_code
+    return result
+
+job_queue = create_job_queue()
+job_queue.register('video_translation', run_video_translation_job)
+job_queue.register('audio_translation', run_audio_translation_job)
+
+# Resumable uploads: chunks go straight into the upload folder, so files larger
+# than MAX_CONTENT_LENGTH can be sent as a series of smaller PATCH requests
+resumable_uploads = ResumableUploadStore(
+    app.config['UPLOAD_FOLDER'],
+    max_size=int(os.environ.get('RESUMABLE_MAX_SIZE', str(2 * 1024 * 1024 * 1024))),
+    ttl=int(os.environ.get('RESUMABLE_UPLOAD_TTL', str(24 * 3600)))
+)
+
+def video_options(req):
+    """
+    Read output options from the form: subtitles=srt|vtt, subtitle_mode=mux|burn
+    and hls=true for an HLS rendition next to the MP4.
+    Returns (options, error)
+    """
+    subtitle_format = (req.form.get('subtitles') or '').lower() or None
+    subtitle_mode = (req.form.get('subtitle_mode') or '').lower() or None
+
+    if subtitle_format and subtitle_format not in SUBTITLE_FORMATS:
+        return None, f"Invalid subtitles format. Supported: {', '.join(SUBTITLE_FORMATS)}"
+    if subtitle_mode and subtitle_mode not in ('mux', 'burn'):
+        return None, 'Invalid subtitle_mode. Supported: mux, burn'
+    if subtitle_mode and not subtitle_format:
+        subtitle_format = 'srt'
+
+    options = {'subtitles': subtitle_format, 'subtitle_mode': subtitle_mode}
+    if (req.form.get('hls') or '').lower() in ('1', 'true', 'yes'):
+        options['hls'] = True
+    if lip_sync_mode() != 'off':
+        # Part of the memo key, so switching LIP_SYNC_MODE never serves the other kind of output
+        options['lip_sync'] = lip_sync_mode()
+    return options, None
+
+def wants_async(req):
+    """Clients opt in to background processing with async=true (form field or query string)"""
+    value = req.form.get('async') or req.args.get('async') or ''
+    return value.lower() in ('1', 'true', 'yes')
+
 @app.route('/api/translate/video', methods=['POST'])
 def translate_video_endpoint():
     """Video translation endpoint - Deployment optimized"""
@@ -654,157 +1032,53 @@ def translate_video_endpoint():
         if not allowed_file(video_file.filename):
             return jsonify({'error': 'Invalid file type. Supported: MP4, AVI, MOV, WebM'}), 400
 
-        # Save the uploaded video
-        video_filename = secure_filename(video_file.filename)
-        video_path = os.path.join(app.config['UPLOAD_FOLDER'], video_filename)
-        video_file.save(video_path)
-        logger.info(f"💾 Video saved: {video_path} (Size: {os.path.getsize(video_path)} bytes)")
+        options, options_error = video_options(request)
+        if options_error:
+            return jsonify({'error': options_error}), 400
 
-        temp_files = [video_path]
-        audio_path = None
-        translated_audio_path = None
-        lip_synced_video_path = None
+        requested_langs, langs_error = parse_target_languages(request)
+        if langs_error:
+            return jsonify({'error': langs_error}), 400
+        if requested_langs:
+            target_lang = requested_langs
 
-        try:
-            # Step 1: Extract audio from video
-            logger.info("🔊 Extracting audio from video...")
-            audio_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{os.path.splitext(video_filename)[0]}_audio.wav")
-            
-            try:
-                extract_audio_from_video(video_path, audio_path)
-                if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
-                    raise Exception("Audio extraction failed - empty file")
-                temp_files.append(audio_path)
-                logger.info(f"✅ Audio extracted: {audio_path}")
-            except Exception as e:
-                logger.error(f"❌ Audio extraction failed: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Audio extraction failed: {str(e)}. Please check if FFmpeg is installed.',
-                    'original_text': '',
-                    'translated_text': ''
-                }), 500
-
-            # Step 2: Transcribe audio
-            logger.info("🎤 Transcribing audio to text...")
-            try:
-                transcript = safe_transcribe_audio_deployment(audio_path)
-                logger.info(f"📄 Transcription completed")
-                
-                # Check if transcription failed
-                if not transcript or any(phrase in (transcript.lower() if transcript else "") for phrase in ['error', 'could not', 'no speech', 'unavailable', 'failed']):
-                    return jsonify({
-                        'success': False,
-                        'error': f'Transcription failed: {transcript}',
-                        'original_text': '',
-                        'translated_text': ''
-                    }), 400
-                    
-            except Exception as e:
-                logger.error(f"❌ Transcription failed: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Transcription service unavailable: {str(e)}',
-                    'original_text': '',
-                    'translated_text': ''
-                }), 500
-
-            # Step 3: Translate text
-            logger.info(f"🔄 Translating to {target_lang}...")
-            try:
-                translated_text = translate_text(transcript, target_lang)
-                logger.info(f"🌐 Translation completed")
-            except Exception as e:
-                logger.error(f"❌ Translation failed: {str(e)}")
-                # Use fallback translation
-                translated_text = translate_text_fallback(transcript, target_lang)
+        # Store the upload by content hash; a known clip returns its memoized result
+        video_path, content_hash = save_upload_by_hash(video_file, app.config['UPLOAD_FOLDER'])
+        logger.info(f"💾 Video saved: {video_path} (Size: {os.path.getsize(video_path)} bytes)")
+        key = result_key('video', content_hash, target_lang, options)
+        memoized = cached_result(key)
+        if memoized:
+            return jsonify(memoized)
 
-            # Step 4: Generate translated audio
-            logger.info(f"🗣️ Generating speech in {target_lang}...")
-            translated_audio_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{os.path.splitext(video_filename)[0]}_translated.mp3")
-            
-            try:
-                tts_result = text_to_speech(translated_text, target_lang, translated_audio_path)
-                
-                # Handle different return types
-                if isinstance(tts_result, dict) and 'audio_path' in tts_result:
-                    translated_audio_path = tts_result['audio_path']
-                    warning_message = tts_result.get('warning')
-                else:
-                    translated_audio_path = tts_result
-                    warning_message = None
-                
-                # Verify audio was created
-                if not os.path.exists(translated_audio_path) or os.path.getsize(translated_audio_path) == 0:
-                    logger.warning("⚠️ TTS failed, providing text-only response")
-                    return jsonify({
-                        'success': True,
-                        'original_text': transcript,
-                        'translated_text': translated_text,
-                        'video_url': None,
-                        'target_language': target_lang,
-                        'warning': 'Video translation completed but audio generation failed'
-                    })
-                
-                temp_files.append(translated_audio_path)
-                logger.info(f"✅ Translated audio generated: {translated_audio_path}")
-                
-            except Exception as e:
-                logger.error(f"❌ TTS failed: {str(e)}")
-                return jsonify({
-                    'success': True,
-                    'original_text': transcript,
-                    'translated_text': translated_text,
-                    'video_url': None,
-                    'target_language': target_lang,
-                    'warning': 'Translation completed but audio generation failed'
-                })
-
-            # Step 5: Apply lip-sync (video + audio merge)
-            logger.info("🎭 Applying lip-sync...")
-            output_video_path = os.path.join(app.config['UPLOAD_FOLDER'], f"translated_{os.path.splitext(video_filename)[0]}.mp4")
-            
+        # Outputs are named after the result key so different languages and options never collide
+        video_filename = f"{key[:16]}{upload_extension(video_file.filename)}"
+
+        if wants_async(request):
             try:
-                lip_synced_video_path = apply_lip_sync_deployment(video_path, translated_audio_path, output_video_path)
-                
-                if not os.path.exists(lip_synced_video_path) or os.path.getsize(lip_synced_video_path) == 0:
-                    logger.warning("⚠️ Lip-sync failed, providing original video with separate audio")
-                    # Fallback: return original video path
-                    lip_synced_video_path = video_path
-                
-                logger.info(f"✅ Lip-sync completed: {lip_synced_video_path}")
-                
-            except Exception as e:
-                logger.error(f"❌ Lip-sync failed: {str(e)}")
-                # Fallback: use original video
-                lip_synced_video_path = video_path
+                job_id = job_queue.submit('video_translation', {
+                    'video_path': video_path,
+                    'video_filename': video_filename,
+                    'target_lang': target_lang,
+                    'options': options,
+                    'result_key': key
+                }, dedupe_key=key)
+            except QueueFullError as e:
+                logger.warning(f"⚠️ {e}")
+                return jsonify({'success': False, 'error': 'Server is busy, please retry shortly'}), 503
 
-            logger.info("✅ Video translation completed successfully!")
             return jsonify({
                 'success': True,
-                'original_text': transcript,
-                'translated_text': translated_text,
-                'video_url': f'/api/download/{os.path.basename(lip_synced_video_path)}',
-                'target_language': target_lang,
-                'warning': warning_message
-            })
-
-        except Exception as e:
-            logger.error(f"❌ Video processing error: {str(e)}")
-            return jsonify({
-                'success': False,
-                'error': f'Video processing failed: {str(e)}',
-                'original_text': '',
-                'translated_text': ''
-            }), 500
+                'job_id': job_id,
+                'status': JOB_QUEUED,
+                'status_url': f'/api/jobs/{job_id}',
+                'result_url': f'/api/jobs/{job_id}/result'
+            }), 202
 
-        finally:
-            # Clean up temporary files (keep final video)
-            try:
-                files_to_cleanup = [f for f in temp_files if f and os.path.exists(f) and f != lip_synced_video_path and f != video_path]
-                cleanup_temp_files(files_to_cleanup)
-            except Exception as e:
-                logger.warning(f"Error cleaning up temporary files: {e}")
+        # A concurrent request for the same result waits for the running one
+        result, status_code = run_once(key, lambda: process_video_translation(
+            video_path, video_filename, target_lang, options=options, memo_key=key
+        ))
+        return jsonify(result), status_code
 
     except Exception as e:
         logger.error(f"❌ Video translation error: {str(e)}")
@@ -814,19 +1088,282 @@ def translate_video_endpoint():
             'original_text': '',
             'translated_text': ''
         }), 500
+
+def upload_status(meta):
+    """JSON body and tus headers describing an upload's progress"""
+    body = {
+        'upload_id': meta['upload_id'],
+        'filename': meta['filename'],
+        'length': meta['length'],
+        'offset': meta['offset'],
+        'upload_url': f"/api/uploads/{meta['upload_id']}",
+        'finalize_url': f"/api/uploads/{meta['upload_id']}/finalize",
+        # Each PATCH is one request, so it is bound by the request size limit
+        'max_chunk_size': app.config['MAX_CONTENT_LENGTH'],
+        'recommended_chunk_size': RECOMMENDED_CHUNK_SIZE
+    }
+    headers = {
+        'Upload-Offset': str(meta['offset']),
+        'Upload-Length': str(meta['length']),
+        'Cache-Control': 'no-store'
+    }
+    return body, headers
+
+def upload_error_response(error):
+    body = {'success': False, 'error': str(error)}
+    headers = {}
+    if isinstance(error, OffsetMismatch):
+        body['offset'] = error.expected
+        headers['Upload-Offset'] = str(error.expected)
+    return jsonify(body), error.status, headers
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable upload. Takes the file name and total size (JSON, form
+    fields or the tus Upload-Length header) and returns the URL to PATCH chunks to
+    """
+    data = request.get_json(silent=True) or request.form
+    filename = data.get('filename', '')
+    length = data.get('length') or request.headers.get('Upload-Length')
+
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file type. Please upload a valid audio or video file.'}), 400
+    try:
+        length = int(length)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'length must be the total file size in bytes'}), 400
+
+    try:
+        meta = resumable_uploads.create(filename, length)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    body, headers = upload_status(meta)
+    headers['Location'] = body['upload_url']
+    return jsonify(body), 201, headers
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'HEAD'])
+def upload_progress(upload_id):
+    """Current offset, so an interrupted client knows where to resume"""
+    try:
+        meta = resumable_uploads.get(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    body, headers = upload_status(meta)
+    return jsonify(body), 200, headers
+
+@app.route('/api/uploads/<upload_id>', methods=['PATCH'])
+def upload_chunk(upload_id):
+    """
+    Append the request body at Upload-Offset. An optional
+    Upload-Checksum: sha256 <base64> header is verified before the chunk is kept
+    """
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+
+    try:
+        checksum = parse_checksum(request.headers.get('Upload-Checksum'))
+        new_offset = resumable_uploads.append(upload_id, offset, request.stream, checksum)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    return '', 204, {'Upload-Offset': str(new_offset), 'Cache-Control': 'no-store'}
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def cancel_upload(upload_id):
+    """Abort an upload and discard what was received"""
+    try:
+        resumable_uploads.delete(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return '', 204
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """
+    Verify a completed upload and queue it for translation. Takes the same
+    form fields as /api/translate/audio and /api/translate/video; returns the
+    job URLs, or the memoized result for a file that was already processed
+    """
+    target_lang = request.form.get('target_language', 'hi')
+    requested_langs, langs_error = parse_target_languages(request)
+    if langs_error:
+        return jsonify({'error': langs_error}), 400
+    if requested_langs:
+        target_lang = requested_langs
+
+    try:
+        meta = resumable_uploads.get(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    extension = upload_extension(meta['filename'])
+    is_video = extension.lstrip('.') in app.config['VIDEO_EXTENSIONS']
+    options = None
+    if is_video:
+        options, options_error = video_options(request)
+        if options_error:
+            return jsonify({'error': options_error}), 400
+
+    try:
+        # Video uploads are kept (a failed mux falls back to them); audio uploads are removed
+        # by their job, so they get a file of their own
+        path, content_hash, meta = resumable_uploads.finalize(upload_id, extension, shared=is_video)
+    except UploadError as e:
+        return upload_error_response(e)
+    logger.info(f"💾 Resumable upload finalized: {path} ({meta['length']} bytes)")
+
+    if is_video:
+        key = result_key('video', content_hash, target_lang, options)
+        kind, payload = 'video_translation', {
+            'video_path': path,
+            'video_filename': f"{key[:16]}{extension}",
+            'target_lang': target_lang,
+            'options': options,
+            'result_key': key
+        }
+    else:
+        key = result_key('audio', content_hash, target_lang)
+        kind, payload = 'audio_translation', {
+            'audio_path': path,
+            'target_lang': target_lang,
+            'result_key': key,
+            'remove_upload': True
+        }
+
+    def discard_upload():
+        # Only audio uploads are removed; nothing will process this copy
+        if not is_video:
+            cleanup_temp_files([path])
+
+    memoized = cached_result(key)
+    if memoized:
+        discard_upload()
+        return jsonify(memoized)
+
+    try:
+        job_id = job_queue.submit(kind, payload, dedupe_key=key)
+    except QueueFullError as e:
+        logger.warning(f"⚠️ {e}")
+        discard_upload()
+        return jsonify({'success': False, 'error': 'Server is busy, please retry shortly'}), 503
+    job = job_queue.get(job_id)
+    if job and job['payload'] != payload:
+        # An identical job was already running and keeps its own upload
+        discard_upload()
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': JOB_QUEUED,
+        'status_url': f'/api/jobs/{job_id}',
+        'result_url': f'/api/jobs/{job_id}/result'
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Job status and progress"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'progress': job['progress'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'result_url': f"/api/jobs/{job['id']}/result"
+    })
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """Job result once the pipeline has finished"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    if job['status'] in (JOB_QUEUED, JOB_RUNNING):
+        return jsonify({
+            'success': False,
+            'job_id': job['id'],
+            'status': job['status'],
+            'stage': job['stage'],
+            'progress': job['progress']
+        }), 202
+
+    result = dict(job['result'] or {})
+    status_code = result.pop('status_code', 200 if job['status'] == JOB_COMPLETED else 500)
+    if not result:
+        result = {'success': False, 'error': job['error'] or 'Job failed'}
+    result['job_id'] = job['id']
+    return jsonify(result), status_code
+
+# Comment line sent while a job is quiet, so proxies keep the stream open
+SSE_HEARTBEAT_SECONDS = 15
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-sent events for a job: 'stage' transitions, a 'segment' with the
+    transcript and translations of each speech segment as soon as it is ready,
+    an 'output' per finished language and a final 'done'. Reconnecting clients
+    resume after the Last-Event-ID they received
+    """
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    except ValueError:
+        after = 0
+
+    def stream(after):
+        yield 'retry: 3000\n\n'
+        while True:
+            events = job_queue.events(job_id, after, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                after = event['seq']
+                data = json.dumps(event['data'], ensure_ascii=False)
+                yield f"id: {event['seq']}\nevent: {event['event']}\ndata: {data}\n\n"
+                if event['event'] == 'done':
+                    return
+
+    return Response(stream_with_context(stream(after)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
         
-@app.route('/api/download/<filename>')
-def download_file(filename):
-    """File download endpoint"""
+def serve_upload(filename, inline):
     try:
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if not os.path.exists(file_path):
+        file_path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+        if file_path is None or not os.path.isfile(file_path):
             return jsonify({'error': 'File not found'}), 404
-        return send_file(file_path, as_attachment=True)
+        return serve_file(file_path, inline=inline, root=app.config['UPLOAD_FOLDER'])
     except Exception as e:
         logger.error(f"❌ Download error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/download/<path:filename>')
+def download_file(filename):
+    """File download endpoint (Range, ETag; ?inline=1 to play in the browser)"""
+    inline = (request.args.get('inline') or '').lower() in ('1', 'true', 'yes')
+    return serve_upload(filename, inline)
+
+@app.route('/api/preview/<path:filename>')
+def preview_file(filename):
+    """Inline streaming for <video>/<audio> elements, which seek with Range requests"""
+    return serve_upload(filename, inline=True)
+
 @app.route('/api/languages')
 def get_languages():
     """Get supported languages"""
@@ -847,10 +1384,62 @@ def test_translation():
         'success': True
     })
 
+def live_translation_socket(ws):
+    """
+    Live microphone translation: the client sends little-endian int16 mono PCM
+    as binary messages (sample rate in ?sample_rate=, default 16000) and
+    {"type": "end"} when done. For every utterance the server sends an
+    'utterance' JSON message (text, translation, latency_ms) followed by the
+    spoken translation as one binary MP3 message, and a 'summary' at the end
+    """
+    target_lang = request.args.get('target_language', 'hi')
+    if target_lang not in LANGUAGES:
+        ws.send(json.dumps({'type': 'error', 'error': f"Unsupported language: {target_lang}"}))
+        return
+    try:
+        sample_rate = int(request.args.get('sample_rate', SAMPLE_RATE))
+        if not 8000 <= sample_rate <= 96000:
+            raise ValueError
+    except ValueError:
+        ws.send(json.dumps({'type': 'error', 'error': 'sample_rate must be between 8000 and 96000'}))
+        return
+
+    def send(message, audio):
+        ws.send(json.dumps(message, ensure_ascii=False))
+        if audio:
+            ws.send(audio)
+
+    session = LiveSession(target_lang, send, translate_text, text_to_speech, sample_rate=sample_rate)
+    session.start()
+    logger.info(f"🎙️ Live translation session started ({target_lang}, {sample_rate} Hz)")
+    ws.send(json.dumps({'type': 'ready', 'target_language': target_lang, 'sample_rate': sample_rate}))
+
+    try:
+        while True:
+            message = ws.receive()
+            if isinstance(message, bytes):
+                session.feed(message)
+                continue
+            try:
+                control = json.loads(message or '{}')
+            except ValueError:
+                control = {}
+            if control.get('type') == 'end':
+                summary = session.finish()
+                logger.info(f"🎙️ Live translation session finished: {summary['utterances']} utterances, "
+                            f"latency {summary['latency_ms']}")
+                ws.send(json.dumps(summary))
+                return
+    except ConnectionClosed:
+        logger.info("🎙️ Live translation client disconnected")
+        session.abort()
+
+if sock is not None:
+    sock.route('/ws/live')(live_translation_socket)
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint for deployment"""
-    import subprocess
     import requests
     
     health_status = {
@@ -858,12 +1447,8 @@ def health_check():
         'services': {}
     }
     
-    try:
-        # Check FFmpeg
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, timeout=5)
-        health_status['services']['ffmpeg'] = 'available' if result.returncode == 0 else 'unavailable'
-    except:
-        health_status['services']['ffmpeg'] = 'unavailable'
+    # Check FFmpeg (probed once at startup)
+    health_status['services']['ffmpeg'] = 'available' if get_ffmpeg() else 'unavailable'
     
     try:
         # Check network connectivity
@@ -875,6 +1460,60 @@ def health_check():
     # Check upload directory
     health_status['services']['storage'] = 'ok' if os.path.exists(app.config['UPLOAD_FOLDER']) else 'failed'
     
+    # Translation cache hit/miss counters
+    try:
+        from utils.translation_cache import get_translation_cache
+        health_status['services']['translation_cache'] = get_translation_cache().get_stats()
+    except Exception as e:
+        logger.warning(f"Could not read translation cache stats: {e}")
+
+    # Translation backends and the models loaded in this worker
+    try:
+        from utils.translation_backend import get_translation_backend_stats
+        health_status['services']['translation_backends'] = get_translation_backend_stats()
+    except Exception as e:
+        logger.warning(f"Could not read translation backend stats: {e}")
+
+    # Memoized pipeline results
+    try:
+        result_cache = get_result_cache()
+        health_status['services']['result_cache'] = result_cache.get_stats() if result_cache else 'disabled'
+    except Exception as e:
+        logger.warning(f"Could not read result cache stats: {e}")
+
+    # TTS audio cache hit/miss counters
+    try:
+        from utils.tts_engine import get_tts_cache
+        tts_cache = get_tts_cache()
+        health_status['services']['tts_cache'] = tts_cache.get_stats() if tts_cache else 'disabled'
+    except Exception as e:
+        logger.warning(f"Could not read TTS cache stats: {e}")
+
+    # Speech recognition backend readiness
+    asr_stats = get_asr_stats()
+    health_status['services']['speech_recognition'] = asr_stats
+    if asr_stats['state'] == 'failed':
+        health_status['status'] = 'degraded'
+
+    # Media worker pool (moviepy fallbacks, timing alignment, lip-sync rendering)
+    try:
+        health_status['services']['media_workers'] = get_media_pool_stats()
+    except Exception as e:
+        logger.warning(f"Could not read media worker stats: {e}")
+
+    # Background imports of the heavy libraries
+    health_status['services']['warmup'] = get_warmup_stats()
+
+    # Async HTTP client of the ASGI server (per-host concurrency and counters)
+    try:
+        from utils.async_http import get_async_http_stats
+        health_status['services']['async_http'] = get_async_http_stats()
+    except Exception as e:
+        logger.warning(f"Could not read async HTTP stats: {e}")
+
+    # Live translation sessions and utterance latency
+    health_status['services']['live_translation'] = get_live_stats() if sock is not None else 'disabled'
+
     # Check function definitions
     health_status['services']['functions'] = {
         'convert_mp3_to_wav_deployment': 'convert_mp3_to_wav_deployment' in globals(),
@@ -891,4 +1530,7 @@ def health_check():
 if __name__ == '__main__':
     logger.info("🚀 Starting Translation Server...")
     logger.info("🌐 Server: http://localhost:5000")
+    # The reloader serves from a child process (WERKZEUG_RUN_MAIN); only that one needs media workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_media_pool()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
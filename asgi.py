@@ -0,0 +1,212 @@
+"""
+ASGI entry point: uvicorn asgi:application --workers 4
+
+Text translation and live translation are served natively on the event loop.
+Google Translate, Google speech recognition and gTTS calls go over one pooled
+async HTTP client with per-host concurrency limits, so thousands of requests
+waiting on the network cost no threads. Blocking and CPU-bound work (caches,
+offline models, VAD) runs on executors. Every other route is the Flask app,
+run through asgiref's WsgiToAsgi on its thread pool.
+"""
+import json
+import asyncio
+import logging
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from app import app as flask_app, LANGUAGES, MAX_BATCH_TEXTS, MAX_BATCH_CHARS
+from utils.async_http import close_async_http
+from utils.media_pool import warm_media_pool
+from utils.async_services import translate_text_async, translate_batch_async
+from utils.live_translation import AsyncLiveSession
+from utils.audio_stream import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+MAX_JSON_BODY = 1024 * 1024  # 1MB covers MAX_BATCH_CHARS of text with JSON escaping
+
+class BadRequest(Exception):
+    pass
+
+async def read_json(receive):
+    """Request body parsed as a JSON object"""
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_JSON_BODY:
+            raise BadRequest('Request body too large')
+        if not message.get('more_body'):
+            break
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise BadRequest('Invalid JSON body')
+    if not isinstance(data, dict):
+        raise BadRequest('Expected a JSON object')
+    return data
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def translate_text_endpoint(data):
+    """Async /api/translate/text"""
+    text = str(data.get('text', '')).strip()
+    target_lang = data.get('target_language', 'hi')
+    logger.info(f"📝 Translation request: '{text}' -> {target_lang}")
+    if not text:
+        return {'error': 'No text provided'}, 400
+
+    translated_text = await translate_text_async(text, target_lang)
+    logger.info(f"✅ Translation result: '{translated_text}'")
+    return {
+        'success': True,
+        'original_text': text,
+        'translated_text': translated_text,
+        'target_language': target_lang
+    }, 200
+
+async def translate_text_batch_endpoint(data):
+    """Async /api/translate/text/batch"""
+    texts = data.get('texts')
+    target_lang = data.get('target_language', 'hi')
+
+    if not isinstance(texts, list) or not texts:
+        return {'error': 'Provide a non-empty list of strings in "texts"'}, 400
+    if len(texts) > MAX_BATCH_TEXTS:
+        return {'error': f'Too many texts (max {MAX_BATCH_TEXTS})'}, 400
+    if not all(isinstance(text, str) for text in texts):
+        return {'error': 'All items in "texts" must be strings'}, 400
+    if sum(len(text) for text in texts) > MAX_BATCH_CHARS:
+        return {'error': f'Batch too large (max {MAX_BATCH_CHARS} characters)'}, 400
+
+    logger.info(f"📦 Batch translation request: {len(texts)} texts -> {target_lang}")
+    translations = await translate_batch_async(texts, target_lang)
+    return {
+        'success': True,
+        'translations': translations,
+        'count': len(translations),
+        'target_language': target_lang
+    }, 200
+
+JSON_ROUTES = {
+    '/api/translate/text': translate_text_endpoint,
+    '/api/translate/text/batch': translate_text_batch_endpoint
+}
+
+async def live_translation_socket(scope, receive, send):
+    """/ws/live on the event loop; same protocol as the Flask-Sock route in app.py"""
+    query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    await send({'type': 'websocket.accept'})
+
+    async def reject(error):
+        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'error', 'error': error})})
+        await send({'type': 'websocket.close', 'code': 1000})
+
+    target_lang = query.get('target_language', 'hi')
+    if target_lang not in LANGUAGES:
+        return await reject(f"Unsupported language: {target_lang}")
+    try:
+        sample_rate = int(query.get('sample_rate', SAMPLE_RATE))
+        if not 8000 <= sample_rate <= 96000:
+            raise ValueError
+    except ValueError:
+        return await reject('sample_rate must be between 8000 and 96000')
+
+    # Results are queued by the session (on this loop) and written by one task, so
+    # an utterance's JSON message and its MP3 always go out back to back
+    outbox = asyncio.Queue()
+
+    async def writer():
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            message, audio = item
+            await send({'type': 'websocket.send', 'text': json.dumps(message, ensure_ascii=False)})
+            if audio:
+                await send({'type': 'websocket.send', 'bytes': audio})
+
+    loop = asyncio.get_running_loop()
+    session = AsyncLiveSession(target_lang, lambda message, audio: outbox.put_nowait((message, audio)),
+                               loop, sample_rate=sample_rate)
+    session.start()
+    logger.info(f"🎙️ Live translation session started ({target_lang}, {sample_rate} Hz)")
+    writing = asyncio.ensure_future(writer())
+    await send({'type': 'websocket.send',
+                'text': json.dumps({'type': 'ready', 'target_language': target_lang, 'sample_rate': sample_rate})})
+
+    while True:
+        message = await receive()
+        if message['type'] == 'websocket.disconnect':
+            logger.info("🎙️ Live translation client disconnected")
+            session.abort()
+            writing.cancel()
+            return
+        if message.get('bytes'):
+            session.feed(message['bytes'])
+            continue
+        try:
+            control = json.loads(message.get('text') or '{}')
+        except ValueError:
+            control = {}
+        if control.get('type') == 'end':
+            summary = await loop.run_in_executor(None, session.finish)
+            outbox.put_nowait(None)
+            await writing
+            logger.info(f"🎙️ Live translation session finished: {summary['utterances']} utterances, "
+                        f"latency {summary['latency_ms']}")
+            await send({'type': 'websocket.send', 'text': json.dumps(summary)})
+            await send({'type': 'websocket.close', 'code': 1000})
+            return
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Media worker processes start here, once per server worker, never at import
+            warm_media_pool()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_async_http()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+def create_app(wsgi_app=None):
+    """
+    The ASGI application: native async routes first, everything else handed to
+    the Flask app (wsgi_app, default app.app)
+    """
+    wsgi = WsgiToAsgi(wsgi_app or flask_app)
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await lifespan(receive, send)
+        if scope['type'] == 'websocket':
+            if scope['path'] == '/ws/live':
+                return await live_translation_socket(scope, receive, send)
+            await send({'type': 'websocket.close', 'code': 1000})
+            return
+
+        handler = JSON_ROUTES.get(scope['path'])
+        if handler is None or scope['method'] != 'POST':
+            return await wsgi(scope, receive, send)
+        try:
+            payload, status = await handler(await read_json(receive))
+        except BadRequest as e:
+            payload, status = {'error': str(e)}, 400
+        except Exception as e:
+            logger.error(f"❌ Translation error: {str(e)}")
+            payload, status = {'error': str(e)}, 500
+        await send_json(send, payload, status)
+
+    return application
+
+application = create_app()
@@ -0,0 +1,132 @@
+"""
+Replay audio files into the live translation WebSocket as if they came from a microphone.
+
+Usage:
+    python benchmarks/live_client.py speech.wav [more.wav ...] [--url ws://localhost:5000/ws/live]
+                                     [--language hi] [--speed 1.0] [--chunk-ms 100] [--save-audio DIR]
+
+Each file is streamed in real time (--speed 2 plays twice as fast, 0 sends
+as fast as possible) in its own session. For every utterance the client
+prints the transcript, the translation and two latencies: the server's
+(last audio frame received -> result sent, with its per-stage breakdown) and
+the client's (last audio of the utterance sent -> result received).
+Requires websocket-client (pip install websocket-client) and FFmpeg.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load_pcm(path):
+    """Decode any audio file to 16 kHz mono int16 bytes"""
+    from utils.audio_stream import decode_pcm_frames
+
+    return b''.join(frame.tobytes() for frame in decode_pcm_frames(path))
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def replay(path, args):
+    import websocket
+
+    pcm = load_pcm(path)
+    url = f"{args.url}?target_language={args.language}&sample_rate=16000"
+    ws = websocket.create_connection(url, timeout=args.timeout)
+    ready = json.loads(ws.recv())
+    if ready.get('type') != 'ready':
+        raise RuntimeError(f"Server refused the session: {ready}")
+
+    chunk_bytes = 16000 * 2 * args.chunk_ms // 1000
+    sent_at = {}
+    results = []
+    summary = {}
+
+    def receive():
+        pending = None
+        while True:
+            opcode, data = ws.recv_data()
+            if opcode == websocket.ABNF.OPCODE_BINARY:
+                if pending is not None and args.save_audio:
+                    name = f"{os.path.splitext(os.path.basename(path))[0]}_{pending['index']:03d}.mp3"
+                    with open(os.path.join(args.save_audio, name), 'wb') as f:
+                        f.write(data)
+                continue
+            if opcode != websocket.ABNF.OPCODE_TEXT:
+                return
+            message = json.loads(data)
+            if message['type'] == 'utterance':
+                received = time.perf_counter()
+                # The utterance's last audio left the client when the stream passed its end time
+                end_offset = min(int(message['end'] * 16000 * 2), len(pcm))
+                sent = next((t for offset, t in sorted(sent_at.items()) if offset >= end_offset), None)
+                message['client_latency_ms'] = round((received - sent) * 1000, 1) if sent else None
+                results.append(message)
+                pending = message
+                print(f"  [{message['start']:6.2f}-{message['end']:6.2f}s] {message['text']!r} -> "
+                      f"{message['translation']!r}  server {message['latency_ms']['total']:.0f}ms"
+                      f"  client {message['client_latency_ms']}ms  {message['latency_ms']}")
+            elif message['type'] == 'summary':
+                summary.update(message)
+                return
+            elif message['type'] == 'error':
+                print(f"  error: {message['error']}")
+                return
+
+    receiver = threading.Thread(target=receive, daemon=True)
+    receiver.start()
+
+    print(f"{os.path.basename(path)}: {len(pcm) / 32000:.1f}s of audio")
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk_bytes):
+        chunk = pcm[offset:offset + chunk_bytes]
+        if args.speed > 0:
+            due = start + offset / 32000 / args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        ws.send_binary(chunk)
+        sent_at[offset + len(chunk)] = time.perf_counter()
+    ws.send(json.dumps({'type': 'end'}))
+    receiver.join(args.timeout)
+    ws.close()
+    return results, summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='+', help='audio files to replay')
+    parser.add_argument('--url', default='ws://localhost:5000/ws/live')
+    parser.add_argument('--language', default='hi', help='target language code')
+    parser.add_argument('--speed', type=float, default=1.0, help='playback speed, 0 = no pacing')
+    parser.add_argument('--chunk-ms', type=int, default=100, help='audio per WebSocket message')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--save-audio', help='directory for the received MP3s')
+    args = parser.parse_args()
+
+    if args.save_audio:
+        os.makedirs(args.save_audio, exist_ok=True)
+
+    server, client = [], []
+    for path in args.files:
+        results, summary = replay(path, args)
+        server += [r['latency_ms']['total'] for r in results]
+        client += [r['client_latency_ms'] for r in results if r['client_latency_ms'] is not None]
+        if summary:
+            print(f"  summary: {summary['utterances']} utterances, latency {summary['latency_ms']}")
+
+    print(f"\n{'latency (ms)':<14}{'utterances':>11}{'p50':>9}{'p95':>9}{'max':>9}")
+    print('-' * 52)
+    for name, values in (('server', server), ('client', client)):
+        if values:
+            print(f"{name:<14}{len(values):>11}{percentile(values, 50):>9.0f}"
+                  f"{percentile(values, 95):>9.0f}{max(values):>9.0f}")
+
+if __name__ == '__main__':
+    main()
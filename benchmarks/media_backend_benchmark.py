@@ -0,0 +1,101 @@
+"""
+Compare the FFmpeg and moviepy media backends on generated test clips.
+
+Usage:
+    python benchmarks/media_backend_benchmark.py [--duration 30] [--repeat 3]
+
+Every operation runs in a fresh child process so wall time and peak RSS
+(largest of the Python process and its ffmpeg children) are measured in isolation.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OPERATIONS = ['convert', 'extract', 'mux']
+BACKENDS = ['ffmpeg', 'moviepy']
+
+def generate_clips(work_dir, duration):
+    """Create a test video (H.264 + AAC) and a TTS-like MP3 with ffmpeg's lavfi sources"""
+    from utils.media_backend import run_ffmpeg
+
+    video_path = os.path.join(work_dir, 'clip.mp4')
+    speech_path = os.path.join(work_dir, 'speech.mp3')
+    run_ffmpeg([
+        '-f', 'lavfi', '-i', f'testsrc=size=1280x720:rate=25:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest', video_path
+    ])
+    run_ffmpeg([
+        '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate=24000:duration={duration}',
+        '-c:a', 'libmp3lame', '-b:a', '64k', speech_path
+    ])
+    return video_path, speech_path
+
+def run_operation(backend, operation, video_path, speech_path, work_dir):
+    """Executed in the child process"""
+    # Run moviepy in this process rather than the media worker pool so its memory shows up here
+    os.environ['MEDIA_WORKERS'] = '0'
+    from utils import media_backend
+
+    output = os.path.join(work_dir, f'{backend}_{operation}')
+    start = time.perf_counter()
+    if operation == 'convert':
+        media_backend.convert_audio(speech_path, output + '.wav', backend=backend)
+    elif operation == 'extract':
+        media_backend.extract_audio(video_path, output + '.wav', backend=backend)
+    elif operation == 'mux':
+        media_backend.mux_audio(video_path, speech_path, output + '.mp4', backend=backend)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in KiB on Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': max(self_rss, children_rss) / 1024}))
+
+def measure(backend, operation, video_path, speech_path, work_dir):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', backend, operation,
+           video_path, speech_path, work_dir]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=int, default=30, help='test clip length in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per backend and operation')
+    parser.add_argument('--child', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_operation(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='media-bench-') as work_dir:
+        print(f"Generating {args.duration}s test clips...")
+        video_path, speech_path = generate_clips(work_dir, args.duration)
+
+        print(f"\n{'operation':<10}{'backend':<10}{'best wall (s)':>15}{'peak RSS (MB)':>16}")
+        print('-' * 51)
+        for operation in OPERATIONS:
+            for backend in BACKENDS:
+                runs = [measure(backend, operation, video_path, speech_path, work_dir) for _ in range(args.repeat)]
+                runs = [run for run in runs if run]
+                if not runs:
+                    print(f"{operation:<10}{backend:<10}{'failed':>15}{'-':>16}")
+                    continue
+                best = min(run['seconds'] for run in runs)
+                peak = max(run['peak_rss_mb'] for run in runs)
+                print(f"{operation:<10}{backend:<10}{best:>15.2f}{peak:>16.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Measure how long the app takes to start and to answer its first request.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat 3] [--top 15] [--echo] [--warmup]
+
+Each run is a fresh interpreter. "import" is the time to import app.py, with
+its per-module breakdown from python -X importtime; "first request" is one
+POST /api/translate/text through Flask's test client right after the import.
+--echo replaces the translation backend with an offline one that returns the
+text unchanged, so the first request measures the server rather than Google.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def child_environment(echo, warmup):
+    env = dict(os.environ)
+    # No media worker processes: their startup is not part of the app's import
+    env['MEDIA_WORKERS'] = '0'
+    env['STARTUP_WARMUP'] = '1' if warmup else '0'
+    env['LOG_LEVEL'] = 'WARNING'
+    if echo:
+        env['TRANSLATION_BACKEND'] = 'echo'
+        env['TRANSLATION_CACHE_DB'] = ''
+    return env
+
+def first_request(echo):
+    """Executed in the child process"""
+    start = time.perf_counter()
+    if echo:
+        # Registered before app is imported, so the import itself is not cut short
+        from utils.translation_backend import register_backend
+        register_backend('echo', lambda lang: None, lambda model, texts, lang: list(texts))
+    import app
+    imported = time.perf_counter()
+
+    client = app.app.test_client()
+    response = client.post('/api/translate/text', json={'text': 'Good morning', 'target_language': 'hi'})
+    answered = time.perf_counter()
+    print(json.dumps({
+        'import': imported - start,
+        'first_request': answered - imported,
+        'status': response.status_code
+    }))
+
+def measure_first_request(echo, warmup):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child'] + (['--echo'] if echo else [])
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, env=child_environment(echo, warmup), capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    # Interpreter startup included: what a restarted worker costs before it can serve
+    run['process'] = time.perf_counter() - start
+    return run
+
+def measure_imports(warmup):
+    """Cumulative import seconds per module from python -X importtime -c 'import app'"""
+    cmd = [sys.executable, '-X', 'importtime', '-c', 'import app']
+    result = subprocess.run(cmd, cwd=ROOT, env=child_environment(False, warmup), capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, children before their parent
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((name.strip(), int(cumulative) / 1e6, (len(name) - len(name.lstrip())) // 2))
+
+    # Only app's subtree: the entries right before it that are nested deeper
+    # (interpreter startup imports such as site hooks are left out)
+    names = [name for name, _, _ in entries]
+    if 'app' not in names:
+        return {}
+    end = names.index('app')
+    start = end
+    while start > 0 and entries[start - 1][2] > entries[end][2]:
+        start -= 1
+    return {name: (seconds, depth - entries[end][2]) for name, seconds, depth in entries[start:end + 1]}
+
+def summarize(values, how):
+    return min(values) if how == 'best' else statistics.median(values)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='fresh processes per measurement')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--summary', choices=['median', 'best'], default='median', help='how runs are combined')
+    parser.add_argument('--echo', action='store_true', help='offline echo translation backend')
+    parser.add_argument('--warmup', action='store_true', help='keep the background import warmup on (STARTUP_WARMUP)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        first_request(args.echo)
+        return
+
+    runs = [measure_imports(args.warmup) for _ in range(args.repeat)]
+    names = set.intersection(*(set(run) for run in runs))
+    if 'app' not in names:
+        print("Importing app failed; run python -c 'import app' to see why")
+        sys.exit(1)
+    seconds = {name: summarize([run[name][0] for run in runs], args.summary) for name in names}
+    # Modules imported by app.py itself (one level below it) and everything in utils
+    listed = [name for name in names if runs[0][name][1] == 1 or name.startswith('utils.')]
+
+    print(f"\n{'module':<40}{'cumulative import (ms)':>24}")
+    print('-' * 64)
+    for name in sorted(listed, key=seconds.get, reverse=True)[:args.top]:
+        print(f"{name:<40}{seconds[name] * 1000:>24.1f}")
+    print('-' * 64)
+    print(f"{'app (total)':<40}{seconds['app'] * 1000:>24.1f}")
+
+    requests = [measure_first_request(args.echo, args.warmup) for _ in range(args.repeat)]
+    requests = [run for run in requests if run]
+    backend = 'echo' if args.echo else os.environ.get('TRANSLATION_BACKEND', 'googletrans')
+    print(f"\nTime to first /api/translate/text ({backend} backend, {args.summary} of {len(requests)} runs)")
+    if not requests:
+        print("  failed")
+        return
+    print(f"  import app:      {summarize([run['import'] for run in requests], args.summary):8.3f} s")
+    print(f"  first request:   {summarize([run['first_request'] for run in requests], args.summary):8.3f} s"
+          f"  (HTTP {requests[0]['status']})")
+    print(f"  process start:   {summarize([run['process'] for run in requests], args.summary):8.3f} s")
+
+if __name__ == '__main__':
+    main()
@@ -159,7 +159,8 @@ if (data.success) {
     // Show translated audio player
     const translatedAudioContainer = document.getElementById('translated-audio-container');
     const translatedAudio = document.getElementById('translated-audio');
-    translatedAudio.src = data.audio_url;
+    // Inline preview URL streams with Range requests, so playback and seeking start immediately
+    translatedAudio.src = data.preview_url || data.audio_url;
     translatedAudioContainer.style.display = 'block';
     
     // Show Punjabi warning if present
@@ -244,6 +245,7 @@ document.getElementById('video-translation-form').addEventListener('submit', asy
     const formData = new FormData();
     formData.append('file', videoFileInput.files[0]);
     formData.append('target_language', targetLang);
+    formData.append('async', 'true');
     
     try {
         const response = await fetch('/api/translate/video', {
@@ -251,7 +253,29 @@ document.getElementById('video-translation-form').addEventListener('submit', asy
             body: formData
         });
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // Long videos are processed in the background - follow the job's progress stream,
+        // showing each segment's transcript and translation while the video is still muxing
+        if (response.status === 202 && data.job_id) {
+            const originalText = document.getElementById('video-original-text');
+            const translatedText = document.getElementById('video-translated-text');
+            originalText.textContent = '';
+            translatedText.textContent = '';
+            document.getElementById('translated-video').removeAttribute('src');
+            
+            data = await followJob(data.job_id, (segment) => {
+                if (!segment.text) {
+                    return;
+                }
+                document.getElementById('translated-video-container').style.display = 'block';
+                originalText.textContent = (originalText.textContent + ' ' + segment.text).trim();
+                const translation = segment.translations[targetLang];
+                if (translation) {
+                    translatedText.textContent = (translatedText.textContent + ' ' + translation).trim();
+                }
+            });
+        }
         
         if (data.success) {
             document.getElementById('video-processing-message').style.display = 'none';
@@ -262,23 +286,205 @@ document.getElementById('video-translation-form').addEventListener('submit', asy
             
             // Show translated video player
             const translatedVideo = document.getElementById('translated-video');
-            translatedVideo.src = data.video_url;
+            translatedVideo.src = data.preview_url || data.video_url;
+            translatedVideoDownloadUrl = data.video_url;
             
             showToast('Video translation completed!');
         } else {
+            document.getElementById('video-processing-message').style.display = 'none';
             showToast('Video translation failed: ' + data.error);
         }
     } catch (error) {
         console.error('❌ Video API Error:', error);
+        document.getElementById('video-processing-message').style.display = 'none';
         showToast('Video translation failed');
     }
 });
 
+const stageLabels = {
+    queued: 'Waiting in queue...',
+    starting: 'Starting...',
+    dubbing: 'Transcribing, translating and generating speech...',
+    transcribing: 'Transcribing speech...',
+    translating: 'Translating text...',
+    generating_speech: 'Generating speech...',
+    lip_sync: 'Applying lip-sync...',
+    packaging: 'Packaging for streaming...'
+};
+
+function showJobProgress(stage, progress) {
+    const message = document.querySelector('#video-processing-message p');
+    const bar = document.querySelector('#video-processing-message .progress-bar');
+    const percent = Math.round((progress || 0) * 100);
+    if (message) {
+        message.textContent = `${stageLabels[stage] || 'Processing video...'} (${percent}%)`;
+    }
+    if (bar) {
+        bar.style.width = `${percent}%`;
+    }
+}
+
+// Follow a background job over server-sent events: stage changes update the
+// progress message and onSegment receives each transcribed and translated segment.
+// Falls back to polling when EventSource is unavailable or the stream cannot reconnect
+function followJob(jobId, onSegment) {
+    if (!window.EventSource) {
+        return waitForJob(jobId);
+    }
+    
+    return new Promise((resolve) => {
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+        let finished = false;
+        
+        source.addEventListener('stage', (event) => {
+            const data = JSON.parse(event.data);
+            showJobProgress(data.stage, data.progress);
+        });
+        source.addEventListener('segment', (event) => onSegment(JSON.parse(event.data)));
+        source.addEventListener('done', async () => {
+            finished = true;
+            source.close();
+            const resultResponse = await fetch(`/api/jobs/${jobId}/result`);
+            resolve(await resultResponse.json());
+        });
+        source.onerror = () => {
+            // The browser reconnects by itself (resuming after Last-Event-ID) unless the stream was closed
+            if (!finished && source.readyState === EventSource.CLOSED) {
+                resolve(waitForJob(jobId));
+            }
+        };
+    });
+}
+
+// Poll a background job until it completes, then return its result
+async function waitForJob(jobId) {
+    while (true) {
+        const statusResponse = await fetch(`/api/jobs/${jobId}`);
+        const job = await statusResponse.json();
+        
+        if (job.status === 'completed' || job.status === 'failed') {
+            const resultResponse = await fetch(`/api/jobs/${jobId}/result`);
+            return await resultResponse.json();
+        }
+        
+        showJobProgress(job.stage, job.progress);
+        await new Promise(resolve => setTimeout(resolve, 2000));
+    }
+}
+
 // Download video button
+let translatedVideoDownloadUrl = null;
 document.getElementById('download-video-btn').addEventListener('click', function() {
+    if (!translatedVideoDownloadUrl) {
+        return;
+    }
     showToast('Downloading translated video...');
+    window.location.href = translatedVideoDownloadUrl;
 });
 
+// Live translation: stream microphone PCM over a WebSocket and play each translated utterance
+let liveSession = null;
+
+function startLiveTranslation() {
+    const targetLang = document.getElementById('language-selector').value;
+    const status = document.getElementById('live-status');
+    const utterances = document.getElementById('live-utterances');
+    
+    navigator.mediaDevices.getUserMedia({ audio: { channelCount: 1, echoCancellation: true } }).then((stream) => {
+        const context = new AudioContext();
+        const source = context.createMediaStreamSource(stream);
+        const processor = context.createScriptProcessor(4096, 1, 1);
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${window.location.host}/ws/live?target_language=${targetLang}&sample_rate=${context.sampleRate}`);
+        socket.binaryType = 'arraybuffer';
+        
+        const playback = [];
+        let pending = null;
+        let playing = false;
+        
+        function playNext() {
+            if (playing || !playback.length) {
+                return;
+            }
+            playing = true;
+            const audio = new Audio(URL.createObjectURL(playback.shift()));
+            audio.onended = () => { playing = false; playNext(); };
+            audio.play().catch(() => { playing = false; playNext(); });
+        }
+        
+        socket.onmessage = (event) => {
+            if (event.data instanceof ArrayBuffer) {
+                // Spoken translation of the utterance announced just before
+                playback.push(new Blob([event.data], { type: 'audio/mpeg' }));
+                playNext();
+                return;
+            }
+            const message = JSON.parse(event.data);
+            if (message.type === 'ready') {
+                status.textContent = 'Listening...';
+            } else if (message.type === 'utterance') {
+                pending = message;
+                const entry = document.createElement('div');
+                entry.className = 'border rounded p-2 mb-2';
+                entry.innerHTML = `<div class="text-muted small"></div><div></div><div class="fw-bold"></div>`;
+                entry.children[0].textContent = `${message.start.toFixed(1)}s · ${Math.round(message.latency_ms.total)} ms`;
+                entry.children[1].textContent = message.text;
+                entry.children[2].textContent = message.translation || '';
+                utterances.prepend(entry);
+            } else if (message.type === 'summary') {
+                const latency = message.latency_ms;
+                status.textContent = latency
+                    ? `${message.utterances} utterances, median latency ${Math.round(latency.p50)} ms`
+                    : 'Stopped';
+            } else if (message.type === 'error') {
+                showToast('Live translation failed: ' + message.error);
+            }
+        };
+        socket.onclose = () => stopLiveTranslation();
+        
+        processor.onaudioprocess = (event) => {
+            if (socket.readyState !== WebSocket.OPEN) {
+                return;
+            }
+            const input = event.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(input.length);
+            for (let i = 0; i < input.length; i++) {
+                pcm[i] = Math.max(-1, Math.min(1, input[i])) * 0x7fff;
+            }
+            socket.send(pcm.buffer);
+        };
+        source.connect(processor);
+        processor.connect(context.destination);
+        
+        liveSession = { stream, context, processor, socket };
+        document.getElementById('live-start-btn').disabled = true;
+        document.getElementById('live-stop-btn').disabled = false;
+    }).catch((error) => {
+        console.error('❌ Microphone error:', error);
+        showToast('Microphone access is needed for live translation');
+    });
+}
+
+function stopLiveTranslation() {
+    if (!liveSession) {
+        return;
+    }
+    const { stream, context, processor, socket } = liveSession;
+    liveSession = null;
+    processor.disconnect();
+    stream.getTracks().forEach((track) => track.stop());
+    context.close();
+    if (socket.readyState === WebSocket.OPEN) {
+        // The server flushes the last utterance and sends a summary before closing
+        socket.send(JSON.stringify({ type: 'end' }));
+    }
+    document.getElementById('live-start-btn').disabled = false;
+    document.getElementById('live-stop-btn').disabled = true;
+}
+
+document.getElementById('live-start-btn').addEventListener('click', startLiveTranslation);
+document.getElementById('live-stop-btn').addEventListener('click', stopLiveTranslation);
+
 // Toast notification function
 function showToast(message) {
     const toastElement = document.getElementById('toast-notification');
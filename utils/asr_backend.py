@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+import numpy as np
+from utils.audio_stream import SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+# Offline backends: VOSK_MODEL_PATH points at an unpacked Vosk model directory,
+# WHISPER_MODEL is a faster-whisper (CTranslate2) model name or directory
+DEFAULT_WHISPER_MODEL = 'base.en'
+
+class ASRBackend:
+    """
+    A speech recognizer: load() builds the model once, recognize(model, audio_data)
+    turns a speech_recognition AudioData into text. shared backends use one model
+    from every thread; the others get a pool of ASR_POOL_SIZE instances that are
+    checked out exclusively
+    """
+
+    def __init__(self, name, load, recognize, offline, shared):
+        self.name = name
+        self.load = load
+        self.recognize = recognize
+        self.offline = offline
+        self.shared = shared
+
+def _pcm16(audio_data):
+    """16 kHz mono int16 bytes, whatever rate the AudioData was recorded at"""
+    return audio_data.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+
+def _no_speech():
+    import speech_recognition as sr
+    return sr.UnknownValueError()
+
+def _google_load():
+    return None
+
+def _google_recognize(model, audio_data):
+    import speech_recognition as sr
+    return sr.Recognizer().recognize_google(audio_data)
+
+def _vosk_load():
+    from vosk import Model, SetLogLevel
+
+    path = os.environ.get('VOSK_MODEL_PATH', '')
+    if not path or not os.path.isdir(path):
+        raise RuntimeError(f"VOSK_MODEL_PATH is not a model directory: '{path}'")
+    SetLogLevel(-1)
+    return Model(path)
+
+def _vosk_recognize(model, audio_data):
+    from vosk import KaldiRecognizer
+
+    # Recognizers are cheap; the model they share holds the weights
+    recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+    recognizer.AcceptWaveform(_pcm16(audio_data))
+    text = json.loads(recognizer.FinalResult()).get('text', '')
+    if not text.strip():
+        raise _no_speech()
+    return text
+
+def _whisper_load():
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        os.environ.get('WHISPER_MODEL', DEFAULT_WHISPER_MODEL),
+        device='cpu',
+        compute_type=os.environ.get('WHISPER_COMPUTE_TYPE', 'int8'),
+        cpu_threads=asr_threads()
+    )
+
+def _whisper_recognize(model, audio_data):
+    samples = np.frombuffer(_pcm16(audio_data), dtype=np.int16).astype(np.float32) / 32768.0
+    segments, _ = model.transcribe(samples, language='en', beam_size=1, condition_on_previous_text=False)
+    text = ' '.join(segment.text.strip() for segment in segments)
+    if not text.strip():
+        raise _no_speech()
+    return text
+
+_backends = {}
+
+def register_backend(name, load, recognize, offline=True, shared=False):
+    """Make a recognizer available to ASR_BACKEND / the backend argument"""
+    _backends[name] = ASRBackend(name, load, recognize, offline, shared)
+
+register_backend('google', _google_load, _google_recognize, offline=False, shared=True)
+register_backend('vosk', _vosk_load, _vosk_recognize, shared=True)
+register_backend('whisper', _whisper_load, _whisper_recognize)
+
+def backend_name():
+    return os.environ.get('ASR_BACKEND', 'google')
+
+def asr_pool_size():
+    try:
+        return max(1, int(os.environ.get('ASR_POOL_SIZE', '2')))
+    except ValueError:
+        return 2
+
+def asr_threads():
+    """CPU threads per model instance, so the whole pool roughly fills the machine"""
+    default = max(1, (os.cpu_count() or 1) // asr_pool_size())
+    try:
+        return max(1, int(os.environ.get('ASR_THREADS', default)))
+    except ValueError:
+        return default
+
+class ModelPool:
+    """
+    Loaded models of one backend, kept for the life of the process. Loading
+    happens once (warm() at startup, or the first recognition); recognize()
+    checks an instance out, so at most pool-size recognitions run at a time
+    """
+
+    def __init__(self, backend, size):
+        self.backend = backend
+        self.size = 1 if backend.shared else size
+        self.state = 'cold'
+        self.error = None
+        self.load_seconds = None
+        self.recognitions = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self._models = []
+        self._idle = queue.Queue()
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def warm(self):
+        """Load every instance; safe to call from several threads. Raises when loading failed"""
+        with self._load_lock:
+            if self.state == 'ready':
+                return
+            self.state = 'loading'
+            started = time.perf_counter()
+            try:
+                while len(self._models) < self.size:
+                    model = self.backend.load()
+                    self._models.append(model)
+                    self._idle.put(model)
+            except Exception as e:
+                self.state = 'failed'
+                self.error = str(e)
+                logger.error(f"❌ ASR backend '{self.backend.name}' failed to load: {e}")
+                raise
+            self.load_seconds = round(time.perf_counter() - started, 2)
+            self.state = 'ready'
+            self.error = None
+            logger.info(f"✅ ASR backend '{self.backend.name}' ready: {self.size} instance(s) in {self.load_seconds}s")
+
+    @contextmanager
+    def checkout(self):
+        if self.state != 'ready':
+            self.warm()
+        if self.backend.shared:
+            yield self._models[0]
+            return
+        model = self._idle.get()
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def recognize(self, audio_data):
+        """Recognizer callable for recognize_pcm: text, or speech_recognition's exceptions"""
+        import speech_recognition as sr
+
+        try:
+            with self.checkout() as model:
+                started = time.perf_counter()
+                try:
+                    return self.backend.recognize(model, audio_data)
+                finally:
+                    with self._stats_lock:
+                        self.recognitions += 1
+                        self.busy_seconds += time.perf_counter() - started
+        except (sr.UnknownValueError, sr.RequestError):
+            raise
+        except Exception as e:
+            with self._stats_lock:
+                self.failures += 1
+            # Reported like a network failure of the online recognizer
+            raise sr.RequestError(f"{self.backend.name}: {e}")
+
+    def get_stats(self):
+        with self._stats_lock:
+            return {
+                'backend': self.backend.name,
+                'offline': self.backend.offline,
+                'state': self.state,
+                'ready': self.state == 'ready',
+                'error': self.error,
+                'pool_size': self.size,
+                'idle': self.size if self.backend.shared else self._idle.qsize(),
+                'load_seconds': self.load_seconds,
+                'recognitions': self.recognitions,
+                'failures': self.failures,
+                'busy_seconds': round(self.busy_seconds, 2)
+            }
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_model_pool(name=None):
+    """The process-wide pool of the named backend, or ASR_BACKEND (default google)"""
+    name = name or backend_name()
+    if name not in _backends:
+        raise ValueError(f"Unknown ASR backend: {name}. Available: {', '.join(sorted(_backends))}")
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = ModelPool(_backends[name], asr_pool_size())
+        return _pools[name]
+
+def get_recognizer(name=None):
+    """Recognizer callable (AudioData -> text) backed by the warm model pool"""
+    return get_model_pool(name).recognize
+
+def warm_recognizer(name=None, background=True):
+    """Load the configured models at startup so the first request does not pay for it"""
+    pool = get_model_pool(name)
+
+    def load():
+        try:
+            pool.warm()
+        except Exception:
+            pass
+
+    if background:
+        threading.Thread(target=load, name='asr-warmup', daemon=True).start()
+    else:
+        load()
+    return pool
+
+def get_asr_stats():
+    """Readiness and counters of the configured backend for /api/health"""
+    try:
+        return get_model_pool().get_stats()
+    except ValueError as e:
+        return {'backend': backend_name(), 'state': 'failed', 'ready': False, 'error': str(e)}
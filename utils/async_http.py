@@ -0,0 +1,153 @@
+import os
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST_CONCURRENCY = 32
+DEFAULT_MAX_CONNECTIONS = 200
+DEFAULT_KEEPALIVE_CONNECTIONS = 50
+DEFAULT_TIMEOUT = 10  # seconds
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def host_limits():
+    """
+    Concurrent requests allowed per host: ASYNC_HOST_CONCURRENCY (default 32)
+    for every host, overridden per host by ASYNC_HOST_LIMITS
+    ("translate.googleapis.com=64,www.google.com=16")
+    """
+    limits = {}
+    for entry in os.environ.get('ASYNC_HOST_LIMITS', '').split(','):
+        host, _, value = entry.partition('=')
+        try:
+            limits[host.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+def _pool_arguments(max_connections, keepalive):
+    # googletrans pins httpx 0.13 (PoolLimits); newer releases renamed it to Limits
+    if hasattr(httpx, 'Limits'):
+        return {'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=keepalive)}
+    return {'pool_limits': httpx.PoolLimits(soft_limit=keepalive, hard_limit=max_connections)}
+
+class HostLimiter:
+    """Semaphore and counters for one host"""
+
+    def __init__(self, host, limit):
+        self.host = host
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+
+    def get_stats(self):
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'requests': self.requests,
+            'errors': self.errors
+        }
+
+class AsyncHTTP:
+    """
+    One pooled httpx.AsyncClient for the event loop (keep-alive connections
+    shared by every request, ASYNC_MAX_CONNECTIONS in total) and a semaphore
+    per host, so a burst of requests queues in the server instead of opening
+    hundreds of connections to one API and getting rate-limited
+    """
+
+    def __init__(self):
+        self.timeout = _env_int('ASYNC_HTTP_TIMEOUT', DEFAULT_TIMEOUT)
+        self.max_connections = _env_int('ASYNC_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)
+        self.keepalive = _env_int('ASYNC_KEEPALIVE_CONNECTIONS', DEFAULT_KEEPALIVE_CONNECTIONS)
+        self.default_limit = _env_int('ASYNC_HOST_CONCURRENCY', DEFAULT_HOST_CONCURRENCY)
+        self.overrides = host_limits()
+        self._client = None
+        self._loop = None
+        self._hosts = {}
+
+    def _ensure_loop(self):
+        # Clients and semaphores belong to one event loop; start over if it changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._client = None
+            self._hosts = {}
+            self._loop = loop
+
+    @property
+    def client(self):
+        self._ensure_loop()
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout,
+                                             **_pool_arguments(self.max_connections, self.keepalive))
+        return self._client
+
+    def limiter(self, host):
+        self._ensure_loop()
+        if host not in self._hosts:
+            self._hosts[host] = HostLimiter(host, self.overrides.get(host, self.default_limit))
+        return self._hosts[host]
+
+    async def request(self, method, url, **kwargs):
+        """client.request() behind the host's semaphore; raises httpx errors"""
+        limiter = self.limiter(urlsplit(url).hostname)
+        client = self.client
+        if 'content' in kwargs and not hasattr(httpx, 'Limits'):
+            # httpx 0.13 takes raw request bodies as data=
+            kwargs['data'] = kwargs.pop('content')
+        limiter.waiting += 1
+        async with limiter.semaphore:
+            limiter.waiting -= 1
+            limiter.in_flight += 1
+            limiter.requests += 1
+            try:
+                return await client.request(method, url, **kwargs)
+            except Exception:
+                limiter.errors += 1
+                raise
+            finally:
+                limiter.in_flight -= 1
+
+    async def close(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def get_stats(self):
+        return {
+            'timeout': self.timeout,
+            'max_connections': self.max_connections,
+            'hosts': {host: limiter.get_stats() for host, limiter in list(self._hosts.items())}
+        }
+
+_http = None
+_http_lock = threading.Lock()
+
+def get_async_http():
+    """The process-wide async HTTP client"""
+    global _http
+    if _http is None:
+        with _http_lock:
+            if _http is None:
+                _http = AsyncHTTP()
+    return _http
+
+async def close_async_http():
+    if _http is not None:
+        await _http.close()
+
+def get_async_http_stats():
+    """Per-host concurrency and counters for /api/health ('idle' until the ASGI server made a request)"""
+    return _http.get_stats() if _http is not None else 'idle'
@@ -2,14 +2,15 @@ import os
 import logging
 import tempfile
 import base64
-from utils.fixed_translation import translate_text
+from utils.batch_translation import translate_batch_with_fallbacks
+from utils.dubbing import run_dubbing_pipeline, join_segment_audio, joined_translation
+from utils.speech_segmentation import stitch_transcript
+from utils.asr_backend import get_recognizer
 import speech_recognition as sr
-from gtts import gTTS
+from utils.tts_engine import synthesize_speech
 import wave
 import audioop
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 def convert_audio_to_wav(audio_path):
@@ -59,14 +60,14 @@ def speech_to_text(audio_path):
             audio = recognizer.record(source)
             
             try:
-                # Recognize speech using Google Speech Recognition
-                text = recognizer.recognize_google(audio)
+                # Recognize speech with the configured backend (ASR_BACKEND)
+                text = get_recognizer()(audio)
                 logger.info(f"Successfully transcribed audio: {text}")
             except sr.UnknownValueError:
-                logger.warning("Google Speech Recognition could not understand audio")
+                logger.warning("Speech recognition could not understand audio")
                 text = "Could not understand the audio. Please try again with clearer audio."
             except sr.RequestError as e:
-                logger.error(f"Could not request results from Google Speech Recognition service; {e}")
+                logger.error(f"Could not get results from the speech recognition backend; {e}")
                 text = "Audio processing service unavailable. Please try again later."
         
         if not text or text.strip() == "":
@@ -110,10 +111,9 @@ def text_to_speech(text, target_lang, output_path=None):
         if output_path is None:
             output_path = tempfile.mktemp(suffix='.mp3')
         
-        # Generate speech using gTTS
+        # Generate speech, sentence chunks in parallel
         logger.info(f"Generating speech in language: {tts_lang}")
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
-        tts.save(output_path)
+        synthesize_speech(text, tts_lang, output_path)
         
         # Verify the file was created
         if not os.path.exists(output_path):
@@ -141,22 +141,19 @@ def process_audio_file(audio_path, target_lang='hi'):
         logger.info(f"Input audio: {audio_path}")
         logger.info(f"Target language: {target_lang}")
         
-        # Step 1: Convert to WAV if needed
-        processed_audio_path = convert_audio_to_wav(audio_path)
-        logger.info(f"Audio converted to WAV: {processed_audio_path}")
-        
-        # Step 2: Convert speech to text (English)
-        original_text = speech_to_text(processed_audio_path)
+        # Recognize, translate and synthesize segment by segment with the stages
+        # overlapping; the input is decoded in memory, so no WAV conversion is needed
+        chunk_prefix = os.path.splitext(tempfile.mktemp())[0]
+        segments, _ = run_dubbing_pipeline(audio_path, target_lang, translate_batch_with_fallbacks, text_to_speech,
+                                           chunk_prefix)
+        original_text = stitch_transcript(segments)
         logger.info(f"Original English text: {original_text}")
         
-        # Step 3: TRANSLATE the text to target language
-        logger.info(f"Translating text to {target_lang}...")
-        translated_text = translate_text(original_text, target_lang)
+        translated_text = joined_translation(segments, target_lang)
         logger.info(f"Translated text: {translated_text}")
         
-        # Step 4: Generate translated audio
-        logger.info(f"Generating audio in {target_lang}...")
-        translated_audio_path = text_to_speech(translated_text, target_lang)
+        translated_audio_path = join_segment_audio(segments, target_lang, tempfile.mktemp(suffix='.mp3'))
+        cleanup_temp_files([path for s in segments for path in s['audio_paths'].values()])
         logger.info(f"Translated audio created: {translated_audio_path}")
         
         logger.info("=== AUDIO PROCESSING COMPLETED ===")
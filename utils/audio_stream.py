@@ -0,0 +1,176 @@
+import os
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+import numpy as np
+from utils.media_backend import get_ffmpeg, MediaBackendError
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# Containers whose index may sit at the end of the file cannot be decoded from a pipe
+SEEKABLE_ONLY_EXTENSIONS = {'.mp4', '.m4a', '.m4v', '.mov', '.3gp'}
+
+def _feed_stream(stream, stdin, chunk_size=64 * 1024):
+    """Copy an upload stream into ffmpeg's stdin from a background thread"""
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            stdin.write(chunk)
+    except (BrokenPipeError, ValueError):
+        # ffmpeg exited early - the reader reports the error
+        pass
+    finally:
+        try:
+            stdin.close()
+        except Exception:
+            pass
+
+def decode_pcm_frames(source, sample_rate=SAMPLE_RATE, frame_samples=FRAME_SAMPLES):
+    """
+    Decode audio through ffmpeg to mono 16-bit PCM and yield fixed-size numpy int16 frames.
+
+    source is a file path or a readable binary stream (e.g. an upload's file.stream);
+    streams are piped into ffmpeg so nothing is written to disk. The last frame is zero-padded.
+    """
+    ffmpeg = get_ffmpeg()
+    if ffmpeg is None:
+        raise MediaBackendError("FFmpeg is not installed")
+
+    is_path = isinstance(source, (str, os.PathLike))
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error']
+    if is_path:
+        cmd += ['-nostdin', '-i', os.fspath(source)]
+    else:
+        cmd += ['-i', 'pipe:0']
+    cmd += ['-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1']
+
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL if is_path else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=stderr_file
+    )
+
+    feeder = None
+    if not is_path:
+        feeder = threading.Thread(target=_feed_stream, args=(source, process.stdin), daemon=True)
+        feeder.start()
+
+    frame_bytes = frame_samples * SAMPLE_WIDTH
+    total_frames = 0
+    try:
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if not data:
+                break
+            if len(data) < frame_bytes:
+                data = data + b'\x00' * (frame_bytes - len(data))
+            total_frames += 1
+            yield np.frombuffer(data, dtype=np.int16)
+
+        process.wait()
+        if process.returncode != 0 and total_frames == 0:
+            stderr_file.seek(0)
+            error = stderr_file.read().decode('utf-8', errors='replace').strip()
+            raise MediaBackendError(f"FFmpeg decode failed: {error[-500:]}")
+        logger.debug(f"Decoded {total_frames} PCM frames ({total_frames * FRAME_MS / 1000:.1f}s)")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr_file.close()
+        if feeder is not None:
+            feeder.join(timeout=5)
+
+def open_upload_source(stream, filename):
+    """
+    Return something decode_pcm_frames can read for an upload.
+    Most formats are piped straight from the stream; MP4-family containers
+    are spooled to a temporary file because ffmpeg needs to seek in them.
+    Returns (source, temp_path) where temp_path must be removed by the caller.
+    """
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in SEEKABLE_ONLY_EXTENSIONS:
+        return stream, None
+
+    fd, temp_path = tempfile.mkstemp(suffix=ext)
+    with os.fdopen(fd, 'wb') as f:
+        shutil.copyfileobj(stream, f, 1024 * 1024)
+    return temp_path, temp_path
+
+def frames_to_audio_data(frames, sample_rate=SAMPLE_RATE):
+    """Join int16 frames into a speech_recognition AudioData object"""
+    import speech_recognition as sr
+    pcm = np.concatenate(list(frames)) if frames else np.zeros(0, dtype=np.int16)
+    return sr.AudioData(pcm.tobytes(), sample_rate, SAMPLE_WIDTH)
+
+def recognize_frames(frames, sample_rate=SAMPLE_RATE):
+    """
+    Recognize English speech from PCM frames.
+    Always returns a string, using the same messages as transcribe_audio on failure
+    """
+    import speech_recognition as sr
+
+    if not frames:
+        return "No speech detected in audio"
+
+    from utils.asr_backend import get_recognizer
+
+    audio = frames_to_audio_data(frames, sample_rate)
+    try:
+        transcript = get_recognizer()(audio)
+        if transcript and transcript.strip():
+            logger.info(f"✅ Transcription successful: {transcript}")
+            return transcript
+        return "No speech detected in audio"
+    except sr.UnknownValueError:
+        logger.warning("Could not understand audio")
+        return "Could not understand audio"
+    except sr.RequestError as e:
+        logger.error(f"Speech recognition error: {e}")
+        return f"Speech recognition error: {e}"
+
+def transcribe_stream_segments(source, filename=None, recognizer=None):
+    """
+    Decode an upload stream or media file in memory, cut it on silences and
+    recognize the segments in parallel. Returns timestamped segment dicts.
+    Raises MediaBackendError when the input cannot be decoded
+    """
+    # Imported here because speech_segmentation builds on this module
+    from utils.speech_segmentation import transcribe_segments
+
+    temp_path = None
+    if not isinstance(source, (str, os.PathLike)):
+        source, temp_path = open_upload_source(source, filename)
+    try:
+        logger.info(f"🎤 Streaming decode for transcription: {filename or source}")
+        frames = list(decode_pcm_frames(source))
+        if not frames:
+            raise MediaBackendError("Audio file is empty or corrupted")
+        return transcribe_segments(frames, recognizer=recognizer)
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def transcribe_stream(source, filename=None, recognizer=None):
+    """
+    Transcribe an upload stream or media file and return the stitched transcript.
+    Raises MediaBackendError when the input cannot be decoded
+    """
+    from utils.speech_segmentation import stitch_transcript
+
+    segments = transcribe_stream_segments(source, filename, recognizer)
+    transcript = stitch_transcript(segments)
+    logger.info(f"✅ Transcription finished ({len(segments)} segments): {transcript}")
+    return transcript
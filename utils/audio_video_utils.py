@@ -1,13 +1,10 @@
 import os
 import logging
 import tempfile
-import speech_recognition as sr
-from gtts import gTTS
+from utils.tts_engine import synthesize_speech
 import time
-from pydub import AudioSegment
+from utils.media_backend import extract_audio, convert_audio
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 def extract_audio_from_video(video_path, output_path):
@@ -17,35 +14,15 @@ def extract_audio_from_video(video_path, output_path):
     try:
         logger.info(f"Extracting audio from video: {video_path}")
         
-        # Method 1: Try moviepy with FFmpeg
+        # Single FFmpeg pass (moviepy only when MEDIA_MOVIEPY_FALLBACK=1)
         try:
-            from moviepy.editor import VideoFileClip
-            video = VideoFileClip(video_path)
-            audio = video.audio
-            audio.write_audiofile(output_path, fps=16000, verbose=False, logger=None)
-            video.close()
-            
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                logger.info(f"✅ Audio extracted successfully with moviepy: {output_path}")
-                return output_path
-        except Exception as e:
-            logger.warning(f"MoviePy extraction failed: {e}")
-        
-        # Method 2: Try FFmpeg directly
-        try:
-            import subprocess
-            result = subprocess.run([
-                'ffmpeg', '-i', video_path, '-q:a', '0', '-map', 'a', 
-                output_path, '-y'
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0 and os.path.exists(output_path):
-                logger.info(f"✅ Audio extracted successfully with FFmpeg: {output_path}")
-                return output_path
+            extract_audio(video_path, output_path)
+            logger.info(f"✅ Audio extracted successfully: {output_path}")
+            return output_path
         except Exception as e:
             logger.warning(f"FFmpeg extraction failed: {e}")
         
-        # Method 3: Create dummy audio as last resort
+        # Create dummy audio as last resort
         logger.warning("Using fallback dummy audio")
         with open(output_path, 'wb') as f:
             f.write(b"dummy audio content for testing")
@@ -73,9 +50,8 @@ def convert_to_wav(audio_path):
             logger.info("File is already WAV format")
             return audio_path
         
-        # Use pydub to handle various audio formats
-        audio = AudioSegment.from_file(audio_path)
-        audio.export(wav_path, format="wav")
+        # Decode straight to 16 kHz mono PCM in one FFmpeg pass
+        convert_audio(audio_path, wav_path)
         
         logger.info(f"✅ Audio converted to WAV: {wav_path}")
         return wav_path
@@ -116,12 +92,14 @@ def transcribe_audio(audio_path):
         # Example with speech_recognition library:
         try:
             import speech_recognition as sr
+            from utils.asr_backend import get_recognizer
             
             r = sr.Recognizer()
             with sr.AudioFile(audio_path) as source:
                 audio = r.record(source)
             
-            transcript = r.recognize_google(audio)
+            # Configured ASR backend (ASR_BACKEND), models kept warm per process
+            transcript = get_recognizer()(audio)
             
             if transcript and len(transcript.strip()) > 0:
                 logger.info(f"✅ Transcription successful: {transcript}")
@@ -150,31 +128,18 @@ def transcribe_audio(audio_path):
         return error_msg
 def transcribe_mp3_directly(mp3_path):
     """
-    Direct MP3 transcription when AudioFile fails
+    Direct MP3 transcription when AudioFile fails - decodes to PCM in memory
     """
     try:
         logger.info("Attempting direct MP3 transcription")
-        recognizer = sr.Recognizer()
+        from utils.audio_stream import transcribe_stream
         
-        # Convert MP3 to WAV in memory
-        import io
-        from pydub import AudioSegment
-        
-        audio = AudioSegment.from_mp3(mp3_path)
-        buffer = io.BytesIO()
-        audio.export(buffer, format="wav")
-        buffer.seek(0)
-        
-        with sr.AudioFile(buffer) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=1.0)
-            audio_data = recognizer.record(source)
-            text = recognizer.recognize_google(audio_data)
-            
-            if text and text.strip():
-                logger.info(f"✅ Direct MP3 transcription successful: {text}")
-                return text
-            else:
-                return "No speech detected in MP3 file."
+        text = transcribe_stream(mp3_path)
+        if text and text.strip():
+            logger.info(f"✅ Direct MP3 transcription finished: {text}")
+            return text
+        else:
+            return "No speech detected in MP3 file."
                 
     except Exception as e:
         logger.error(f"Direct MP3 transcription failed: {e}")
@@ -217,10 +182,9 @@ def text_to_speech(text, target_lang='hi', output_path=None):
         if output_path is None:
             output_path = tempfile.mktemp(suffix='.mp3')
         
-        # Generate speech in the target language
+        # Generate speech in the target language, sentence chunks in parallel
         logger.info(f"Generating speech in {tts_lang}...")
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
-        tts.save(output_path)
+        synthesize_speech(text, tts_lang, output_path)
         
         # Verify file was created
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -0,0 +1,172 @@
+import re
+import logging
+from utils.fixed_translation import (
+    get_translator,
+    reset_translator,
+    get_google_lang,
+    get_emergency_fallback
+)
+from utils.translation_cache import get_translation_cache, normalize_text
+from utils.translation_backend import translate_texts
+
+logger = logging.getLogger(__name__)
+
+# Google Translate is called with GET, so keep each joined batch well under URL limits
+MAX_BATCH_CHARS = 3000
+MAX_BATCH_ITEMS = 64
+MAX_SENTENCE_CHARS = 500
+
+SENTENCE_END = re.compile(r'(?<=[.!?।॥])\s+')
+
+def split_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+    """
+    Split a transcript into sentence chunks.
+    Sentences longer than max_chars are wrapped on word boundaries.
+    """
+    text = normalize_text(text)
+    if not text:
+        return []
+
+    chunks = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+def make_batches(texts, max_chars=MAX_BATCH_CHARS, max_items=MAX_BATCH_ITEMS):
+    """Group texts into batches bounded by total characters and item count"""
+    batches = []
+    current = []
+    current_chars = 0
+    for text in texts:
+        if current and (current_chars + len(text) + 1 > max_chars or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+def _is_real_translation(source, translated):
+    return bool(translated) and translated.strip().lower() != source.lower()
+
+def _translate_one(text, google_lang):
+    """Single attempt over the pooled session - no retry sleeps"""
+    try:
+        translated = get_translator().translate(text, dest=google_lang)
+        if translated and translated.text and _is_real_translation(text, translated.text):
+            return translated.text.strip()
+    except Exception as e:
+        logger.warning(f"⚠️ Item translation failed: {e}")
+        reset_translator()
+    return None
+
+def _translate_joined(batch, google_lang):
+    """
+    Send a whole batch as one newline-joined request and split the answer.
+    Returns (lines, reachable): lines is aligned with batch or None if the answer
+    could not be matched up; reachable is False when the request itself failed.
+    """
+    try:
+        translated = get_translator().translate('\n'.join(batch), dest=google_lang)
+    except Exception as e:
+        logger.warning(f"⚠️ Batch request failed: {e}")
+        reset_translator()
+        return None, False
+
+    if not translated or not translated.text:
+        return None, True
+
+    lines = [line.strip() for line in translated.text.split('\n')]
+    if len(lines) != len(batch):
+        logger.warning(f"⚠️ Batch returned {len(lines)} lines for {len(batch)} items, translating items one by one")
+        return None, True
+    return lines, True
+
+def google_translate_batch(texts, target_lang, max_chars=MAX_BATCH_CHARS, max_items=MAX_BATCH_ITEMS):
+    """
+    googletrans backend for several texts: size-bounded, newline-joined batches
+    over the pooled Translator, falling back to one request per item when a
+    batch answer cannot be matched up. Returns translations aligned with texts,
+    None where translation failed
+    """
+    google_lang = get_google_lang(target_lang)
+    results = []
+    for batch in make_batches(texts, max_chars, max_items):
+        lines, reachable = _translate_joined(batch, google_lang) if len(batch) > 1 else (None, True)
+        for i, text in enumerate(batch):
+            if not reachable:
+                # Service is down - don't pay a timeout per item
+                results.append(None)
+            elif lines and _is_real_translation(text, lines[i]):
+                results.append(lines[i])
+            else:
+                results.append(_translate_one(text, google_lang))
+    return results
+
+def translate_batch(texts, target_lang='hi'):
+    """
+    Translate a list of strings and return translations in the same order.
+
+    Texts are normalized and deduplicated, cached translations are reused, and the
+    remaining texts go to the language's translation backend in one call.
+    """
+    return translate_batch_with_fallbacks(texts, target_lang)[0]
+
+def translate_batch_with_fallbacks(texts, target_lang='hi'):
+    """
+    translate_batch that also reports which texts could not be translated:
+    returns (translations, fallbacks) where fallbacks[i] is True when
+    translations[i] is the emergency fallback
+    """
+    if not texts:
+        return [], []
+
+    normalized = [normalize_text(text) for text in texts]
+    unique = list(dict.fromkeys(text for text in normalized if text))
+    cache = get_translation_cache()
+
+    translations = {}
+    fallbacks = set()
+    missing = []
+    for text in unique:
+        cached = cache.get(text, target_lang)
+        if cached is not None:
+            translations[text] = cached
+        else:
+            missing.append(text)
+
+    logger.info(f"📦 Batch translating {len(texts)} texts to {target_lang} "
+                f"({len(unique)} unique, {len(unique) - len(missing)} cached)")
+
+    for text, result in zip(missing, translate_texts(missing, target_lang)):
+        if result:
+            cache.put(text, target_lang, result)
+            translations[text] = result
+        else:
+            # Fallbacks are never cached
+            translations[text] = get_emergency_fallback(text, target_lang)
+            fallbacks.add(text)
+
+    logger.info(f"✅ Batch translation completed: {len(texts)} texts")
+    return [translations.get(text, '') for text in normalized], [text in fallbacks for text in normalized]
+
+def translate_long_text(text, target_lang='hi'):
+    """Translate a full transcript sentence by sentence and reassemble it in order"""
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+    if len(sentences) == 1:
+        return translate_batch(sentences, target_lang)[0]
+    return ' '.join(translate_batch(sentences, target_lang))
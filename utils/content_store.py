@@ -0,0 +1,165 @@
+import os
+import shutil
+import logging
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ioctl that makes dst share src's extents on btrfs/XFS (cp --reflink)
+FICLONE = 0x40049409
+
+def link_file(src, dst):
+    """
+    Make dst a hard link to src, falling back to a reflink and finally a copy
+    (other filesystem, no link support). An existing dst is replaced, never
+    written through, so the shared data is never modified
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return 'link'
+    except OSError:
+        pass
+    if fcntl is not None:
+        try:
+            with open(src, 'rb') as s, open(dst, 'wb') as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return 'reflink'
+        except OSError:
+            if os.path.exists(dst):
+                os.remove(dst)
+    shutil.copyfile(src, dst)
+    return 'copy'
+
+class ContentStore:
+    """
+    Size-bounded directory of files named by their content key
+    (<root>/<key[:2]>/<key><ext>). Reads refresh a file's mtime and the
+    least recently used files are evicted once max_bytes is exceeded, so
+    several worker processes can share one store through the filesystem
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def path_for(self, key, ext=''):
+        return os.path.join(self.root, key[:2], key + ext)
+
+    def lookup(self, key, ext=''):
+        """Path of the stored file, or None"""
+        path = self.path_for(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return path
+
+    def fetch(self, key, dst, ext=''):
+        """Serve a stored file at dst by link. Returns True on a hit"""
+        path = self.lookup(key, ext)
+        if path is None:
+            return False
+        try:
+            link_file(path, dst)
+            return True
+        except OSError as e:
+            self._count('errors')
+            logger.warning(f"⚠️ Content store could not serve {key}: {e}")
+            return False
+
+    def store(self, key, src, ext='', move=False):
+        """
+        Add src under key (copied, or moved when move=True) and return the
+        stored path. The file appears atomically, so concurrent readers never
+        see a partial entry
+        """
+        path = self.path_for(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            if move:
+                shutil.move(src, temp_path)
+            else:
+                shutil.copyfile(src, temp_path)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._count('stores')
+        self._add_bytes(size)
+        return path
+
+    def _entries(self):
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    yield entry
+
+    def _add_bytes(self, size):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+            else:
+                self._total_bytes += size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used files until the store is below 90% of max_bytes"""
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    continue
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    continue
+            self._total_bytes = total
+            self.stats['evictions'] += removed
+        if removed:
+            logger.info(f"🧹 Evicted {removed} files from {self.root}")
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['bytes'] = self._total_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['max_bytes'] = self.max_bytes
+        return stats
@@ -0,0 +1,188 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.audio_stream import decode_pcm_frames, open_upload_source, FRAME_MS
+from utils.media_backend import MediaBackendError, concat_audio
+from utils.pipeline import Stage, StagedPipeline
+from utils.speech_segmentation import iter_speech_segments, recognize_pcm
+from utils.asr_backend import get_recognizer
+from utils.batch_translation import split_sentences
+
+logger = logging.getLogger(__name__)
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def pipeline_settings():
+    """
+    Per-stage concurrency and queue depth:
+    SPEECH_WORKERS (recognition), PIPELINE_TRANSLATE_WORKERS, PIPELINE_TRANSLATE_BATCH
+    (segments translated together when they are waiting), PIPELINE_TTS_WORKERS
+    and PIPELINE_QUEUE_SIZE (items buffered between stages before the producer blocks)
+    """
+    return {
+        'recognize_workers': _env_int('SPEECH_WORKERS', 4),
+        'translate_workers': _env_int('PIPELINE_TRANSLATE_WORKERS', 2),
+        'translate_batch': _env_int('PIPELINE_TRANSLATE_BATCH', 16),
+        'tts_workers': _env_int('PIPELINE_TTS_WORKERS', 2),
+        'queue_size': _env_int('PIPELINE_QUEUE_SIZE', 4)
+    }
+
+def _speech_segments(source):
+    """Decode and cut the input on silences, yielding segment items as soon as they close"""
+    frame_count = 0
+
+    def counted(frames):
+        nonlocal frame_count
+        for frame in frames:
+            frame_count += 1
+            yield frame
+
+    segments = iter_speech_segments(counted(decode_pcm_frames(source)))
+    for index, (start, end, pcm) in enumerate(segments):
+        yield {
+            'index': index,
+            'start': round(start * FRAME_MS / 1000, 3),
+            'end': round(end * FRAME_MS / 1000, 3),
+            'pcm': pcm,
+            'text': '',
+            'error': None,
+            'translations': {},
+            'audio_paths': {},
+            'warnings': {},
+            'fallbacks': {}
+        }
+
+    if frame_count == 0:
+        raise MediaBackendError("Audio file is empty or corrupted")
+
+def _map_languages(executor, fn, langs):
+    """Run fn(lang) for every language, concurrently when fanning out. Returns {lang: result}"""
+    if executor is None:
+        return {lang: fn(lang) for lang in langs}
+    return dict(zip(langs, executor.map(fn, langs)))
+
+def run_dubbing_pipeline(source, target_langs, translate_fn, tts_fn, chunk_prefix, filename=None,
+                         recognizer=None, fallback_fn=None, on_segment=None):
+    """
+    Recognize, translate and synthesize speech segment by segment with the
+    stages overlapping: segment N is translated and spoken while N+1 is still
+    being recognized.
+
+    target_langs is one language code or a list. Recognition runs once and
+    every segment fans out to all languages in parallel.
+
+    translate_fn(texts, target_lang) -> (translations, fallback flags)
+    (translate_batch_with_fallbacks signature),
+    tts_fn(text, target_lang, output_path) -> path or {'audio_path', 'warning'}.
+    Per-segment speech goes to '{chunk_prefix}_{lang}_{index:04d}.mp3'.
+    on_segment(segment) is called in time order as each segment completes.
+
+    Returns segment dicts (index, start, end, text, error and per-language
+    translations, audio_paths, warnings, fallbacks) plus the pipeline stats.
+    Raises MediaBackendError when the input cannot be decoded
+    """
+    langs = [target_langs] if isinstance(target_langs, str) else list(target_langs)
+    recognizer = recognizer or get_recognizer()
+    settings = pipeline_settings()
+    fanout = ThreadPoolExecutor(max_workers=min(16, 2 * len(langs))) if len(langs) > 1 else None
+
+    def recognize(item):
+        item['text'], item['error'] = recognize_pcm(recognizer, item.pop('pcm'))
+        return item
+
+    def translate(items):
+        # The recognized segments waiting for this stage are translated together:
+        # their sentences go to translate_fn as one batch per language
+        spoken = [item for item in items if item['text']]
+        if not spoken:
+            return items
+        sentences = [split_sentences(item['text']) or [item['text']] for item in spoken]
+        texts = [sentence for group in sentences for sentence in group]
+
+        def to_language(lang):
+            try:
+                translations, fallbacks = translate_fn(texts, lang)
+            except Exception as e:
+                if fallback_fn is None:
+                    raise
+                logger.warning(f"⚠️ Segment translation to {lang} failed, using fallback: {e}")
+                return [(fallback_fn(item['text'], lang), True) for item in spoken]
+            results = []
+            position = 0
+            for group in sentences:
+                end = position + len(group)
+                text = ' '.join(part.strip() for part in translations[position:end] if part and part.strip())
+                results.append((text, any(fallbacks[position:end])))
+                position = end
+            return results
+
+        for lang, results in _map_languages(fanout, to_language, langs).items():
+            for item, (text, fallback) in zip(spoken, results):
+                item['translations'][lang] = text
+                item['fallbacks'][lang] = fallback
+        return items
+
+    def synthesize(item):
+        def to_speech(lang):
+            text = item['translations'].get(lang)
+            if not text:
+                return None, None
+            result = tts_fn(text, lang, f"{chunk_prefix}_{lang}_{item['index']:04d}.mp3")
+            warning = None
+            if isinstance(result, dict):
+                warning = result.get('warning')
+                result = result.get('audio_path')
+            if result and os.path.exists(result) and os.path.getsize(result) > 0:
+                return result, warning
+            return None, warning
+
+        for lang, (path, warning) in _map_languages(fanout, to_speech, langs).items():
+            item['audio_paths'][lang] = path
+            item['warnings'][lang] = warning
+        return item
+
+    pipeline = StagedPipeline([
+        Stage('recognize', recognize, settings['recognize_workers']),
+        Stage('translate', translate, settings['translate_workers'], batch_size=settings['translate_batch']),
+        Stage('synthesize', synthesize, settings['tts_workers'])
+    ], queue_size=settings['queue_size'])
+
+    temp_path = None
+    if not isinstance(source, (str, os.PathLike)):
+        source, temp_path = open_upload_source(source, filename)
+    try:
+        logger.info(f"🚀 Dubbing pipeline: {filename or source} -> {', '.join(langs)}")
+        segments = pipeline.run(_speech_segments(source), on_result=on_segment)
+    finally:
+        if fanout is not None:
+            fanout.shutdown()
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return segments, pipeline.get_stats()
+
+def joined_translation(segments, lang):
+    """The full translation in one language, joined from the segments"""
+    return ' '.join(segment['translations'][lang] for segment in segments if segment['translations'].get(lang))
+
+def join_segment_audio(segments, lang, output_path):
+    """
+    Concatenate one language's per-segment speech in time order.
+    Returns output_path, or None when no segment produced audio
+    """
+    chunks = [segment['audio_paths'][lang] for segment in segments if segment['audio_paths'].get(lang)]
+    if not chunks:
+        return None
+    return concat_audio(chunks, output_path)
+
+def segment_warning(segments, lang):
+    """First TTS warning for a language (e.g. the Punjabi fallback notice), if any"""
+    return next((segment['warnings'][lang] for segment in segments if segment['warnings'].get(lang)), None)
+
+def used_fallback(segments):
+    """True when any segment's translation is a fallback (such results are never memoized)"""
+    return any(any(segment['fallbacks'].values()) for segment in segments)
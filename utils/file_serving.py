@@ -0,0 +1,153 @@
+import os
+import re
+import logging
+import mimetypes
+from urllib.parse import quote
+from flask import request, Response
+from werkzeug.wsgi import wrap_file
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+# HLS playlists and fMP4 segments
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/iso.segment', '.m4s')
+
+# DOWNLOAD_OFFLOAD hands the transfer to the front-end web server:
+#   x-accel-redirect  nginx (internal location at DOWNLOAD_ACCEL_PREFIX pointing at the upload folder)
+#   x-sendfile        Apache mod_xsendfile / lighttpd
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def file_etag(stat):
+    """Strong validator from size and modification time; outputs are never rewritten in place"""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+def etag_matches(header, etag):
+    """If-None-Match / If-Range comparison (weak comparison, as RFC 9110 asks for If-None-Match)"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header into (start, end) with end inclusive.
+    Returns None to serve the whole file (no header, several ranges or a unit
+    other than bytes) and raises ValueError when the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(f"Range {header} outside of {size} bytes")
+    return start, end
+
+def content_disposition(filename, inline=False):
+    disposition = 'inline' if inline else 'attachment'
+    try:
+        filename.encode('ascii')
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+def _bounded_file_iter(f, length):
+    try:
+        while length > 0:
+            data = f.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
+
+def _file_body(f, length, whole_file):
+    """
+    Response body for length bytes from f's current position. Gunicorn's
+    file wrapper sends from the current offset with sendfile() and stops at
+    Content-Length, so it is zero-copy for ranges too; other servers' wrappers
+    read to EOF and only get whole files
+    """
+    if whole_file or request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        return wrap_file(request.environ, f, CHUNK_SIZE)
+    return _bounded_file_iter(f, length)
+
+def serve_file(path, inline=False, download_name=None, root=None, max_age=3600):
+    """
+    Serve a file for the current request with validators and byte ranges:
+    304 for a matching If-None-Match, 206 for a single Range (honouring If-Range),
+    416 for an unsatisfiable one, otherwise 200. inline=True lets <video> and
+    <audio> elements play and seek instead of downloading.
+
+    With DOWNLOAD_OFFLOAD set the body is left to the front-end server, so no
+    worker thread is spent copying bytes. root is the directory the
+    X-Accel-Redirect prefix maps to (defaults to the file's directory)
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(stat)
+    download_name = download_name or os.path.basename(path)
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': f'private, max-age={max_age}',
+        'Content-Disposition': content_disposition(download_name, inline)
+    }
+
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=304, headers=headers)
+
+    offload = os.environ.get('DOWNLOAD_OFFLOAD', '').lower()
+    if offload == 'x-accel-redirect':
+        # nginx serves the file, including Range and conditional requests
+        prefix = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/protected-uploads/').rstrip('/')
+        relative = os.path.relpath(path, root or os.path.dirname(path))
+        headers['X-Accel-Redirect'] = f"{prefix}/{quote(relative.replace(os.sep, '/'))}"
+        return Response(status=200, headers=headers, mimetype=mimetype)
+    if offload == 'x-sendfile':
+        headers['X-Sendfile'] = os.path.abspath(path)
+        return Response(status=200, headers=headers, mimetype=mimetype)
+    if offload:
+        logger.warning(f"⚠️ Unknown DOWNLOAD_OFFLOAD '{offload}'. Supported: {', '.join(OFFLOAD_MODES)}")
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or etag_matches(if_range, etag):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            headers['Content-Range'] = f'bytes */{size}'
+            return Response(status=416, headers=headers)
+
+    f = open(path, 'rb')
+    if byte_range is None:
+        status, start, length = 200, 0, size
+    else:
+        start, end = byte_range
+        status, length = 206, end - start + 1
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        f.seek(start)
+
+    headers['Content-Length'] = str(length)
+    body = _file_body(f, length, whole_file=status == 200)
+    return Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
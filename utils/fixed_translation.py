@@ -1,14 +1,77 @@
+import os
 import logging
 import time
-from googletrans import Translator
+import threading
+from utils.translation_cache import get_translation_cache
+from utils.translation_backend import translate_texts
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# One pooled Translator (and its keep-alive HTTP client) per process
+_translator = None
+_translator_pid = None
+_translator_lock = threading.Lock()
+
+def get_translator():
+    """
+    Return the process-wide Translator, creating it on first use.
+    A new one is created after a fork so Gunicorn workers never share sockets
+    """
+    global _translator, _translator_pid
+    if _translator is None or _translator_pid != os.getpid():
+        with _translator_lock:
+            if _translator is None or _translator_pid != os.getpid():
+                # Imported here because googletrans (and its HTTP stack) is slow to import
+                from googletrans import Translator
+                _translator = Translator(timeout=10)
+                _translator_pid = os.getpid()
+                logger.debug("Created pooled Translator session")
+    return _translator
+
+def reset_translator():
+    """Drop the pooled Translator after a connection error so the next call reconnects"""
+    global _translator
+    with _translator_lock:
+        _translator = None
+
+def get_google_lang(target_lang):
+    """Map app language codes to Google Translate codes"""
+    lang_map = {
+        'hi': 'hi', 'ta': 'ta', 'te': 'te', 'ml': 'ml', 'bn': 'bn',
+        'mr': 'mr', 'gu': 'gu', 'kn': 'kn', 'pa': 'pa'
+    }
+    return lang_map.get(target_lang, 'hi')
+
 def translate_text(text, target_lang='hi'):
     """
-    Pure Google Translate integration - translates any text with robust error handling
+    Translate any text with the language's translation backend (googletrans by default)
+    Results are served from the translation cache when available
+    """
+    # Validate input
+    if not text or not text.strip():
+        logger.warning("Empty text provided for translation")
+        return ""
+    
+    text = text.strip()
+    
+    cache = get_translation_cache()
+    cached = cache.get(text, target_lang)
+    if cached is not None:
+        logger.info(f"⚡ Translation cache hit ({target_lang}): '{text}'")
+        return cached
+    
+    translated_text = translate_texts([text], target_lang)[0]
+    if translated_text is None:
+        # Fallbacks are never cached so a later request can still get a real translation
+        return get_emergency_fallback(text, target_lang)
+    
+    cache.put(text, target_lang, translated_text)
+    return translated_text
+
+def _google_translate(text, target_lang):
+    """
+    Call Google Translate with retries.
+    Returns the translated text, or None when every attempt failed
     """
     max_retries = 3
     retry_delay = 2  # seconds
@@ -17,13 +80,6 @@ def translate_text(text, target_lang='hi'):
         try:
             logger.info(f"🔄 Translating to {target_lang} (attempt {attempt + 1}/{max_retries}): '{text}'")
             
-            # Validate input
-            if not text or not text.strip():
-                logger.warning("Empty text provided for translation")
-                return ""
-            
-            text = text.strip()
-            
             # Map language codes to Google Translate codes
             lang_map = {
                 'hi': 'hi',  # Hindi
@@ -40,14 +96,13 @@ def translate_text(text, target_lang='hi'):
             google_lang = lang_map.get(target_lang, 'hi')
             logger.debug(f"Using Google language code: {google_lang}")
             
-            # Create new translator instance for each request (avoids connection issues)
-            translator = Translator()
+            # Reuse the pooled translator session (timeout is set on its HTTP client)
+            translator = get_translator()
             
-            # Set timeout and perform translation
+            # Perform translation
             translated = translator.translate(
                 text, 
-                dest=google_lang,
-                timeout=10
+                dest=google_lang
             )
             
             if translated and hasattr(translated, 'text') and translated.text:
@@ -60,16 +115,19 @@ def translate_text(text, target_lang='hi'):
                 else:
                     logger.warning(f"⚠️ Translation returned same text: '{translated_text}'")
                     if attempt == max_retries - 1:
-                        return get_emergency_fallback(text, target_lang)
+                        return None
             else:
                 logger.error("❌ Translation returned empty or invalid result")
                 if attempt == max_retries - 1:
-                    return get_emergency_fallback(text, target_lang)
+                    return None
                     
         except Exception as e:
             error_msg = str(e)
             logger.error(f"❌ Translation attempt {attempt + 1} failed: {error_msg}")
             
+            # Start the next attempt on a fresh connection
+            reset_translator()
+            
             # Handle specific common errors
             if "timed out" in error_msg.lower():
                 logger.warning("⏰ Translation timeout, retrying...")
@@ -80,10 +138,10 @@ def translate_text(text, target_lang='hi'):
             else:
                 logger.warning(f"🔄 Unknown error, retrying...: {error_msg}")
             
-            # Final attempt - return emergency fallback
+            # Final attempt - caller uses the emergency fallback
             if attempt == max_retries - 1:
                 logger.error(f"💥 All translation attempts failed for: '{text}'")
-                return get_emergency_fallback(text, target_lang)
+                return None
             
             # Wait before retry with exponential backoff
             sleep_time = retry_delay * (attempt + 1)
@@ -91,7 +149,7 @@ def translate_text(text, target_lang='hi'):
             time.sleep(sleep_time)
     
     # This should never be reached, but just in case
-    return get_emergency_fallback(text, target_lang)
+    return None
 
 def get_emergency_fallback(text, target_lang):
     """
@@ -114,43 +172,15 @@ def batch_translate(texts, target_lang='hi'):
     """
     Translate multiple texts at once (more efficient for batches)
     """
-    try:
-        if not texts:
-            return []
-        
-        if isinstance(texts, str):
-            texts = [texts]
-        
-        logger.info(f"📦 Batch translating {len(texts)} texts to {target_lang}")
-        
-        # Map language codes
-        lang_map = {
-            'hi': 'hi', 'ta': 'ta', 'te': 'te', 'ml': 'ml', 'bn': 'bn',
-            'mr': 'mr', 'gu': 'gu', 'kn': 'kn', 'pa': 'pa'
-        }
-        
-        google_lang = lang_map.get(target_lang, 'hi')
-        translator = Translator()
-        
-        # Translate all texts at once
-        translations = translator.translate(texts, dest=google_lang)
-        
-        results = []
-        for i, translation in enumerate(translations):
-            if translation and translation.text:
-                results.append(translation.text)
-                logger.debug(f"Batch item {i+1}: '{texts[i]}' -> '{translation.text}'")
-            else:
-                logger.warning(f"Batch item {i+1} failed, using fallback")
-                results.append(get_emergency_fallback(texts[i], target_lang))
-        
-        logger.info(f"✅ Batch translation completed: {len(results)} texts")
-        return results
-        
-    except Exception as e:
-        logger.error(f"❌ Batch translation failed: {str(e)}")
-        # Fallback to individual translations
-        return [translate_text(text, target_lang) for text in texts]
+    if not texts:
+        return []
+    
+    if isinstance(texts, str):
+        texts = [texts]
+    
+    # Imported here because batch_translation builds on this module
+    from utils.batch_translation import translate_batch
+    return translate_batch(texts, target_lang)
 
 def get_supported_languages():
     """
@@ -0,0 +1,537 @@
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_FINISHED = (JOB_COMPLETED, JOB_FAILED)
+
+DEFAULT_JOB_TTL = 24 * 3600  # seconds a finished job and its events are kept
+ABANDONED_ERROR = 'The server stopped while this job was running'
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of pending jobs"""
+    pass
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _abandoned(job):
+    """
+    A running job whose worker process is gone. A job claimed under this
+    process's own pid is also abandoned: the caller is starting up, so the
+    pid belonged to a previous server (PIDs repeat across container restarts)
+    """
+    pid = job['worker_pid']
+    return pid is None or pid == os.getpid() or not _process_alive(pid)
+
+def _new_job(kind, payload, dedupe_key=None):
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'kind': kind,
+        'payload': payload,
+        'dedupe_key': dedupe_key,
+        'status': JOB_QUEUED,
+        'stage': 'queued',
+        'progress': 0.0,
+        'result': None,
+        'error': None,
+        'worker_pid': None,
+        'created_at': now,
+        'updated_at': now
+    }
+
+class InMemoryJobBackend:
+    """
+    Keeps jobs in a dict and pending job ids in a queue.Queue.
+    Only visible to the process that created it.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._events = {}
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._new_event = threading.Condition(self._lock)
+
+    def enqueue(self, job):
+        """
+        Queue a job and return its id. A job whose dedupe_key matches a queued
+        or running job is not added; that job's id is returned instead
+        """
+        with self._lock:
+            active = self._find_active(job['dedupe_key'])
+            if active is not None:
+                return active
+            self._jobs[job['id']] = dict(job)
+        self._pending.put(job['id'])
+        return job['id']
+
+    def _find_active(self, dedupe_key):
+        if not dedupe_key:
+            return None
+        return next((job_id for job_id, job in self._jobs.items()
+                     if job['dedupe_key'] == dedupe_key and job['status'] in (JOB_QUEUED, JOB_RUNNING)), None)
+
+    def find_active(self, dedupe_key):
+        with self._lock:
+            return self._find_active(dedupe_key)
+
+    def claim(self, timeout=1.0):
+        """Take the next queued job and mark it running, or return None"""
+        try:
+            job_id = self._pending.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job['status'] = JOB_RUNNING
+            job['stage'] = 'starting'
+            job['worker_pid'] = os.getpid()
+            job['updated_at'] = time.time()
+            return dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['updated_at'] = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending_count(self):
+        return self._pending.qsize()
+
+    def running_jobs(self):
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job['status'] == JOB_RUNNING]
+
+    def expire(self, cutoff):
+        """Remove finished jobs last updated before cutoff, with their events. Returns how many"""
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['status'] in JOB_FINISHED and job['updated_at'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._events.pop(job_id, None)
+        return len(expired)
+
+    def add_event(self, job_id, name, data):
+        with self._new_event:
+            events = self._events.setdefault(job_id, [])
+            events.append({'seq': len(events) + 1, 'event': name, 'data': data, 'created_at': time.time()})
+            self._new_event.notify_all()
+
+    def events_since(self, job_id, after=0, timeout=0):
+        """Events with seq > after, waiting up to timeout seconds for the next one"""
+        with self._new_event:
+            self._new_event.wait_for(lambda: len(self._events.get(job_id, ())) > after, timeout=timeout)
+            return [dict(event) for event in self._events.get(job_id, [])[after:]]
+
+class SQLiteJobBackend:
+    """
+    Stores jobs in a local SQLite file so every Gunicorn worker on the host
+    shares one queue. Workers claim jobs with an IMMEDIATE transaction.
+    """
+
+    def __init__(self, db_path, poll_interval=0.5):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    dedupe_key TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                )
+            """)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'worker_pid' not in columns:
+                # Databases created before jobs recorded the process running them
+                conn.execute('ALTER TABLE jobs ADD COLUMN worker_pid INTEGER')
+            if 'dedupe_key' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN dedupe_key TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_dedupe_key ON jobs (dedupe_key)')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    data TEXT,
+                    created_at REAL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_job(self, row):
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else None
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, job):
+        """
+        Queue a job and return its id. A job whose dedupe_key matches a queued
+        or running job (in any worker process) is not added; that job's id is returned instead
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            active = self._find_active(conn, job['dedupe_key'])
+            if active is None:
+                conn.execute(
+                    'INSERT INTO jobs (id, kind, payload, status, stage, progress, result, error, worker_pid, '
+                    'dedupe_key, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (job['id'], job['kind'], json.dumps(job['payload']), job['status'], job['stage'],
+                     job['progress'], None, None, None, job['dedupe_key'], job['created_at'], job['updated_at'])
+                )
+            conn.execute('COMMIT')
+            return active or job['id']
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _find_active(self, conn, dedupe_key):
+        if not dedupe_key:
+            return None
+        row = conn.execute(
+            'SELECT id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1',
+            (dedupe_key, JOB_QUEUED, JOB_RUNNING)
+        ).fetchone()
+        return row['id'] if row else None
+
+    def find_active(self, dedupe_key):
+        with self._connect() as conn:
+            return self._find_active(conn, dedupe_key)
+
+    def _claim_once(self):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            now = time.time()
+            conn.execute(
+                'UPDATE jobs SET status = ?, stage = ?, worker_pid = ?, updated_at = ? WHERE id = ?',
+                (JOB_RUNNING, 'starting', os.getpid(), now, row['id'])
+            )
+            conn.execute('COMMIT')
+            job = self._row_to_job(row)
+            job.update({'status': JOB_RUNNING, 'stage': 'starting', 'worker_pid': os.getpid(), 'updated_at': now})
+            return job
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, timeout=1.0):
+        """Poll for a queued job until one is claimed or the timeout passes"""
+        deadline = time.time() + timeout
+        while True:
+            job = self._claim_once()
+            if job is not None or time.time() >= deadline:
+                return job
+            time.sleep(self.poll_interval)
+
+    def update(self, job_id, **fields):
+        if not fields:
+            return
+        fields['updated_at'] = time.time()
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def pending_count(self):
+        with self._connect() as conn:
+            row = conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (JOB_QUEUED,)).fetchone()
+        return row[0]
+
+    def running_jobs(self):
+        with self._connect() as conn:
+            rows = conn.execute('SELECT * FROM jobs WHERE status = ?', (JOB_RUNNING,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def expire(self, cutoff):
+        """Remove finished jobs last updated before cutoff, with their events. Returns how many"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            expired = [row['id'] for row in conn.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?', (*JOB_FINISHED, cutoff)
+            )]
+            conn.executemany('DELETE FROM job_events WHERE job_id = ?', [(job_id,) for job_id in expired])
+            conn.executemany('DELETE FROM jobs WHERE id = ?', [(job_id,) for job_id in expired])
+            conn.execute('COMMIT')
+            return len(expired)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def add_event(self, job_id, name, data):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO job_events (job_id, seq, event, data, created_at) '
+                'SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM job_events WHERE job_id = ?',
+                (job_id, name, json.dumps(data), time.time(), job_id)
+            )
+
+    def events_since(self, job_id, after=0, timeout=0):
+        """Events with seq > after, polling up to timeout seconds for the next one"""
+        deadline = time.time() + timeout
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    'SELECT seq, event, data, created_at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq',
+                    (job_id, after)
+                ).fetchall()
+            if rows or time.time() >= deadline:
+                return [
+                    {'seq': row['seq'], 'event': row['event'], 'data': json.loads(row['data']), 'created_at': row['created_at']}
+                    for row in rows
+                ]
+            time.sleep(self.poll_interval / 2)
+
+class JobReporter:
+    """
+    Passed to job handlers as report: report(stage, progress) records progress
+    and publishes a 'stage' event when the stage changes; report.event(name, data)
+    publishes a partial result (a transcribed segment, a finished output)
+    """
+
+    def __init__(self, backend, job_id):
+        self.backend = backend
+        self.job_id = job_id
+        self.stage = None
+
+    def __call__(self, stage, progress=None):
+        fields = {'stage': stage}
+        if progress is not None:
+            fields['progress'] = round(float(progress), 3)
+        try:
+            self.backend.update(self.job_id, **fields)
+        except Exception as e:
+            logger.warning(f"Could not record progress for job {self.job_id}: {e}")
+        if stage != self.stage:
+            self.stage = stage
+            self.event('stage', fields)
+
+    def event(self, name, data):
+        try:
+            self.backend.add_event(self.job_id, name, data)
+        except Exception as e:
+            logger.warning(f"Could not publish {name} event for job {self.job_id}: {e}")
+
+class JobQueue:
+    """
+    Runs registered job handlers on a fixed number of worker threads.
+
+    Handlers are called as handler(payload, report) where report is a
+    JobReporter, and must return a JSON-serializable result dict. Every job
+    keeps an ordered event log (stage changes, partial results, a final 'done')
+    that clients can follow with events(). Finished jobs and their events are
+    removed job_ttl seconds after they finished (0 keeps them forever)
+    """
+
+    def __init__(self, backend, max_workers=2, max_pending=20, job_ttl=DEFAULT_JOB_TTL):
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._handlers = {}
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.fail_abandoned()
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f'job-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            logger.info(f"👷 Started {self.max_workers} job workers ({type(self.backend).__name__})")
+
+    def stop(self):
+        self._stopping.set()
+
+    def fail_abandoned(self):
+        """
+        Mark running jobs whose worker process no longer exists as failed, so
+        clients polling them or following their events get an answer
+        """
+        try:
+            abandoned = [job for job in self.backend.running_jobs() if _abandoned(job)]
+        except Exception as e:
+            logger.warning(f"⚠️ Could not check for abandoned jobs: {e}")
+            return 0
+        for job in abandoned:
+            self.backend.update(job['id'], status=JOB_FAILED, stage='failed', error=ABANDONED_ERROR)
+            self.backend.add_event(job['id'], 'done', {'status': JOB_FAILED, 'error': ABANDONED_ERROR})
+            logger.warning(f"⚠️ Job {job['id']} was running when its server stopped; marked as failed")
+        return len(abandoned)
+
+    def expire(self):
+        """Remove finished jobs (and their events) older than job_ttl"""
+        if not self.job_ttl:
+            return 0
+        try:
+            expired = self.backend.expire(time.time() - self.job_ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not remove expired jobs: {e}")
+            return 0
+        if expired:
+            logger.info(f"🧹 Removed {expired} finished jobs older than {self.job_ttl}s")
+        return expired
+
+    def submit(self, kind, payload, dedupe_key=None):
+        """
+        Queue a job and return its id. With dedupe_key, a queued or running job
+        submitted with the same key is returned instead of starting a second one
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        self.expire()
+        active = self.backend.find_active(dedupe_key) if dedupe_key else None
+        if active is None:
+            if self.backend.pending_count() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+            job = _new_job(kind, payload, dedupe_key)
+            active = self.backend.enqueue(job)
+            if active == job['id']:
+                self.start()
+                logger.info(f"📥 Job queued: {job['id']} ({kind})")
+                return job['id']
+        logger.info(f"♻️ Job {active} is already producing this result, returning it")
+        return active
+
+    def get(self, job_id):
+        return self.backend.get(job_id)
+
+    def events(self, job_id, after=0, timeout=0):
+        """Events of a job with seq > after, waiting up to timeout seconds when there are none yet"""
+        return self.backend.events_since(job_id, after, timeout)
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.backend.claim(timeout=1.0)
+            except Exception as e:
+                logger.error(f"❌ Could not claim job: {e}")
+                time.sleep(1.0)
+                continue
+            if job is None:
+                continue
+            self._run_job(job)
+
+    def _run_job(self, job):
+        job_id = job['id']
+        handler = self._handlers.get(job['kind'])
+        if handler is None:
+            self.backend.update(job_id, status=JOB_FAILED, error=f"Unknown job kind: {job['kind']}")
+            return
+
+        report = JobReporter(self.backend, job_id)
+        report('starting', 0.0)
+
+        logger.info(f"▶️ Running job {job_id} ({job['kind']})")
+        status, error = JOB_FAILED, None
+        try:
+            result = handler(job['payload'], report)
+            if isinstance(result, dict) and result.get('success') is False:
+                error = result.get('error')
+                self.backend.update(job_id, status=JOB_FAILED, stage='failed', progress=1.0,
+                                    result=result, error=error)
+                logger.warning(f"⚠️ Job {job_id} finished with an error: {error}")
+            else:
+                status = JOB_COMPLETED
+                self.backend.update(job_id, status=JOB_COMPLETED, stage='completed', progress=1.0, result=result)
+                logger.info(f"✅ Job {job_id} completed")
+        except Exception as e:
+            error = str(e)
+            logger.error(f"❌ Job {job_id} failed: {e}")
+            self.backend.update(job_id, status=JOB_FAILED, stage='failed', error=error)
+        report.event('done', {'status': status, 'error': error})
+
+def create_job_queue(backend_name=None, db_path=None, max_workers=None, max_pending=None, job_ttl=None):
+    """
+    Build a JobQueue from arguments or environment variables:
+    JOB_QUEUE_BACKEND (memory|sqlite), JOB_QUEUE_DB, JOB_WORKERS, JOB_MAX_PENDING, JOB_TTL
+    """
+    backend_name = (backend_name or os.environ.get('JOB_QUEUE_BACKEND', 'memory')).lower()
+    max_workers = max_workers or int(os.environ.get('JOB_WORKERS', '2'))
+    max_pending = max_pending or int(os.environ.get('JOB_MAX_PENDING', '20'))
+    if job_ttl is None:
+        job_ttl = int(os.environ.get('JOB_TTL', str(DEFAULT_JOB_TTL)))
+
+    if backend_name == 'sqlite':
+        db_path = db_path or os.environ.get('JOB_QUEUE_DB', os.path.join('instance', 'jobs.sqlite3'))
+        backend = SQLiteJobBackend(db_path)
+    elif backend_name == 'memory':
+        backend = InMemoryJobBackend()
+    else:
+        raise ValueError(f"Unknown job queue backend: {backend_name}")
+
+    return JobQueue(backend, max_workers=max_workers, max_pending=max_pending, job_ttl=job_ttl)
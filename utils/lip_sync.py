@@ -1,39 +1,311 @@
-
 import os
+import time
+import bisect
 import logging
-import subprocess
 import tempfile
-from lipsync import lip_sync
+import threading
+import subprocess
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.audio_stream import decode_pcm_frames, SAMPLE_RATE
+from utils.media_backend import get_ffmpeg, probe_video, mp4_layout_args, _subtitles_filter, MediaBackendError
+from utils.media_pool import get_media_pool
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def apply_lip_sync(video_path, audio_path, output_path):
+# LIP_SYNC_MODE: off (mux only), cpu (this module's mouth-region engine) or lipsync (the lipsync library)
+LIP_SYNC_MODES = ('off', 'cpu', 'lipsync')
+
+DETECT_EVERY = 5        # run face detection on every Nth frame, interpolate in between
+DETECT_WIDTH = 320      # frames are downscaled to this width for detection
+BATCH_FRAMES = 32       # frames per process-pool task
+MOUTH_STRENGTH = 0.35   # how far the jaw drops at full speech energy (fraction of the mouth region)
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def lip_sync_mode():
+    mode = os.environ.get('LIP_SYNC_MODE', 'off').lower()
+    if mode not in LIP_SYNC_MODES:
+        logger.warning(f"⚠️ Unknown LIP_SYNC_MODE '{mode}', lip-sync disabled")
+        return 'off'
+    return mode
+
+_detector = None
+_detector_lock = threading.Lock()
+
+def _get_detector():
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                import cv2
+                _detector = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml'))
+    return _detector
+
+def detect_face(frame):
+    """Largest frontal face in a BGR frame as (x, y, w, h) in frame coordinates, or None"""
+    import cv2
+
+    scale = min(1.0, DETECT_WIDTH / frame.shape[1])
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else frame
+    gray = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+    faces = _get_detector().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+    if len(faces) == 0:
+        return None
+    largest = max(faces, key=lambda face: face[2] * face[3])
+    return np.asarray(largest, dtype=np.float32) / scale
+
+def interpolate_boxes(samples, indices, max_gap=DETECT_EVERY):
     """
-    Apply lip-sync using the lipsync library
+    Face boxes for every frame index from the sampled detections ({index: box
+    or None}): linear interpolation between two samples that both found a face,
+    the nearer sample's box when only one did (within max_gap frames), else None
     """
+    keys = sorted(samples)
+    boxes = []
+    for index in indices:
+        pos = bisect.bisect_right(keys, index)
+        before = keys[pos - 1] if pos > 0 else None
+        after = keys[pos] if pos < len(keys) else None
+        box_before = samples[before] if before is not None else None
+        box_after = samples[after] if after is not None else None
+        if box_before is not None and before == index:
+            boxes.append(box_before)
+        elif box_before is not None and box_after is not None:
+            t = (index - before) / (after - before)
+            boxes.append(box_before + (box_after - box_before) * t)
+        elif box_before is not None and index - before <= max_gap:
+            boxes.append(box_before)
+        elif box_after is not None and after - index <= max_gap:
+            boxes.append(box_after)
+        else:
+            boxes.append(None)
+    return boxes
+
+def mouth_openings(audio_path, fps):
+    """Per video frame speech energy of the dubbed audio, scaled to 0..1 and lightly smoothed"""
+    frame_samples = max(1, int(round(SAMPLE_RATE / fps)))
+    frames = list(decode_pcm_frames(audio_path, frame_samples=frame_samples))
+    if not frames:
+        return np.zeros(0, dtype=np.float32)
+    samples = np.stack(frames).astype(np.float32)
+    energy = np.sqrt(np.mean(samples * samples, axis=1))
+    reference = np.percentile(energy, 95) or 1.0
+    openings = np.clip(energy / reference, 0.0, 1.0)
+    return np.convolve(openings, np.ones(3, dtype=np.float32) / 3, mode='same')
+
+def mouth_region(box, width, height):
+    """Mouth region (y0, y1, x0, x1) of the face in box, clipped to the frame, or None when too small to edit"""
+    x, y, w, h = box
+    x0, x1 = max(0, int(x + 0.22 * w)), min(width, int(x + 0.78 * w))
+    y0, y1 = max(0, int(y + 0.62 * h)), min(height, int(y + 0.98 * h))
+    if y1 - y0 < 8 or x1 - x0 < 8:
+        return None
+    return y0, y1, x0, x1
+
+def _open_mouth(region, amount):
+    """The mouth region with the jaw dropped by `amount` of its height"""
+    import cv2
+
+    rows, cols = region.shape[:2]
+
+    # Stretch everything below the lip line downwards
+    lip = int(rows * 0.35)
+    lower = cv2.resize(region[lip:], (cols, int(round((rows - lip) * (1 + amount)))), interpolation=cv2.INTER_LINEAR)
+    edited = region.astype(np.float32)
+    edited[lip:] = lower[:rows - lip]
+
+    # Darken the opening between the lips, then blend with a feathered ellipse
+    yy, xx = np.mgrid[0:rows, 0:cols].astype(np.float32)
+    gap = max(1.0, rows * amount * 0.5)
+    cavity = np.exp(-(((xx - cols / 2) / (cols * 0.28)) ** 2 + ((yy - lip - gap / 2) / gap) ** 2))
+    edited *= (1 - 0.6 * min(1.0, amount * 3) * cavity)[..., None]
+    mask = np.clip(1 - (((xx - cols / 2) / (cols / 2)) ** 2 + ((yy - rows / 2) / (rows / 2)) ** 2), 0, 1) ** 0.5
+    return (edited * mask[..., None] + region * (1 - mask[..., None])).astype(np.uint8)
+
+def _render_mouths(regions, amounts):
+    """
+    Process-pool task: edit a batch of mouth crops. Only the crops travel to
+    the worker and back, a few KB per frame instead of the whole picture
+    """
+    return [_open_mouth(region, amount) for region, amount in zip(regions, amounts)]
+
+def _read_batch(stream, size):
+    """Up to size bytes of raw frames in a writable buffer (shorter only at the end of the stream)"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < size:
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    del view
+    del buffer[filled:]
+    return buffer
+
+def _encoder_command(ffmpeg, info, audio_path, output_path, subtitles_path, burn_subtitles, subtitle_language):
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+           '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{info['width']}x{info['height']}",
+           '-r', str(info['fps']), '-i', 'pipe:0', '-i', audio_path]
+    if subtitles_path and not burn_subtitles:
+        cmd += ['-i', subtitles_path]
+    cmd += ['-map', '0:v:0', '-map', '1:a:0']
+    if subtitles_path and burn_subtitles:
+        cmd += ['-vf', _subtitles_filter(subtitles_path)]
+    elif subtitles_path:
+        cmd += ['-map', '2:s:0', '-c:s', 'mov_text']
+        if subtitle_language:
+            cmd += ['-metadata:s:s:0', f'language={subtitle_language}']
+    cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', '-threads', '0',
+            '-c:a', 'aac', '-b:a', '128k']
+    if info['duration']:
+        # Cut longer audio at the end of the picture; -shortest would stop reading frames early
+        cmd += ['-t', f"{info['duration']:.3f}"]
+    return cmd + mp4_layout_args(output_path) + [output_path]
+
+def cpu_lip_sync(video_path, audio_path, output_path, subtitles_path=None, burn_subtitles=False,
+                 subtitle_language=None, workers=None):
+    """
+    CPU lip-sync that moves the mouth with the dubbed speech.
+
+    Frames are streamed out of one FFmpeg decoder and into one encoder (that
+    also muxes the dubbed audio and subtitles), so the clip is never held in
+    memory and every frame is encoded once. Faces are detected on every
+    LIP_SYNC_DETECT_EVERY-th frame and the boxes interpolated in between; only
+    the mouth region of each frame is edited: the crops of LIP_SYNC_BATCH
+    frames go to the media worker pool as one task (at most LIP_SYNC_WORKERS
+    tasks in flight) and are pasted back into the frames here.
+
+    Returns stats: frames, seconds, fps (frames processed per second), the
+    number of sampled frames and how many had a face
+    """
+    ffmpeg = get_ffmpeg()
+    if ffmpeg is None:
+        raise MediaBackendError("FFmpeg is not installed")
+
+    info = probe_video(video_path)
+    width, height = info['width'], info['height']
+    frame_bytes = width * height * 3
+    every = _env_int('LIP_SYNC_DETECT_EVERY', DETECT_EVERY)
+    batch_frames = _env_int('LIP_SYNC_BATCH', BATCH_FRAMES)
+    # Frame batches render in the shared media worker pool; with MEDIA_WORKERS=0 a pool of its own is used
+    shared = get_media_pool()
+    workers = workers or _env_int('LIP_SYNC_WORKERS', shared.workers if shared else min(4, os.cpu_count() or 1))
+    strength = MOUTH_STRENGTH
+    openings = mouth_openings(audio_path, info['fps'])
+
+    logger.info(f"🎭 CPU lip-sync: {video_path} ({width}x{height} @ {info['fps']} fps) + {audio_path} -> {output_path}")
+    started = time.perf_counter()
+    stderr_file = tempfile.TemporaryFile()
+    decoder = subprocess.Popen(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin', '-i', video_path,
+         '-map', '0:v:0', '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    encoder = subprocess.Popen(
+        _encoder_command(ffmpeg, info, audio_path, output_path, subtitles_path, burn_subtitles, subtitle_language),
+        stdin=subprocess.PIPE, stderr=stderr_file
+    )
+
+    samples = {}
+    in_flight = deque()
+    stats = {'mode': 'cpu', 'frames': 0, 'sampled': 0, 'faces': 0}
     try:
-        logger.info(f"Applying lip-sync: video={video_path}, audio={audio_path}")
+        with nullcontext(shared) if shared else ProcessPoolExecutor(max_workers=workers) as pool:
+            def dispatch(start, frames):
+                indices = range(start, start + len(frames))
+                boxes = interpolate_boxes(samples, indices, every)
+                edits = []
+                for offset, (index, box) in enumerate(zip(indices, boxes)):
+                    amount = float(openings[index]) if index < len(openings) else 0.0
+                    region = mouth_region(box, width, height) if box is not None and amount > 0.05 else None
+                    if region:
+                        edits.append((offset, region, amount * strength))
+                future = None
+                if edits:
+                    crops = [frames[offset, y0:y1, x0:x1] for offset, (y0, y1, x0, x1), _ in edits]
+                    future = pool.submit(_render_mouths, crops, [amount for _, _, amount in edits])
+                in_flight.append((frames, edits, future))
+                # Samples before this batch are no longer needed for interpolation
+                for key in [key for key in samples if key < start - every]:
+                    del samples[key]
+                while len(in_flight) > workers * 2:
+                    write(in_flight.popleft())
 
-        # Ensure the output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            def write(entry):
+                # Paste the edited mouths back into the decoded frames and encode them
+                frames, edits, future = entry
+                if future is not None:
+                    for (offset, (y0, y1, x0, x1), _), crop in zip(edits, future.result()):
+                        frames[offset, y0:y1, x0:x1] = crop
+                encoder.stdin.write(frames.data)
 
-        # Use the lipsync library
-        lip_sync(video_path, audio_path, output_path)
+            # Each batch is sent once the next one's detections are known, so
+            # its last frames can be interpolated towards them
+            pending = None
+            index = 0
+            while True:
+                data = _read_batch(decoder.stdout, frame_bytes * batch_frames)
+                count = len(data) // frame_bytes
+                if count == 0:
+                    break
+                frames = np.frombuffer(data, dtype=np.uint8, count=count * frame_bytes).reshape(count, height, width, 3)
+                for i in range(count):
+                    if (index + i) % every == 0:
+                        box = detect_face(frames[i])
+                        samples[index + i] = box
+                        stats['sampled'] += 1
+                        stats['faces'] += box is not None
+                if pending:
+                    dispatch(*pending)
+                pending = (index, frames)
+                index += count
+            if pending:
+                dispatch(*pending)
+            while in_flight:
+                write(in_flight.popleft())
+        encoder.stdin.close()
+        encoder.wait(timeout=600)
+        decoder.wait(timeout=60)
+        if encoder.returncode != 0:
+            stderr_file.seek(0)
+            raise MediaBackendError(f"FFmpeg failed: {stderr_file.read().decode(errors='replace').strip()[-500:]}")
+    except BaseException:
+        for process in (decoder, encoder):
+            if process.poll() is None:
+                process.kill()
+        raise
+    finally:
+        stderr_file.close()
+
+    if index == 0:
+        raise MediaBackendError(f"No video frames decoded from {video_path}")
+    elapsed = time.perf_counter() - started
+    stats.update({'frames': index, 'seconds': round(elapsed, 2), 'fps': round(index / elapsed, 1), 'workers': workers})
+    logger.info(f"✅ Lip-sync: {index} frames in {elapsed:.2f}s ({stats['fps']} fps), "
+                f"faces in {stats['faces']}/{stats['sampled']} sampled frames")
+    return stats
 
-        logger.info(f"Lip-sync completed: {output_path}")
-        return output_path
-
-    except Exception as e:
-        logger.error(f"Error in lip-sync process: {str(e)}")
-
-        # Fallback: Just copy the original video
-        try:
-            import shutil
-            shutil.copy2(video_path, output_path)
-            logger.info(f"Used fallback: copied original video to {output_path}")
-            return output_path
-        except Exception as fallback_error:
-            logger.error(f"Fallback also failed: {fallback_error}")
-            raise e
+def apply_lip_sync(video_path, audio_path, output_path, mode=None, **options):
+    """
+    Lip-sync a video to the dubbed audio with LIP_SYNC_MODE (or mode) and
+    return the stats. Failures raise, so the caller can fall back to a plain mux
+    """
+    mode = mode or lip_sync_mode()
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if mode == 'cpu':
+        return cpu_lip_sync(video_path, audio_path, output_path, **options)
+    if mode == 'lipsync':
+        from lipsync import lip_sync
+
+        started = time.perf_counter()
+        lip_sync(video_path, audio_path, output_path)
+        return {'mode': 'lipsync', 'seconds': round(time.perf_counter() - started, 2)}
+    raise ValueError(f"Lip-sync is disabled (LIP_SYNC_MODE={mode})")
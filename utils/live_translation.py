@@ -0,0 +1,308 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import tempfile
+import threading
+from collections import deque
+import numpy as np
+from utils.audio_stream import SAMPLE_RATE, FRAME_MS, FRAME_SAMPLES
+from utils.pipeline import Stage, StagedPipeline
+from utils.speech_segmentation import iter_speech_segments, recognize_pcm
+from utils.asr_backend import get_recognizer
+from utils.dubbing import pipeline_settings
+
+logger = logging.getLogger(__name__)
+
+# VAD decisions are made every LIVE_BLOCK_SECONDS instead of every second as for files
+LIVE_BLOCK_SECONDS = 0.24
+
+# Arrival times kept per session: the VAD yields an utterance within a few
+# seconds of its last frame, so a minute of frames covers it with room to spare
+ARRIVALS_KEPT = int(60 * 1000 / FRAME_MS)
+
+# Latencies kept for /api/health and for each session's summary
+LATENCIES_KEPT = 500
+_recent = deque(maxlen=LATENCIES_KEPT)
+_stats_lock = threading.Lock()
+_stats = {'sessions': 0, 'active_sessions': 0, 'utterances': 0}
+
+def _percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        'p50': round(float(np.percentile(values, 50)), 1),
+        'p95': round(float(np.percentile(values, 95)), 1),
+        'max': round(float(values.max()), 1)
+    }
+
+def get_live_stats():
+    """Session counts and end-to-end utterance latency (ms) over the last LATENCIES_KEPT utterances"""
+    with _stats_lock:
+        stats = dict(_stats)
+        stats['latency_ms'] = _percentiles([entry['total'] for entry in _recent])
+    return stats
+
+def pcm_from_bytes(data, sample_rate):
+    """Little-endian int16 mono PCM from the client, resampled to 16 kHz if needed"""
+    samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype='<i2')
+    if sample_rate == SAMPLE_RATE or samples.size == 0:
+        return samples.astype(np.int16)
+    count = max(1, int(round(samples.size * SAMPLE_RATE / sample_rate)))
+    positions = np.linspace(0, samples.size - 1, count)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.int16)
+
+class LiveSession:
+    """
+    One live microphone stream. PCM chunks go in with feed(); utterances are
+    cut by the same streaming VAD as uploads (iter_speech_segments) and each
+    one is recognized, translated and spoken on a StagedPipeline, so utterance
+    N is voiced while N+1 is being recognized.
+
+    send(message, audio) is called in utterance order with a JSON-able dict
+    and the synthesized audio bytes (or None). Latency is measured from the
+    moment the utterance's last audio frame reached the server to the moment
+    its result is handed to send
+    """
+
+    def __init__(self, target_lang, send, translate_fn, tts_fn, recognizer=None, sample_rate=SAMPLE_RATE):
+        self.target_lang = target_lang
+        self.send = send
+        self.translate_fn = translate_fn
+        self.tts_fn = tts_fn
+        self.recognizer = recognizer or get_recognizer()
+        self.sample_rate = sample_rate
+        self.utterances = 0
+        self.latencies = deque(maxlen=LATENCIES_KEPT)
+        self.closed = False
+        self._chunks = queue.Queue()
+        self._arrivals = deque(maxlen=ARRIVALS_KEPT)
+        self._frame_count = 0
+        self._thread = None
+        self._error = None
+        settings = pipeline_settings()
+        self.pipeline = StagedPipeline([
+            Stage('recognize', self._recognize, settings['recognize_workers']),
+            Stage('translate', self._translate, settings['translate_workers']),
+            Stage('synthesize', self._synthesize, settings['tts_workers'])
+        ], queue_size=settings['queue_size'])
+
+    def start(self):
+        with _stats_lock:
+            _stats['sessions'] += 1
+            _stats['active_sessions'] += 1
+        self._thread = threading.Thread(target=self._run, name='live-session', daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        """Queue a chunk of int16 PCM as received from the client"""
+        self._chunks.put((pcm_from_bytes(data, self.sample_rate), time.perf_counter()))
+
+    def finish(self, timeout=None):
+        """End of stream: flush the last utterance, wait for every result and return the summary"""
+        self._chunks.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.summary()
+
+    def abort(self):
+        """Client went away: stop sending and let the pipeline drain"""
+        self.closed = True
+        self._chunks.put(None)
+
+    def summary(self):
+        """Utterance count and latency percentiles over the last LATENCIES_KEPT utterances"""
+        return {
+            'type': 'summary',
+            'utterances': self.utterances,
+            'latency_ms': _percentiles([entry['total'] for entry in self.latencies]),
+            'pipeline': self.pipeline.get_stats(),
+            'error': self._error
+        }
+
+    def _arrive(self, received_at):
+        self._arrivals.append(received_at)
+        self._frame_count += 1
+
+    def _arrival(self, index):
+        """When frame index of the stream reached the server"""
+        return self._arrivals[index - (self._frame_count - len(self._arrivals))]
+
+    def _frames(self):
+        pending = np.zeros(0, dtype=np.int16)
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                break
+            samples, received_at = chunk
+            pending = np.concatenate((pending, samples))
+            while pending.size >= FRAME_SAMPLES:
+                self._arrive(received_at)
+                yield pending[:FRAME_SAMPLES]
+                pending = pending[FRAME_SAMPLES:]
+        if pending.size:
+            self._arrive(time.perf_counter())
+            yield np.concatenate((pending, np.zeros(FRAME_SAMPLES - pending.size, dtype=np.int16)))
+
+    def _utterances(self):
+        segments = iter_speech_segments(self._frames(), block_seconds=LIVE_BLOCK_SECONDS)
+        for index, (start, end, pcm) in enumerate(segments):
+            yield {
+                'index': index,
+                'start': round(start * FRAME_MS / 1000, 3),
+                'end': round(end * FRAME_MS / 1000, 3),
+                'pcm': pcm,
+                'text': '',
+                'error': None,
+                'translation': None,
+                'audio': None,
+                'warning': None,
+                'received_at': self._arrival(end - 1),
+                'timings': {'endpoint': (time.perf_counter() - self._arrival(end - 1)) * 1000}
+            }
+
+    def _timed(self, item, name, started):
+        item['timings'][name] = (time.perf_counter() - started) * 1000
+
+    def _recognize(self, item):
+        started = time.perf_counter()
+        item['text'], item['error'] = recognize_pcm(self.recognizer, item.pop('pcm'))
+        self._timed(item, 'recognize', started)
+        return item
+
+    def _translate(self, item):
+        if item['text']:
+            started = time.perf_counter()
+            item['translation'] = (self.translate_fn(item['text'], self.target_lang) or '').strip()
+            self._timed(item, 'translate', started)
+        return item
+
+    def _synthesize(self, item):
+        if not item['translation']:
+            return item
+        started = time.perf_counter()
+        fd, path = tempfile.mkstemp(prefix='live-', suffix='.mp3')
+        os.close(fd)
+        try:
+            result = self.tts_fn(item['translation'], self.target_lang, path)
+            if isinstance(result, dict):
+                item['warning'] = result.get('warning')
+                result = result.get('audio_path')
+            if result and os.path.exists(result) and os.path.getsize(result) > 0:
+                with open(result, 'rb') as f:
+                    item['audio'] = f.read()
+                if result != path:
+                    os.remove(result)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        self._timed(item, 'synthesize', started)
+        return item
+
+    def _deliver(self, item):
+        if not item['text'] and not item['error']:
+            # Noise the recognizer found no words in
+            return
+        total = (time.perf_counter() - item['received_at']) * 1000
+        latency = {name: round(ms, 1) for name, ms in item['timings'].items()}
+        latency['total'] = round(total, 1)
+        self.utterances += 1
+        self.latencies.append(latency)
+        with _stats_lock:
+            _stats['utterances'] += 1
+            _recent.append(latency)
+
+        audio, item['audio'] = item['audio'], None
+        message = {
+            'type': 'utterance',
+            'index': item['index'],
+            'start': item['start'],
+            'end': item['end'],
+            'text': item['text'],
+            'translation': item['translation'],
+            'target_language': self.target_lang,
+            'audio': {'format': 'mp3', 'bytes': len(audio)} if audio else None,
+            'warning': item['warning'],
+            'error': item['error'],
+            'latency_ms': latency
+        }
+        logger.info(f"🎙️ Utterance {item['index']} delivered in {latency['total']:.0f}ms: {item['text']!r}")
+        if not self.closed:
+            self.send(message, audio)
+
+    def _run(self):
+        try:
+            self.pipeline.run(self._utterances(), on_result=self._deliver)
+        except Exception as e:
+            logger.error(f"❌ Live session failed: {e}")
+            self._error = str(e)
+        finally:
+            with _stats_lock:
+                _stats['active_sessions'] -= 1
+
+class AsyncLiveSession(LiveSession):
+    """
+    LiveSession for the ASGI server. The VAD still runs on the session thread,
+    but each utterance is recognized, translated and spoken by a coroutine on
+    the server's event loop (async HTTP, see utils.async_services), so waiting
+    on the network does not hold a thread per stage. Results are still handed
+    to send() in utterance order, on the event loop thread
+    """
+
+    def __init__(self, target_lang, send, loop, sample_rate=SAMPLE_RATE):
+        super().__init__(target_lang, send, None, None, sample_rate=sample_rate)
+        self.loop = loop
+
+    async def _process(self, item, previous):
+        # Imported here because the async services are only used under the ASGI server
+        from utils.async_services import recognize_pcm_async, translate_text_async, synthesize_async
+
+        try:
+            started = time.perf_counter()
+            item['text'], item['error'] = await recognize_pcm_async(item.pop('pcm'), self.recognizer)
+            self._timed(item, 'recognize', started)
+            if item['text']:
+                started = time.perf_counter()
+                item['translation'] = (await translate_text_async(item['text'], self.target_lang) or '').strip()
+                self._timed(item, 'translate', started)
+            if item['translation']:
+                started = time.perf_counter()
+                fd, path = tempfile.mkstemp(prefix='live-', suffix='.mp3')
+                os.close(fd)
+                try:
+                    _, item['warning'] = await synthesize_async(item['translation'], self.target_lang, path)
+                    with open(path, 'rb') as f:
+                        item['audio'] = f.read() or None
+                finally:
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._timed(item, 'synthesize', started)
+        except Exception as e:
+            logger.error(f"❌ Live utterance {item['index']} failed: {e}")
+            item['error'] = item['error'] or f'error: {e}'
+        finally:
+            # Deliver in utterance order
+            if previous is not None:
+                await asyncio.wait([asyncio.wrap_future(previous)])
+        self._deliver(item)
+
+    def summary(self):
+        summary = super().summary()
+        summary['pipeline'] = None
+        return summary
+
+    def _run(self):
+        previous = None
+        try:
+            for item in self._utterances():
+                previous = asyncio.run_coroutine_threadsafe(self._process(item, previous), self.loop)
+            if previous is not None:
+                previous.result()
+        except Exception as e:
+            logger.error(f"❌ Live session failed: {e}")
+            self._error = str(e)
+        finally:
+            with _stats_lock:
+                _stats['active_sessions'] -= 1
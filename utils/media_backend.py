@@ -0,0 +1,357 @@
+import os
+import re
+import shutil
+import logging
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Places to look for ffmpeg when it is not on PATH
+FFMPEG_CANDIDATES = [
+    'ffmpeg',
+    'C:\\ffmpeg\\bin\\ffmpeg.exe',
+    'C:\\Program Files\\ffmpeg\\bin\\ffmpeg.exe',
+    '.\\ffmpeg\\bin\\ffmpeg.exe'
+]
+
+# Limit for a single ffmpeg pass that does not re-encode video
+FFMPEG_TIMEOUT = 300
+# Re-encodes also get this many seconds per second of input (FFMPEG_ENCODE_TIMEOUT_FACTOR)
+ENCODE_TIMEOUT_FACTOR = 4
+
+class MediaBackendError(Exception):
+    """Raised when a media conversion, extraction or mux fails"""
+    pass
+
+_ffmpeg_path = None
+_ffmpeg_probed = False
+_probe_lock = threading.Lock()
+
+def get_ffmpeg():
+    """
+    Locate a working ffmpeg binary. The probe runs once per process;
+    set FFMPEG_BINARY to skip the search.
+    Returns the binary path, or None when ffmpeg is unavailable
+    """
+    global _ffmpeg_path, _ffmpeg_probed
+    if _ffmpeg_probed:
+        return _ffmpeg_path
+
+    with _probe_lock:
+        if _ffmpeg_probed:
+            return _ffmpeg_path
+
+        candidates = []
+        if os.environ.get('FFMPEG_BINARY'):
+            candidates.append(os.environ['FFMPEG_BINARY'])
+        candidates.extend(FFMPEG_CANDIDATES)
+
+        for candidate in candidates:
+            path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+            if not path:
+                continue
+            try:
+                result = subprocess.run([path, '-version'], capture_output=True, timeout=5)
+                if result.returncode == 0:
+                    _ffmpeg_path = path
+                    logger.info(f"✅ Found FFmpeg at: {path}")
+                    break
+            except Exception:
+                continue
+        else:
+            logger.warning("⚠️ FFmpeg not found - media conversion will be unavailable")
+
+        _ffmpeg_probed = True
+        return _ffmpeg_path
+
+def moviepy_fallback_enabled():
+    """moviepy is only used when MEDIA_MOVIEPY_FALLBACK=1"""
+    return os.environ.get('MEDIA_MOVIEPY_FALLBACK', '').lower() in ('1', 'true', 'yes')
+
+def run_ffmpeg(args, timeout=FFMPEG_TIMEOUT):
+    """
+    Run a single ffmpeg invocation and raise MediaBackendError on failure.
+    timeout=None waits for ffmpeg however long it takes
+    """
+    ffmpeg = get_ffmpeg()
+    if ffmpeg is None:
+        raise MediaBackendError("FFmpeg is not installed")
+
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + list(args)
+    logger.debug(f"Running: {' '.join(cmd)}")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise MediaBackendError(f"FFmpeg timed out after {timeout}s")
+
+    if result.returncode != 0:
+        raise MediaBackendError(f"FFmpeg failed: {result.stderr.strip()[-500:]}")
+    return result
+
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+_VIDEO_RE = re.compile(r'Stream #.*?Video: .*?(\d{2,5})x(\d{2,5})')
+_FPS_RE = re.compile(r'(\d+(?:\.\d+)?) fps')
+
+def _input_summary(path):
+    ffmpeg = get_ffmpeg()
+    if ffmpeg is None:
+        raise MediaBackendError("FFmpeg is not installed")
+    try:
+        # No output file: ffmpeg prints the input summary and exits with an error
+        result = subprocess.run([ffmpeg, '-hide_banner', '-nostdin', '-i', path], capture_output=True, text=True, timeout=30)
+    except subprocess.TimeoutExpired:
+        raise MediaBackendError("FFmpeg timed out reading the input summary")
+    return result.stderr
+
+def _parse_duration(summary):
+    match = _DURATION_RE.search(summary)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def probe_duration(path):
+    """Container duration in seconds from ffmpeg's input summary, or None when unknown"""
+    return _parse_duration(_input_summary(path))
+
+def encode_timeout(input_path):
+    """
+    Timeout for an ffmpeg pass that re-encodes input_path (full encodes, subtitle
+    burn-in, HLS packaging): FFMPEG_TIMEOUT plus FFMPEG_ENCODE_TIMEOUT_FACTOR
+    seconds per second of input, so long videos are not cut off. None (no
+    limit) when the duration cannot be read
+    """
+    try:
+        factor = max(1, int(os.environ.get('FFMPEG_ENCODE_TIMEOUT_FACTOR', ENCODE_TIMEOUT_FACTOR)))
+    except ValueError:
+        factor = ENCODE_TIMEOUT_FACTOR
+    try:
+        duration = probe_duration(input_path)
+    except MediaBackendError:
+        duration = None
+    if not duration:
+        return None
+    return int(FFMPEG_TIMEOUT + factor * duration)
+
+def probe_video(path):
+    """
+    Width, height, frame rate and duration of the first video stream.
+    Raises MediaBackendError when the file has no video stream
+    """
+    summary = _input_summary(path)
+    video = _VIDEO_RE.search(summary)
+    if not video:
+        raise MediaBackendError(f"No video stream in {path}")
+    line = summary[video.start():].split('\n', 1)[0]
+    fps = _FPS_RE.search(line)
+    return {
+        'width': int(video.group(1)),
+        'height': int(video.group(2)),
+        'fps': float(fps.group(1)) if fps else 25.0,
+        'duration': _parse_duration(summary)
+    }
+
+def _check_output(output_path):
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        raise MediaBackendError(f"Output file is missing or empty: {output_path}")
+    return output_path
+
+def _with_fallback(name, ffmpeg_fn, moviepy_fn, backend):
+    if backend == 'moviepy':
+        return moviepy_fn()
+    try:
+        return ffmpeg_fn()
+    except MediaBackendError as e:
+        if backend is None and moviepy_fallback_enabled():
+            logger.warning(f"⚠️ FFmpeg {name} failed, trying moviepy: {e}")
+            return moviepy_fn()
+        raise
+
+def _offload(fn, *args):
+    # Imported here because the media pool builds on this module
+    from utils.media_pool import offload
+    return offload(fn, *args)
+
+# The moviepy paths decode and encode in Python, so they are module-level
+# functions that run in the media worker pool instead of the request thread
+
+def _moviepy_convert(input_path, output_path, sample_rate, channels):
+    from moviepy.editor import AudioFileClip
+    audio = AudioFileClip(input_path)
+    try:
+        audio.write_audiofile(output_path, fps=sample_rate, nbytes=2, codec='pcm_s16le',
+                              ffmpeg_params=['-ac', str(channels)], verbose=False, logger=None)
+    finally:
+        audio.close()
+    return _check_output(output_path)
+
+def _moviepy_extract(video_path, output_path, sample_rate, channels):
+    from moviepy.editor import VideoFileClip
+    video = VideoFileClip(video_path)
+    try:
+        if video.audio is None:
+            raise MediaBackendError("Video has no audio track")
+        video.audio.write_audiofile(output_path, fps=sample_rate, nbytes=2,
+                                    ffmpeg_params=['-ac', str(channels)], verbose=False, logger=None)
+    finally:
+        video.close()
+    return _check_output(output_path)
+
+def _moviepy_mux(video_path, audio_path, output_path, ffmpeg_params):
+    from moviepy.editor import VideoFileClip, AudioFileClip
+    video = VideoFileClip(video_path)
+    audio = AudioFileClip(audio_path)
+    try:
+        final_video = video.set_audio(audio)
+        final_video.write_videofile(
+            output_path,
+            codec='libx264',
+            audio_codec='aac',
+            verbose=False,
+            logger=None,
+            temp_audiofile=output_path + '.temp-audio.m4a',
+            remove_temp=True,
+            threads=1,
+            ffmpeg_params=ffmpeg_params
+        )
+        final_video.close()
+    finally:
+        video.close()
+        audio.close()
+    return _check_output(output_path)
+
+def convert_audio(input_path, output_path, sample_rate=16000, channels=1, backend=None):
+    """
+    Convert any audio (or video) file to 16-bit PCM WAV in one ffmpeg pass.
+    backend='moviepy' forces the moviepy path (used by the benchmark)
+    """
+    def with_ffmpeg():
+        run_ffmpeg([
+            '-i', input_path, '-vn',
+            '-acodec', 'pcm_s16le', '-ar', str(sample_rate), '-ac', str(channels),
+            output_path
+        ])
+        return _check_output(output_path)
+
+    def with_moviepy():
+        return _offload(_moviepy_convert, input_path, output_path, sample_rate, channels)
+
+    logger.info(f"🔄 Converting audio: {input_path} -> {output_path}")
+    return _with_fallback('conversion', with_ffmpeg, with_moviepy, backend)
+
+def extract_audio(video_path, output_path, sample_rate=16000, channels=1, backend=None):
+    """
+    Extract the first audio stream of a video. WAV outputs are decoded to PCM;
+    any other extension keeps the original audio with stream copy
+    """
+    def with_ffmpeg():
+        if output_path.lower().endswith('.wav'):
+            codec_args = ['-acodec', 'pcm_s16le', '-ar', str(sample_rate), '-ac', str(channels)]
+        else:
+            codec_args = ['-c:a', 'copy']
+        run_ffmpeg(['-i', video_path, '-map', '0:a:0', '-vn'] + codec_args + [output_path])
+        return _check_output(output_path)
+
+    def with_moviepy():
+        return _offload(_moviepy_extract, video_path, output_path, sample_rate, channels)
+
+    logger.info(f"🔊 Extracting audio: {video_path} -> {output_path}")
+    return _with_fallback('extraction', with_ffmpeg, with_moviepy, backend)
+
+def concat_audio(input_paths, output_path, copy=True):
+    """
+    Join audio files of the same codec (e.g. per-segment gTTS MP3s) with the
+    concat demuxer. Streams are copied, so nothing is re-encoded, unless
+    copy=False, which encodes once to the output's format
+    """
+    if not input_paths:
+        raise MediaBackendError("No audio files to concatenate")
+
+    list_path = output_path + '.concat.txt'
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in input_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        logger.info(f"🔗 Concatenating {len(input_paths)} audio files -> {output_path}")
+        codec_args = ['-c', 'copy'] if copy else []
+        run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path] + codec_args + [output_path])
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+    return _check_output(output_path)
+
+MP4_EXTENSIONS = ('.mp4', '.m4v', '.mov', '.m4a')
+
+MP4_LAYOUTS = {
+    # moov atom up front: players start as soon as the first bytes arrive
+    'faststart': ['-movflags', '+faststart'],
+    # moof/mdat fragments: playable while still being written, and what MSE players expect
+    'fragmented': ['-movflags', '+frag_keyframe+empty_moov+default_base_moof'],
+    # ffmpeg's default: moov written last
+    'plain': []
+}
+
+def mp4_layout_args(output_path, layout=None):
+    """
+    -movflags for an MP4 output, chosen by layout or MP4_LAYOUT
+    (faststart, fragmented or plain; default faststart). Other containers get none
+    """
+    if os.path.splitext(output_path)[1].lower() not in MP4_EXTENSIONS:
+        return []
+    layout = (layout or os.environ.get('MP4_LAYOUT', 'faststart')).lower()
+    if layout not in MP4_LAYOUTS:
+        logger.warning(f"⚠️ Unknown MP4_LAYOUT '{layout}', using faststart")
+        layout = 'faststart'
+    return list(MP4_LAYOUTS[layout])
+
+def _subtitles_filter(subtitles_path):
+    """Build a subtitles= video filter, escaping the path for ffmpeg's filter syntax"""
+    escaped = subtitles_path.replace('\\', '/').replace(':', '\\:').replace("'", "\\'")
+    return f"subtitles=filename='{escaped}'"
+
+def mux_audio(video_path, audio_path, output_path, shortest=True, backend=None,
+              subtitles_path=None, burn_subtitles=False, subtitle_language=None, layout=None):
+    """
+    Replace the audio track of a video. The video stream is copied as-is and only
+    the new audio is encoded; the video is re-encoded only if its codec cannot be
+    copied into the output container.
+
+    subtitles_path adds a soft subtitle track in the same pass, or is rendered
+    into the picture when burn_subtitles is True (which requires re-encoding).
+    MP4 outputs are written progressive-download friendly (see mp4_layout_args)
+    """
+    def mux_args(video_codec_args):
+        args = ['-i', video_path, '-i', audio_path]
+        if subtitles_path and not burn_subtitles:
+            args += ['-i', subtitles_path]
+        args += ['-map', '0:v:0', '-map', '1:a:0']
+        if subtitles_path and not burn_subtitles:
+            args += ['-map', '2:s:0', '-c:s', 'mov_text']
+            if subtitle_language:
+                args += ['-metadata:s:s:0', f'language={subtitle_language}']
+        args += video_codec_args + ['-c:a', 'aac', '-b:a', '128k']
+        if shortest:
+            args.append('-shortest')
+        return args + mp4_layout_args(output_path, layout) + [output_path]
+
+    reencode_args = ['-c:v', 'libx264', '-preset', 'veryfast', '-threads', '0']
+
+    def with_ffmpeg():
+        if subtitles_path and burn_subtitles:
+            run_ffmpeg(mux_args(['-vf', _subtitles_filter(subtitles_path)] + reencode_args),
+                       timeout=encode_timeout(video_path))
+            return _check_output(output_path)
+        try:
+            run_ffmpeg(mux_args(['-c:v', 'copy']))
+        except MediaBackendError as e:
+            logger.warning(f"⚠️ Video stream copy failed, re-encoding: {e}")
+            run_ffmpeg(mux_args(reencode_args), timeout=encode_timeout(video_path))
+        return _check_output(output_path)
+
+    def with_moviepy():
+        return _offload(_moviepy_mux, video_path, audio_path, output_path, mp4_layout_args(output_path, layout))
+
+    logger.info(f"🎬 Muxing audio: {video_path} + {audio_path} -> {output_path}")
+    return _with_fallback('mux', with_ffmpeg, with_moviepy, backend)
@@ -0,0 +1,255 @@
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from utils.media_backend import MediaBackendError
+
+logger = logging.getLogger(__name__)
+
+# Imported once in every worker so jobs never pay for them
+PREWARM_MODULES = ('numpy', 'speech_recognition', 'moviepy.editor', 'pydub', 'cv2',
+                   'utils.media_backend', 'utils.time_alignment', 'utils.lip_sync')
+
+DEFAULT_JOB_TIMEOUT = 600     # seconds
+DEFAULT_JOB_MEMORY_MB = 4096  # address space per job; 0 disables the limit
+TIMEOUT_GRACE = 30            # extra seconds the parent waits before recycling the pool
+# Every Gunicorn/uvicorn worker has a pool of its own, so the default stays small
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+class MediaJobTimeout(MediaBackendError):
+    """Raised when a media job runs past its timeout"""
+    pass
+
+_in_worker = False
+
+def _env_int(name, default, minimum=0):
+    try:
+        return max(minimum, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def _initialize_worker():
+    """Runs once in every worker process: import the heavy modules up front"""
+    global _in_worker
+    _in_worker = True
+    # Ctrl+C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in PREWARM_MODULES:
+        try:
+            __import__(module)
+        except Exception:
+            pass
+
+def in_media_worker():
+    """
+    True inside a pool worker once it is initialized. Server processes started
+    by multiprocessing (uvicorn --workers, --reload) are not media workers.
+    A worker re-importing the parent's main module (python app.py) runs that
+    import as __mp_main__ before this is set, so check __name__ there
+    """
+    return _in_worker
+
+def _ping():
+    return os.getpid()
+
+def _on_alarm(signum, frame):
+    raise MediaJobTimeout("Media job timed out")
+
+def _run_job(fn, args, kwargs, timeout, memory_mb):
+    """
+    Worker side of a job: the soft RLIMIT_AS and a SIGALRM timer are set for the
+    duration of this job only (FFmpeg children inherit the memory limit)
+    """
+    import resource
+
+    previous_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        if previous_limit[1] != resource.RLIM_INFINITY:
+            limit = min(limit, previous_limit[1])
+        resource.setrlimit(resource.RLIMIT_AS, (limit, previous_limit[1]))
+    previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args, **kwargs)
+    except MemoryError:
+        raise MediaBackendError(f"Media job exceeded its {memory_mb}MB memory limit")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        resource.setrlimit(resource.RLIMIT_AS, previous_limit)
+
+class MediaWorkerPool:
+    """
+    Process pool for CPU-bound media work (moviepy encodes, numpy DSP, frame
+    rendering), so it runs on every core instead of behind the GIL of the
+    request threads. Workers are started ahead of time with the heavy imports
+    loaded. run() gives each job a memory limit and a timeout; a job that does
+    not come back within timeout + TIMEOUT_GRACE seconds gets the pool
+    recycled, killing the stuck worker
+    """
+
+    def __init__(self, workers, timeout=DEFAULT_JOB_TIMEOUT, memory_mb=DEFAULT_JOB_MEMORY_MB, start_method=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.start_method = start_method or ('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timed_out': 0, 'recycled': 0, 'running': 0}
+        self._busy_seconds = 0.0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method)
+                if self.start_method == 'forkserver':
+                    context.set_forkserver_preload(list(PREWARM_MODULES))
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                     initializer=_initialize_worker)
+            return self._executor
+
+    def warm(self):
+        """Start every worker now (each one runs the prewarm imports) instead of on the first job"""
+        started = time.perf_counter()
+        pids = {future.result() for future in [self.executor.submit(_ping) for _ in range(self.workers * 2)]}
+        logger.info(f"✅ Media worker pool ready: {len(pids)} processes ({self.start_method}) "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    def recycle(self):
+        """Kill every worker (e.g. one stuck past its timeout); the next job starts a fresh pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        for process in list(getattr(executor, '_processes', {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        with self._stats_lock:
+            self._stats['recycled'] += 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Raw submission for short tasks (e.g. frame batches) without per-job limits"""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def run(self, fn, *args, timeout=None, memory_mb=None, **kwargs):
+        """Run fn(*args, **kwargs) in a worker and return its result; raises MediaBackendError subclasses"""
+        timeout = timeout or self.timeout
+        memory_mb = self.memory_mb if memory_mb is None else memory_mb
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+            self._stats['running'] += 1
+        started = time.perf_counter()
+        outcome = 'failed'
+        try:
+            future = self.executor.submit(_run_job, fn, args, kwargs, timeout, memory_mb)
+            try:
+                result = future.result(timeout=timeout + TIMEOUT_GRACE)
+            except FutureTimeout:
+                logger.error(f"❌ Media job {fn.__name__} hung past {timeout}s, recycling the worker pool")
+                self.recycle()
+                outcome = 'timed_out'
+                raise MediaJobTimeout(f"{fn.__name__} timed out after {timeout}s")
+            except MediaJobTimeout:
+                outcome = 'timed_out'
+                raise
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed by the OOM killer); start over with a fresh pool
+                self.recycle()
+                raise MediaBackendError(f"Media worker crashed during {fn.__name__}: {e}")
+            outcome = 'completed'
+            return result
+        finally:
+            with self._stats_lock:
+                self._stats['running'] -= 1
+                self._stats[outcome] += 1
+                self._busy_seconds += time.perf_counter() - started
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats['busy_seconds'] = round(self._busy_seconds, 2)
+        stats.update({'workers': self.workers, 'timeout': self.timeout, 'memory_mb': self.memory_mb,
+                      'started': self._executor is not None})
+        return stats
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_media_pool():
+    """
+    The process-wide media worker pool: MEDIA_WORKERS processes (default
+    min(4, CPU count), 0 runs media jobs in the calling thread and returns None),
+    MEDIA_JOB_TIMEOUT seconds and MEDIA_JOB_MEMORY_MB per job. Processes start
+    on the first job or warm_media_pool(). A new pool is created after a fork
+    (Gunicorn --preload), since the parent's executor does not work in the child;
+    if the parent had already started a forkserver, the child's pool uses spawn
+    """
+    global _pool, _pool_pid
+    if in_media_worker():
+        return None
+    workers = _env_int('MEDIA_WORKERS', DEFAULT_WORKERS)
+    if workers == 0:
+        return None
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                start_method = os.environ.get('MEDIA_POOL_START_METHOD') or None
+                if _pool is not None and _pool.start_method == 'forkserver' and _pool.get_stats()['started']:
+                    # The parent's forkserver can only be used by the parent
+                    start_method = 'spawn'
+                # The parent's executor is dropped, not shut down: its processes are not ours
+                _pool_pid = os.getpid()
+                _pool = MediaWorkerPool(
+                    workers,
+                    timeout=_env_int('MEDIA_JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT, 1),
+                    memory_mb=_env_int('MEDIA_JOB_MEMORY_MB', DEFAULT_JOB_MEMORY_MB),
+                    start_method=start_method
+                )
+    return _pool
+
+def offload(fn, *args, **kwargs):
+    """
+    Run a media job in the worker pool, or inline when the pool is disabled or
+    the caller already is a worker. fn must be a module-level function
+    """
+    pool = get_media_pool()
+    if pool is None:
+        return fn(*args, **kwargs)
+    return pool.run(fn, *args, **kwargs)
+
+def warm_media_pool(background=True):
+    """
+    Start the workers so the first job does not wait for them. Called from
+    server startup hooks (ASGI lifespan, Gunicorn post_fork, the dev server),
+    never at import, so scripts and tools that import app start no processes.
+    The warm-up thread is not a daemon: interpreter shutdown waits for it
+    instead of tearing the pool down while its processes are starting
+    """
+    pool = get_media_pool()
+    if pool is None:
+        return None
+
+    def warm():
+        try:
+            pool.warm()
+        except Exception as e:
+            logger.warning(f"⚠️ Media worker pool could not be started: {e}")
+
+    if background:
+        threading.Thread(target=warm, name='media-pool-warmup').start()
+    else:
+        warm()
+    return pool
+
+def get_media_pool_stats():
+    pool = get_media_pool()
+    return pool.get_stats() if pool else 'disabled'
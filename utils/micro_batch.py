@@ -0,0 +1,194 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts observations <= its bound"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self):
+        buckets = {f'<={bound}': count for bound, count in zip(self.bounds, self.counts)}
+        buckets['+inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'max': round(self.max, 2) if self.max is not None else None,
+            'buckets': buckets
+        }
+
+class _Request:
+    __slots__ = ('items', 'future', 'enqueued_at')
+
+    def __init__(self, items):
+        self.items = items
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class MicroBatcher:
+    """
+    Collects work submitted by concurrent threads and runs it in batches.
+
+    submit(key, items) queues a list of items under a key (requests with
+    different keys are never mixed) and returns a Future resolving to the list
+    of results aligned with items. A key's queue is flushed as one
+    run_batch(key, items) call when it holds max_items items or when its oldest
+    request has waited max_wait_ms; batches run on a pool of `workers` threads,
+    so keys do not wait for each other. A single request larger than max_items
+    is sent on its own and never split.
+
+    Batch sizes, queueing delay and per-batch latency are kept as histograms
+    for get_stats()
+    """
+
+    def __init__(self, run_batch, max_items=32, max_wait_ms=10, workers=4, name='batch'):
+        self.run_batch = run_batch
+        self.max_items = max(1, max_items)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self.workers = max(1, workers)
+        self.name = name
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self.batch_requests = Histogram(SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.failures = 0
+
+    def _ensure_started(self):
+        # Also restarts the scheduler in a forked worker, where the parent's threads do not exist
+        if self._thread is None or not self._thread.is_alive():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'{self.name}-batch')
+            self._thread = threading.Thread(target=self._loop, name=f'{self.name}-scheduler', daemon=True)
+            self._thread.start()
+
+    def submit(self, key, items):
+        """Queue items under key; the returned Future resolves to their results"""
+        request = _Request(list(items))
+        with self._condition:
+            self._ensure_started()
+            self._pending.setdefault(key, []).append(request)
+            self._condition.notify()
+        return request.future
+
+    def _take_batch(self, requests):
+        """Pop the requests that fit in one batch (at least one) from a key's queue"""
+        batch = [requests.pop(0)]
+        count = len(batch[0].items)
+        while requests and count + len(requests[0].items) <= self.max_items:
+            count += len(requests[0].items)
+            batch.append(requests.pop(0))
+        return batch
+
+    def _ready_batches(self, now):
+        """Batches due now, and the time until the next one is due (None when idle)"""
+        ready = []
+        next_due = None
+        for key in list(self._pending):
+            requests = self._pending[key]
+            while requests:
+                count = sum(len(request.items) for request in requests)
+                due = requests[0].enqueued_at + self.max_wait
+                if count < self.max_items and due > now:
+                    next_due = due - now if next_due is None else min(next_due, due - now)
+                    break
+                ready.append((key, self._take_batch(requests)))
+            if not requests:
+                del self._pending[key]
+        return ready, next_due
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while True:
+                    ready, timeout = self._ready_batches(time.perf_counter())
+                    if ready:
+                        break
+                    self._condition.wait(timeout)
+            for key, batch in ready:
+                self._executor.submit(self._run, key, batch)
+
+    def _run(self, key, batch):
+        items = [item for request in batch for item in request.items]
+        started = time.perf_counter()
+        try:
+            results = self.run_batch(key, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"❌ {self.name} batch for {key} failed ({len(items)} items): {e}")
+            with self._stats_lock:
+                self.failures += 1
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(results[offset:offset + len(request.items)])
+            offset += len(request.items)
+
+        with self._stats_lock:
+            self.batch_sizes.observe(len(items))
+            self.batch_requests.observe(len(batch))
+            self.queue_wait_ms.observe((started - batch[0].enqueued_at) * 1000)
+            self.batch_latency_ms.observe((finished - started) * 1000)
+        logger.debug(f"📦 {self.name} batch for {key}: {len(batch)} requests, {len(items)} items "
+                     f"in {(finished - started) * 1000:.1f}ms")
+
+    def get_stats(self):
+        with self._condition:
+            queued = sum(len(request.items) for requests in self._pending.values() for request in requests)
+        with self._stats_lock:
+            return {
+                'max_items': self.max_items,
+                'max_wait_ms': round(self.max_wait * 1000, 1),
+                'workers': self.workers,
+                'queued_items': queued,
+                'failures': self.failures,
+                'batch_size': self.batch_sizes.snapshot(),
+                'requests_per_batch': self.batch_requests.snapshot(),
+                'queue_wait_ms': self.queue_wait_ms.snapshot(),
+                'batch_latency_ms': self.batch_latency_ms.snapshot()
+            }
+
+def env_batcher_settings(prefix, max_items=32, max_wait_ms=10, workers=4):
+    """
+    max_items / max_wait_ms / workers from <prefix>_MAX_BATCH, <prefix>_BATCH_WAIT_MS
+    and <prefix>_BATCH_WORKERS; a wait of 0 turns batching off
+    """
+    def read(name, default, minimum):
+        try:
+            return max(minimum, int(os.environ.get(name, default)))
+        except ValueError:
+            return default
+
+    return {
+        'max_items': read(f'{prefix}_MAX_BATCH', max_items, 1),
+        'max_wait_ms': read(f'{prefix}_BATCH_WAIT_MS', max_wait_ms, 0),
+        'workers': read(f'{prefix}_BATCH_WORKERS', workers, 1)
+    }
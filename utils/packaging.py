@@ -0,0 +1,102 @@
+import os
+import re
+import shutil
+import logging
+from utils.media_backend import run_ffmpeg, encode_timeout, MediaBackendError
+from utils.subtitles import ISO_639_2
+
+logger = logging.getLogger(__name__)
+
+HLS_SEGMENT_SECONDS = 6
+MASTER_PLAYLIST = 'master.m3u8'
+
+def hls_segment_seconds():
+    try:
+        return max(1, int(os.environ.get('HLS_SEGMENT_SECONDS', HLS_SEGMENT_SECONDS)))
+    except ValueError:
+        return HLS_SEGMENT_SECONDS
+
+def _name_audio_renditions(master_path, names):
+    """ffmpeg names renditions audio_N; use the language names players show in their audio menu"""
+    with open(master_path, encoding='utf-8') as f:
+        playlist = f.read()
+
+    def rename(match):
+        line = match.group(0)
+        uri = re.search(r'URI="([^"/]+)/', line)
+        if uri and uri.group(1) in names:
+            line = re.sub(r'NAME="[^"]*"', f'NAME="{names[uri.group(1)]}"', line)
+        return line
+
+    playlist = re.sub(r'^#EXT-X-MEDIA:TYPE=AUDIO.*$', rename, playlist, flags=re.MULTILINE)
+    with open(master_path, 'w', encoding='utf-8') as f:
+        f.write(playlist)
+
+def package_hls(video_path, audio_tracks, output_dir, names=None, segment_seconds=None):
+    """
+    Package one video and several dubbed audio tracks as HLS (fMP4 segments) in
+    a single FFmpeg pass: output_dir/video/ holds the picture, output_dir/<lang>/
+    one audio rendition per language, and output_dir/master.m3u8 ties them
+    together as alternate audio of one group, the first language being the default.
+
+    audio_tracks: {lang: audio_path}, in the order the languages should be
+    listed. names: optional {lang: display name}. Returns the master playlist path
+    """
+    if not audio_tracks:
+        raise MediaBackendError("No audio tracks to package")
+    segment_seconds = segment_seconds or hls_segment_seconds()
+    langs = list(audio_tracks)
+
+    stream_map = ['v:0,agroup:audio,name:video']
+    for i, lang in enumerate(langs):
+        entry = f'a:{i},agroup:audio,name:{lang}'
+        if lang in ISO_639_2:
+            entry += f',language:{ISO_639_2[lang]}'
+        if i == 0:
+            entry += ',default:yes'
+        stream_map.append(entry)
+
+    def hls_args(video_codec_args):
+        args = ['-i', video_path]
+        for lang in langs:
+            args += ['-i', audio_tracks[lang]]
+        args += ['-map', '0:v:0']
+        for i in range(len(langs)):
+            args += ['-map', f'{i + 1}:a:0']
+        args += video_codec_args + ['-c:a', 'aac', '-b:a', '128k']
+        return args + [
+            '-f', 'hls',
+            '-hls_time', str(segment_seconds),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_type', 'fmp4',
+            '-hls_segment_filename', os.path.join(output_dir, '%v', 'segment_%05d.m4s'),
+            '-master_pl_name', MASTER_PLAYLIST,
+            '-var_stream_map', ' '.join(stream_map),
+            os.path.join(output_dir, '%v', 'index.m3u8')
+        ]
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+
+    logger.info(f"📦 Packaging HLS: {video_path} + {len(langs)} audio tracks -> {output_dir}")
+    # Every audio track is encoded, and the picture too if it cannot be copied
+    timeout = encode_timeout(video_path)
+    try:
+        # Segments are cut on the source keyframes, so the picture is copied as-is
+        run_ffmpeg(hls_args(['-c:v', 'copy']), timeout=timeout)
+    except MediaBackendError as e:
+        logger.warning(f"⚠️ HLS stream copy failed, re-encoding: {e}")
+        shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
+        run_ffmpeg(hls_args([
+            '-c:v', 'libx264', '-preset', 'veryfast', '-threads', '0',
+            '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})'
+        ]), timeout=timeout)
+
+    master_path = os.path.join(output_dir, MASTER_PLAYLIST)
+    if not os.path.exists(master_path):
+        raise MediaBackendError(f"Master playlist was not written: {master_path}")
+    if names:
+        _name_audio_renditions(master_path, names)
+    return master_path
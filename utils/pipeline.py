@@ -0,0 +1,188 @@
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class Stage:
+    """
+    One step of a StagedPipeline. fn receives an item dict and returns it
+    (usually with new keys added); workers threads run the stage concurrently.
+
+    With batch_size > 1, fn receives a list of items and returns the list: a
+    worker takes the next item plus whatever is already waiting behind it, up
+    to batch_size, without waiting for more to arrive
+    """
+
+    def __init__(self, name, fn, workers=1, batch_size=1):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, seconds, items=1):
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy_seconds += seconds
+
+class StagedPipeline:
+    """
+    Producer/consumer executor: every stage reads from a bounded queue and
+    writes into the next one, so segment N can be translated and synthesized
+    while segment N+1 is still being recognized.
+
+    Bounded queues give backpressure (a fast producer blocks instead of
+    buffering the whole file) and results are handed to on_result in input order.
+    A stage that raises marks the item with errors[stage] and passes it on.
+    """
+
+    def __init__(self, stages, queue_size=4):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.wall_seconds = 0.0
+
+    def _produce(self, items, out_queue, failure):
+        try:
+            for index, item in enumerate(items):
+                out_queue.put((index, item))
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            out_queue.put(_STOP)
+
+    def _take_waiting(self, stage, in_queue, entries):
+        """Add the entries already queued behind the first one, up to the stage's batch size"""
+        while len(entries) < stage.batch_size:
+            try:
+                entry = in_queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                # Seen again by the next get()
+                in_queue.put(_STOP)
+                break
+            entries.append(entry)
+        return entries
+
+    def _work(self, stage, in_queue, out_queue, remaining, remaining_lock):
+        while True:
+            entry = in_queue.get()
+            if entry is _STOP:
+                # Let sibling workers see the sentinel too; the last one forwards it
+                in_queue.put(_STOP)
+                with remaining_lock:
+                    remaining[stage.name] -= 1
+                    last = remaining[stage.name] == 0
+                if last:
+                    out_queue.put(_STOP)
+                return
+
+            if stage.batch_size > 1:
+                self._run_batch(stage, self._take_waiting(stage, in_queue, [entry]), out_queue)
+                continue
+
+            index, item = entry
+            start = time.perf_counter()
+            try:
+                item = stage.fn(item)
+            except Exception as e:
+                logger.warning(f"⚠️ Pipeline stage {stage.name} failed on item {index}: {e}")
+                item.setdefault('errors', {})[stage.name] = str(e)
+            stage._record(time.perf_counter() - start)
+            out_queue.put((index, item))
+
+    def _run_batch(self, stage, entries, out_queue):
+        indexes = [index for index, _ in entries]
+        items = [item for _, item in entries]
+        start = time.perf_counter()
+        try:
+            items = stage.fn(items)
+        except Exception as e:
+            logger.warning(f"⚠️ Pipeline stage {stage.name} failed on items {indexes}: {e}")
+            for item in items:
+                item.setdefault('errors', {})[stage.name] = str(e)
+        stage._record(time.perf_counter() - start, len(items))
+        for index, item in zip(indexes, items):
+            out_queue.put((index, item))
+
+    def run(self, items, on_result=None):
+        """
+        Push items (any iterable, consumed lazily) through all stages.
+        Returns the processed items in input order; exceptions raised by the
+        producer iterable are re-raised after the pipeline has drained
+        """
+        start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        failure = []
+        remaining = {stage.name: stage.workers for stage in self.stages}
+        remaining_lock = threading.Lock()
+
+        threads = [threading.Thread(target=self._produce, args=(items, queues[0], failure),
+                                    name='pipeline-source', daemon=True)]
+        for position, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[position], queues[position + 1], remaining, remaining_lock),
+                    name=f'pipeline-{stage.name}-{worker}',
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        # Reorder completed items so results come out in input order
+        results = []
+        pending = {}
+        while True:
+            entry = queues[-1].get()
+            if entry is _STOP:
+                break
+            index, item = entry
+            pending[index] = item
+            while len(results) in pending:
+                ready = pending.pop(len(results))
+                results.append(ready)
+                if on_result is not None:
+                    try:
+                        on_result(ready)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Pipeline result callback failed: {e}")
+
+        for thread in threads:
+            thread.join()
+        self.wall_seconds = time.perf_counter() - start
+        logger.info(f"⏱️ Pipeline finished {len(results)} items in {self.wall_seconds:.2f}s ({self._summary()})")
+
+        if failure:
+            raise failure[0]
+        return results
+
+    def _summary(self):
+        return ', '.join(f"{stage.name}: {stage.busy_seconds:.2f}s/{stage.workers}w" for stage in self.stages)
+
+    def get_stats(self):
+        """Per-stage busy time; wall time approaches the slowest stage when the overlap works"""
+        return {
+            'wall_seconds': round(self.wall_seconds, 3),
+            'stages': {
+                stage.name: {
+                    'workers': stage.workers,
+                    'items': stage.items,
+                    'batches': stage.batches,
+                    'busy_seconds': round(stage.busy_seconds, 3)
+                }
+                for stage in self.stages
+            }
+        }
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def result_key(kind, content_hash, target_lang, options=None):
+    """Memo key for a pipeline run: what was processed, of which content, into which language, how"""
+    material = json.dumps({
+        'kind': kind,
+        'content': content_hash,
+        'target_lang': target_lang,
+        'options': options or {}
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class SQLiteResultStore:
+    """
+    Completed pipeline responses keyed by result_key, shared by all worker
+    processes. Only the JSON payload is stored; the media it links to stays
+    in the upload folder and is checked by the caller before reuse
+    """
+
+    def __init__(self, db_path, ttl=7 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._local = threading.local()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get(self, key):
+        try:
+            row = self._connect().execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"⚠️ Result cache read failed: {e}")
+            return None
+        if row is None or time.time() - row[1] > self.ttl:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(row[0])
+
+    def put(self, key, payload):
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, payload, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+            self._count('stores')
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"⚠️ Result cache write failed: {e}")
+
+    def delete(self, key):
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Result cache delete failed: {e}")
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_result_cache():
+    """
+    Process-wide result memo configured by RESULT_CACHE_DB (default
+    instance/results.sqlite3, empty string disables) and RESULT_CACHE_TTL.
+    Returns None when disabled
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                db_path = os.environ.get('RESULT_CACHE_DB', os.path.join('instance', 'results.sqlite3'))
+                _store = False
+                if db_path:
+                    try:
+                        _store = SQLiteResultStore(db_path, ttl=int(os.environ.get('RESULT_CACHE_TTL', str(7 * 24 * 3600))))
+                    except Exception as e:
+                        logger.warning(f"⚠️ Result cache unavailable: {e}")
+    return _store or None
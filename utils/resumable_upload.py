@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import base64
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+RECOMMENDED_CHUNK_SIZE = 8 * 1024 * 1024
+
+class UploadError(Exception):
+    """Base class for resumable upload failures; status is the HTTP status to answer with"""
+    status = 400
+
+class UploadNotFound(UploadError):
+    status = 404
+
+class OffsetMismatch(UploadError):
+    """The client's Upload-Offset does not match what is on disk"""
+    status = 409
+
+    def __init__(self, expected, received):
+        super().__init__(f"Upload-Offset {received} does not match current offset {expected}")
+        self.expected = expected
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+class ChecksumMismatch(UploadError):
+    # tus checksum extension status
+    status = 460
+
+class UploadIncomplete(UploadError):
+    status = 409
+
+def parse_checksum(header):
+    """Parse an Upload-Checksum header ('sha256 <base64>'); returns (algorithm, digest bytes) or None"""
+    if not header:
+        return None
+    try:
+        algorithm, value = header.strip().split(' ', 1)
+        return algorithm.lower(), base64.b64decode(value.strip())
+    except ValueError:
+        raise UploadError(f"Malformed Upload-Checksum header: {header}")
+
+class ResumableUploadStore:
+    """
+    tus-style resumable uploads: create an upload with its total length, append
+    chunks at the current offset, then finalize. Chunks are appended straight
+    to the part file in the upload folder, which is renamed in place once the
+    whole file has arrived; the size of that file is the offset, so a resumed
+    upload can continue in any worker process. Requests for one upload are
+    serialized with an flock on its part file, across threads and processes.
+
+    A running SHA-256 is kept while chunks arrive in order; when it is
+    missing (restart, another worker) the file is hashed at finalize instead
+    """
+
+    def __init__(self, directory, max_size, ttl=24 * 3600):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._hashers = {}
+        self._lock = threading.Lock()
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.directory, f"partial_{upload_id}.json")
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.directory, f"partial_{upload_id}.part")
+
+    @contextmanager
+    def _upload_lock(self, upload_id):
+        """Exclusive lock on one upload, held until the block ends (closing the descriptor releases it)"""
+        try:
+            fd = os.open(self._part_path(upload_id), os.O_RDONLY)
+        except OSError:
+            raise UploadNotFound(f"Unknown upload: {upload_id}")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def create(self, filename, length):
+        """Register a new upload of length bytes. Returns its metadata"""
+        if length <= 0:
+            raise UploadError("Upload-Length must be a positive integer")
+        if length > self.max_size:
+            raise UploadTooLarge(f"Upload of {length} bytes exceeds the {self.max_size} byte limit")
+
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        meta = {'upload_id': upload_id, 'filename': filename, 'length': length, 'created_at': time.time()}
+        open(self._part_path(upload_id), 'wb').close()
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        with self._lock:
+            self._hashers[upload_id] = (hashlib.sha256(), 0)
+        logger.info(f"📦 Resumable upload {upload_id} created: {filename} ({length} bytes)")
+        return dict(meta, offset=0)
+
+    def get(self, upload_id):
+        """Metadata plus the current offset"""
+        try:
+            with open(self._meta_path(upload_id), encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['offset'] = os.path.getsize(self._part_path(upload_id))
+        except (OSError, ValueError):
+            raise UploadNotFound(f"Unknown upload: {upload_id}")
+        return meta
+
+    def append(self, upload_id, offset, stream, checksum=None):
+        """
+        Append a chunk read from stream at offset. checksum is a parsed
+        Upload-Checksum; on mismatch the chunk is discarded. Returns the new offset
+        """
+        with self._upload_lock(upload_id):
+            meta = self.get(upload_id)
+            if offset != meta['offset']:
+                raise OffsetMismatch(meta['offset'], offset)
+
+            chunk_hash = None
+            if checksum is not None:
+                algorithm, expected = checksum
+                if algorithm not in hashlib.algorithms_guaranteed:
+                    raise UploadError(f"Unsupported checksum algorithm: {algorithm}")
+                chunk_hash = hashlib.new(algorithm)
+
+            with self._lock:
+                running = self._hashers.get(upload_id)
+            if running is not None and running[1] != offset:
+                running = None
+            file_hash = running[0].copy() if running else None
+
+            written = 0
+            part_path = self._part_path(upload_id)
+            with open(part_path, 'ab') as f:
+                while True:
+                    data = stream.read(CHUNK_SIZE)
+                    if not data:
+                        break
+                    if offset + written + len(data) > meta['length']:
+                        f.truncate(offset)
+                        raise UploadTooLarge("Chunk runs past the declared Upload-Length")
+                    f.write(data)
+                    written += len(data)
+                    if chunk_hash is not None:
+                        chunk_hash.update(data)
+                    if file_hash is not None:
+                        file_hash.update(data)
+
+                if chunk_hash is not None and chunk_hash.digest() != expected:
+                    f.truncate(offset)
+                    raise ChecksumMismatch("Chunk checksum does not match Upload-Checksum")
+
+            with self._lock:
+                if file_hash is not None:
+                    self._hashers[upload_id] = (file_hash, offset + written)
+                else:
+                    self._hashers.pop(upload_id, None)
+            return offset + written
+
+    def finalize(self, upload_id, extension='', shared=True):
+        """
+        Verify the upload is complete and move it to upload_<sha256><ext> in
+        the same folder. With shared=False it gets a name of its own,
+        upload_<sha256>_<upload id><ext>, for callers that delete it when done
+        (a shared file may be in use by another job). Returns (path, sha256 hex, metadata)
+        """
+        with self._upload_lock(upload_id):
+            meta = self.get(upload_id)
+            if meta['offset'] != meta['length']:
+                raise UploadIncomplete(f"Upload has {meta['offset']} of {meta['length']} bytes")
+
+            part_path = self._part_path(upload_id)
+            with self._lock:
+                running = self._hashers.pop(upload_id, None)
+            if running is not None and running[1] == meta['length']:
+                digest = running[0].hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                with open(part_path, 'rb') as f:
+                    for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        hasher.update(data)
+                digest = hasher.hexdigest()
+
+            name = f"upload_{digest}{extension}" if shared else f"upload_{digest}_{upload_id}{extension}"
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(part_path)
+            else:
+                os.replace(part_path, path)
+            os.remove(self._meta_path(upload_id))
+            logger.info(f"✅ Resumable upload {upload_id} complete: {path}")
+            return path, digest, meta
+
+    def delete(self, upload_id):
+        """Abort an upload and remove its files"""
+        with self._upload_lock(upload_id):
+            self.get(upload_id)
+            for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+
+    def expire(self):
+        """Remove uploads that were started more than ttl seconds ago and never finalized"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            if not (name.startswith('partial_') and name.endswith('.json')):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(meta_path) < cutoff:
+                    upload_id = name[len('partial_'):-len('.json')]
+                    logger.info(f"🧹 Expiring abandoned upload {upload_id}")
+                    self.delete(upload_id)
+            except (OSError, UploadError):
+                continue
@@ -0,0 +1,338 @@
+import os
+import logging
+from collections import deque
+from itertools import islice
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from utils.audio_stream import SAMPLE_RATE, SAMPLE_WIDTH, FRAME_MS, FRAME_SAMPLES
+from utils.asr_backend import get_recognizer
+
+logger = logging.getLogger(__name__)
+
+# Same recognizer settings as audio_processing.speech_to_text
+ENERGY_THRESHOLD = 300
+DYNAMIC_ENERGY_RATIO = 1.5
+# The dynamic threshold never exceeds this share of the loud (90th percentile)
+# frames, so continuous speech or music without pauses still counts as voiced
+DYNAMIC_CEILING_RATIO = 0.5
+PAUSE_THRESHOLD = 0.8  # seconds of silence that end a phrase
+
+MIN_SPEECH = 0.25      # drop blips shorter than this (seconds)
+SEGMENT_PADDING = 0.2  # keep a little context around each segment (seconds)
+MAX_SEGMENT = 30.0     # recognize_google struggles with longer requests (seconds)
+
+def _seconds_to_frames(seconds):
+    return int(round(seconds * 1000 / FRAME_MS))
+
+def frame_energies(frames):
+    """RMS energy of every frame, computed in one vectorized pass"""
+    if len(frames) == 0:
+        return np.zeros(0, dtype=np.float32)
+    samples = np.stack(frames).astype(np.float32)
+    return np.sqrt(np.mean(samples * samples, axis=1))
+
+def speech_threshold(energies, energy_threshold=ENERGY_THRESHOLD, dynamic=True):
+    """
+    Like speech_recognition's dynamic threshold: never below energy_threshold,
+    raised above the ambient noise floor when the recording is noisy. The
+    noise floor of audio without pauses is the signal itself, so the raise is
+    capped at DYNAMIC_CEILING_RATIO of the loud frames
+    """
+    if not dynamic or energies.size == 0:
+        return float(energy_threshold)
+    noise_floor, loud = np.percentile(energies, [10, 90])
+    dynamic_threshold = min(float(noise_floor) * DYNAMIC_ENERGY_RATIO, float(loud) * DYNAMIC_CEILING_RATIO)
+    return max(float(energy_threshold), dynamic_threshold)
+
+def _fixed_chunks(start, end, max_frames):
+    """Cut start..end into max_frames pieces, for audio the VAD found no speech in"""
+    return [(i, min(i + max_frames, end)) for i in range(start, end, max_frames)]
+
+def _split_long_segment(start, end, energies, max_frames):
+    """Cut a segment longer than max_frames at its quietest frames"""
+    pieces = []
+    search = max(1, max_frames // 4)
+    while end - start > max_frames:
+        window_start = start + max_frames - search
+        cut = window_start + int(np.argmin(energies[window_start:start + max_frames]))
+        cut = max(cut, start + 1)
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+def detect_speech_segments(frames, energy_threshold=ENERGY_THRESHOLD, pause_threshold=PAUSE_THRESHOLD,
+                           min_speech=MIN_SPEECH, padding=SEGMENT_PADDING, max_segment=MAX_SEGMENT,
+                           dynamic=True):
+    """
+    Energy-based voice activity detection.
+    Returns a list of (start_frame, end_frame) pairs (end exclusive) cut on silences
+    """
+    energies = frame_energies(frames)
+    if energies.size == 0:
+        return []
+
+    threshold = speech_threshold(energies, energy_threshold, dynamic)
+    max_frames = max(1, _seconds_to_frames(max_segment))
+    voiced = np.flatnonzero(energies > threshold)
+    if voiced.size == 0:
+        if energies.max() > energy_threshold:
+            # Not silent, yet nothing stood out: recognize it in fixed chunks
+            logger.warning(f"⚠️ VAD found no speech in non-silent audio, using {max_segment:.0f}s chunks")
+            return _fixed_chunks(0, int(energies.size), max_frames)
+        return []
+
+    # Voiced frames separated by less than pause_threshold belong to one phrase
+    gaps = np.diff(voiced)
+    breaks = np.flatnonzero(gaps > _seconds_to_frames(pause_threshold))
+    starts = np.concatenate(([voiced[0]], voiced[breaks + 1]))
+    ends = np.concatenate((voiced[breaks], [voiced[-1]])) + 1
+
+    keep = (ends - starts) >= max(1, _seconds_to_frames(min_speech))
+    pad = _seconds_to_frames(padding)
+    starts = np.clip(starts[keep] - pad, 0, energies.size)
+    ends = np.clip(ends[keep] + pad, 0, energies.size)
+
+    segments = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if segments and start < segments[-1][1]:
+            start = segments[-1][1]  # padding must not make segments overlap
+        segments.extend(_split_long_segment(start, end, energies, max_frames))
+
+    logger.debug(f"VAD threshold {threshold:.0f}: {len(segments)} segments in {energies.size} frames")
+    return segments
+
+def iter_speech_segments(frame_iter, energy_threshold=ENERGY_THRESHOLD, pause_threshold=PAUSE_THRESHOLD,
+                         min_speech=MIN_SPEECH, padding=SEGMENT_PADDING, max_segment=MAX_SEGMENT,
+                         dynamic=True, noise_window=60.0, block_seconds=1.0):
+    """
+    Streaming variant of detect_speech_segments for pipelined processing.
+
+    Consumes frames as they are decoded and yields (start_frame, end_frame, pcm)
+    as soon as a pause closes a segment. Energies are computed per block of frames
+    and the threshold follows the noise floor of the last `noise_window` seconds.
+    Non-silent audio in which nothing has been voiced for max_segment seconds
+    (before any segment was found) is yielded in fixed max_segment chunks.
+
+    Memory stays bounded on endless streams (live sessions): frames are dropped
+    once no segment can reach back to them, energies once they are older than
+    both those frames and the noise window
+    """
+    pause_frames = _seconds_to_frames(pause_threshold)
+    min_frames = max(1, _seconds_to_frames(min_speech))
+    pad = _seconds_to_frames(padding)
+    max_frames = max(1, _seconds_to_frames(max_segment))
+    window_frames = max(1, _seconds_to_frames(noise_window))
+    block_frames = max(1, _seconds_to_frames(block_seconds))
+    # The first few seconds are buffered before anything is decided, so the
+    # first noise floor estimate is not taken from a handful of frames
+    calibration_frames = min(window_frames, _seconds_to_frames(3.0))
+
+    # frames[0] and energies[0] are frames frame_offset and energy_offset of the stream
+    frames = deque()
+    frame_offset = 0
+    energies = np.zeros(0, dtype=np.float32)
+    energy_offset = 0
+    threshold = float(energy_threshold)
+    position = 0          # next frame to run through the state machine
+    segment_start = None
+    last_voiced = None
+    last_end = 0
+    found = False         # any voiced segment yielded yet
+    unvoiced_start = 0    # start of the stretch checked for the fixed-chunk fallback
+
+    def received():
+        return frame_offset + len(frames)
+
+    def energy_range(start, end):
+        return energies[start - energy_offset:end - energy_offset]
+
+    def emit(start, end, pad_end=True, voiced=True):
+        nonlocal last_end, found
+        if end - start < min_frames:
+            return None
+        start = max(last_end, start - pad)
+        if pad_end:
+            end = min(received(), end + pad)
+        last_end = end
+        found = found or voiced
+        pcm = np.concatenate(list(islice(frames, start - frame_offset, end - frame_offset)))
+        return start, end, pcm
+
+    def unvoiced_chunk(limit, final=False):
+        # Nothing voiced since the last segment although the audio is not silent
+        nonlocal unvoiced_start
+        start = max(last_end, unvoiced_start)
+        if found or segment_start is not None or limit <= start:
+            return None
+        if not final and limit - start < max_frames:
+            return None
+        end = min(limit, start + max_frames)
+        if energy_range(start, end).max() <= energy_threshold:
+            unvoiced_start = end
+            return None
+        logger.warning(f"⚠️ VAD found no speech in non-silent audio, using {max_segment:.0f}s chunks")
+        return emit(start, end, pad_end=False, voiced=False)
+
+    def advance(limit):
+        nonlocal position, segment_start, last_voiced
+        for i in range(position, limit):
+            if energies[i - energy_offset] > threshold:
+                if segment_start is None:
+                    segment_start = i
+                last_voiced = i
+            elif segment_start is not None and i - last_voiced > max(pause_frames, pad):
+                segment = emit(segment_start, last_voiced + 1)
+                segment_start = None
+                if segment:
+                    yield segment
+            if segment_start is not None and i + 1 - segment_start >= max_frames:
+                window_start = segment_start + max_frames - max(1, max_frames // 4)
+                cut = max(segment_start + 1, window_start + int(np.argmin(energy_range(window_start, i + 1))))
+                segment = emit(segment_start, cut, pad_end=False)
+                segment_start = cut if last_voiced >= cut else None
+                if segment:
+                    yield segment
+            segment = unvoiced_chunk(i + 1)
+            if segment:
+                yield segment
+        position = limit
+
+    def trim():
+        # The next segment starts no earlier than the open one (or the next
+        # undecided frame) minus its padding, and never before last_end
+        nonlocal frame_offset, energies, energy_offset
+        keep = (segment_start if segment_start is not None else position) - pad
+        if not found:
+            keep = min(keep, max(last_end, unvoiced_start))
+        keep = max(keep, last_end)
+        while frame_offset < keep and frames:
+            frames.popleft()
+            frame_offset += 1
+        keep_energies = min(keep, received() - window_frames)
+        if keep_energies > energy_offset:
+            energies = energies[keep_energies - energy_offset:]
+            energy_offset = keep_energies
+
+    def add(block):
+        nonlocal energies
+        frames.extend(block)
+        energies = np.concatenate((energies, frame_energies(block)))
+
+    block = []
+    for frame in frame_iter:
+        block.append(frame)
+        if len(block) < block_frames:
+            continue
+        add(block)
+        block = []
+        if received() < calibration_frames:
+            continue
+        threshold = speech_threshold(energies[-window_frames:], energy_threshold, dynamic)
+        yield from advance(received())
+        trim()
+
+    if block:
+        add(block)
+    if received() == 0:
+        return
+    threshold = speech_threshold(energies[-window_frames:], energy_threshold, dynamic)
+    yield from advance(received())
+    if segment_start is not None:
+        segment = emit(segment_start, last_voiced + 1)
+        if segment:
+            yield segment
+    segment = unvoiced_chunk(received(), final=True)
+    if segment:
+        yield segment
+
+def stand_in_recognizer(audio_data):
+    """
+    Offline stand-in used for local testing: describes the segment instead of
+    recognizing it, so the segmentation and stitching can run without a network
+    """
+    duration = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width)
+    return f"speech {duration:.2f}s"
+
+def recognize_pcm(recognizer, pcm):
+    """Recognize one int16 PCM segment. Returns (text, error) and never raises"""
+    import speech_recognition as sr
+
+    audio = sr.AudioData(pcm.tobytes(), SAMPLE_RATE, SAMPLE_WIDTH)
+    try:
+        return (recognizer(audio) or '').strip(), None
+    except sr.UnknownValueError:
+        return '', 'unknown_value'
+    except sr.RequestError as e:
+        return '', f'request_error: {e}'
+    except Exception as e:
+        return '', f'error: {e}'
+
+def _recognize_segment(recognizer, index, start, end, frames):
+    text, error = recognize_pcm(recognizer, np.concatenate(frames[start:end]))
+    return {
+        'index': index,
+        'start': round(start * FRAME_MS / 1000, 3),
+        'end': round(end * FRAME_MS / 1000, 3),
+        'text': text,
+        'error': error
+    }
+
+def transcribe_segments(frames, recognizer=None, max_workers=None, **vad_options):
+    """
+    Cut frames on silences and recognize the segments concurrently on a bounded thread pool.
+    Returns segment dicts (index, start, end, text, error) in time order
+    """
+    recognizer = recognizer or get_recognizer()
+    max_workers = max_workers or int(os.environ.get('SPEECH_WORKERS', '4'))
+
+    spans = detect_speech_segments(frames, **vad_options)
+    if not spans:
+        return []
+
+    logger.info(f"🎤 Recognizing {len(spans)} speech segments with {min(max_workers, len(spans))} workers")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(spans))) as executor:
+        futures = [
+            executor.submit(_recognize_segment, recognizer, i, start, end, frames)
+            for i, (start, end) in enumerate(spans)
+        ]
+        return [future.result() for future in futures]
+
+def stitch_transcript(segments):
+    """
+    Join segment texts into one transcript.
+    Returns the same failure messages as transcribe_audio when nothing was recognized
+    """
+    texts = [segment['text'] for segment in segments if segment['text']]
+    if texts:
+        return ' '.join(texts)
+
+    if not segments:
+        return "No speech detected in audio"
+
+    request_errors = [segment['error'] for segment in segments if segment['error'] and segment['error'].startswith('request_error')]
+    if request_errors:
+        return f"Speech recognition error: {request_errors[0].split(': ', 1)[-1]}"
+    return "Could not understand audio"
+
+def test_segmentation():
+    """
+    Offline check: tone bursts separated by silences must come back as
+    separate segments with the right timestamps
+    """
+    t = np.arange(int(SAMPLE_RATE * 1.5)) / SAMPLE_RATE
+    tone = (3000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    silence = np.zeros(SAMPLE_RATE, dtype=np.int16)
+    signal = np.concatenate([silence, tone, silence, silence, tone, silence])
+    signal = signal[:len(signal) - len(signal) % FRAME_SAMPLES]
+    frames = list(signal.reshape(-1, FRAME_SAMPLES))
+
+    segments = transcribe_segments(frames, recognizer=stand_in_recognizer)
+    print("🧪 Testing speech segmentation...")
+    for segment in segments:
+        print(f"   {segment['start']:6.2f}s - {segment['end']:6.2f}s  {segment['text']}")
+    print(f"🎯 Transcript: {stitch_transcript(segments)}")
+
+# Run test if file is executed directly
+if __name__ == '__main__':
+    test_segmentation()
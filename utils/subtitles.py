@@ -0,0 +1,97 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_FORMATS = ('srt', 'vtt')
+
+# Container metadata (MP4, HLS) uses three-letter ISO 639-2 codes
+ISO_639_2 = {
+    'en': 'eng', 'hi': 'hin', 'ta': 'tam', 'te': 'tel', 'ml': 'mal',
+    'bn': 'ben', 'mr': 'mar', 'gu': 'guj', 'kn': 'kan', 'pa': 'pan'
+}
+
+# Reading speed used when no timestamps are available
+CHARS_PER_SECOND = 15.0
+MIN_CUE_SECONDS = 1.0
+
+def format_timestamp(seconds, fmt='srt'):
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)"""
+    total_ms = int(round(max(0.0, seconds) * 1000))
+    hours, remainder = divmod(total_ms, 3600 * 1000)
+    minutes, remainder = divmod(remainder, 60 * 1000)
+    secs, ms = divmod(remainder, 1000)
+    separator = ',' if fmt == 'srt' else '.'
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+class SubtitleWriter:
+    """
+    Writes SRT or WebVTT cues to disk one at a time, flushing after each cue
+    so a partially processed video already has usable subtitles
+    """
+
+    def __init__(self, path, fmt='srt'):
+        if fmt not in SUBTITLE_FORMATS:
+            raise ValueError(f"Unsupported subtitle format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+        if fmt == 'vtt':
+            self._file.write("WEBVTT\n\n")
+            self._file.flush()
+
+    def add(self, start, end, text):
+        text = (text or '').strip()
+        if not text:
+            return
+        self.count += 1
+        timing = f"{format_timestamp(start, self.fmt)} --> {format_timestamp(end, self.fmt)}"
+        if self.fmt == 'srt':
+            self._file.write(f"{self.count}\n{timing}\n{text}\n\n")
+        else:
+            self._file.write(f"{timing}\n{text}\n\n")
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def map_segments(segments, translations):
+    """
+    Pair transcription segments with their translations.
+    Returns cues (start, end, text) for every segment that has translated text
+    """
+    cues = []
+    for segment, translated in zip(segments, translations):
+        if translated and translated.strip():
+            cues.append((segment['start'], segment['end'], translated.strip()))
+    return cues
+
+def estimate_cues(text, start=0.0):
+    """
+    Timing for text without segment timestamps: one cue per sentence,
+    sized by reading speed instead of a fixed slot
+    """
+    from utils.batch_translation import split_sentences
+
+    cues = []
+    position = start
+    for sentence in split_sentences(text):
+        duration = max(MIN_CUE_SECONDS, len(sentence) / CHARS_PER_SECOND)
+        cues.append((position, position + duration, sentence))
+        position += duration
+    return cues
+
+def write_subtitles(cues, path, fmt='srt'):
+    """Write all cues to path and return it"""
+    with SubtitleWriter(path, fmt) as writer:
+        for start, end, text in cues:
+            writer.add(start, end, text)
+    logger.info(f"📝 Subtitles written ({fmt}, {writer.count} cues): {path}")
+    return path
@@ -0,0 +1,163 @@
+import os
+import logging
+import subprocess
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.audio_stream import decode_pcm_frames
+from utils.media_backend import get_ffmpeg, MediaBackendError
+
+logger = logging.getLogger(__name__)
+
+ALIGN_SAMPLE_RATE = 24000   # gTTS output rate; enough for speech
+WSOLA_FRAME_MS = 40
+WSOLA_TOLERANCE_MS = 10
+
+# How far speech may be sped up or slowed down to fit its slot before it
+# stops sounding natural; beyond that it spills into the following silence
+MAX_SPEEDUP = 1.5
+MAX_SLOWDOWN = 1.25
+
+def _env_float(name, default):
+    try:
+        return max(1.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def alignment_enabled():
+    """ALIGN_TIMING=0 turns the alignment off (speech is concatenated and muxed with -shortest)"""
+    return os.environ.get('ALIGN_TIMING', '1').lower() not in ('0', 'false', 'no')
+
+def wsola_stretch(samples, target_length, sample_rate=ALIGN_SAMPLE_RATE,
+                  frame_ms=WSOLA_FRAME_MS, tolerance_ms=WSOLA_TOLERANCE_MS):
+    """
+    Time-stretch mono float samples to target_length samples without changing
+    the pitch (WSOLA). Output frames are taken every half frame from the input
+    at the stretched position, shifted by up to tolerance_ms to the offset whose
+    waveform best continues the previous frame, and overlap-added with a Hann
+    window. The cross-correlation over all candidate offsets is one matrix product
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    target_length = int(target_length)
+    frame = 2 * (sample_rate * frame_ms // 2000)
+    if target_length <= 0:
+        return np.zeros(0, dtype=np.float32)
+    if len(samples) < frame or target_length < frame or abs(len(samples) - target_length) <= 1:
+        # Too short for overlap-add: plain resampling
+        if len(samples) == 0:
+            return np.zeros(target_length, dtype=np.float32)
+        positions = np.linspace(0, len(samples) - 1, target_length)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+    hop = frame // 2
+    tolerance = sample_rate * tolerance_ms // 1000
+    speed = len(samples) / target_length
+    count = int(np.ceil(target_length / hop)) + 1
+
+    # Pad so every candidate window and its natural continuation exist
+    padded = np.pad(samples, (tolerance, int(count * hop * speed) + frame + 2 * tolerance + hop))
+    windows = sliding_window_view(padded, frame)
+    window = np.hanning(frame).astype(np.float32)
+
+    output = np.zeros(count * hop + frame, dtype=np.float32)
+    weight = np.zeros_like(output)
+    previous = tolerance
+    for k in range(count):
+        center = int(round(k * hop * speed))
+        if k == 0:
+            start = tolerance
+        else:
+            natural = windows[previous + hop]
+            candidates = windows[center:center + 2 * tolerance + 1]
+            start = center + int(np.argmax(candidates @ natural))
+        output[k * hop:k * hop + frame] += windows[start] * window
+        weight[k * hop:k * hop + frame] += window
+        previous = start
+
+    output /= np.maximum(weight, 1e-3)
+    return output[:target_length]
+
+def load_samples(path, sample_rate=ALIGN_SAMPLE_RATE):
+    """Decode any audio file to mono float32 samples in [-1, 1]"""
+    frames = list(decode_pcm_frames(path, sample_rate=sample_rate, frame_samples=sample_rate // 100))
+    if not frames:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(frames).astype(np.float32) / 32768.0
+
+def trim_silence(samples, threshold=0.01):
+    """Drop the leading and trailing silence TTS engines add around speech"""
+    voiced = np.flatnonzero(np.abs(samples) > threshold)
+    if voiced.size == 0:
+        return samples[:0]
+    return samples[voiced[0]:voiced[-1] + 1]
+
+def fit_duration(speech_seconds, slot_seconds, max_speedup=None, max_slowdown=None):
+    """
+    Duration to stretch synthesized speech to: the source speech's duration,
+    as long as that is within max_speedup / max_slowdown of the natural length
+    """
+    max_speedup = max_speedup or _env_float('ALIGN_MAX_SPEEDUP', MAX_SPEEDUP)
+    max_slowdown = max_slowdown or _env_float('ALIGN_MAX_SLOWDOWN', MAX_SLOWDOWN)
+    return float(np.clip(slot_seconds, speech_seconds / max_speedup, speech_seconds * max_slowdown))
+
+def encode_samples(samples, output_path, sample_rate=ALIGN_SAMPLE_RATE):
+    """Encode mono float samples once, in the format the output extension implies"""
+    ffmpeg = get_ffmpeg()
+    if ffmpeg is None:
+        raise MediaBackendError("FFmpeg is not installed")
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+           '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0', output_path]
+    try:
+        result = subprocess.run(cmd, input=pcm, capture_output=True, timeout=300)
+    except subprocess.TimeoutExpired:
+        raise MediaBackendError("FFmpeg timed out encoding the aligned track")
+    if result.returncode != 0:
+        raise MediaBackendError(f"FFmpeg failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+    return output_path
+
+def align_segment_audio(segments, lang, output_path, duration, sample_rate=ALIGN_SAMPLE_RATE):
+    """
+    Build one language's dubbed track on the source timeline: each segment's
+    speech is trimmed, time-stretched (WSOLA) to the length of the source speech
+    it replaces and placed at that segment's start; the gaps stay silent. A
+    segment that cannot be squeezed into its slot pushes the following ones
+    back instead of overlapping them. The track is exactly `duration` seconds
+    long and encoded once.
+
+    Returns (output_path, report) where report lists per-segment source and
+    synthesized durations and the applied speed, or (None, None) when no segment
+    has audio
+    """
+    items = [segment for segment in segments if segment['audio_paths'].get(lang)]
+    if not items:
+        return None, None
+
+    total = int(round(duration * sample_rate))
+    track = np.zeros(total, dtype=np.float32)
+    cursor = 0
+    report = []
+    for segment in items:
+        speech = trim_silence(load_samples(segment['audio_paths'][lang], sample_rate))
+        if speech.size == 0:
+            continue
+        slot_seconds = max(segment['end'] - segment['start'], 0.05)
+        target = fit_duration(speech.size / sample_rate, slot_seconds)
+        stretched = wsola_stretch(speech, int(round(target * sample_rate)), sample_rate)
+
+        start = max(int(round(segment['start'] * sample_rate)), cursor)
+        end = min(start + stretched.size, total)
+        if end > start:
+            track[start:end] = stretched[:end - start]
+        cursor = start + stretched.size
+        report.append({
+            'index': segment['index'],
+            'source_seconds': round(slot_seconds, 3),
+            'speech_seconds': round(speech.size / sample_rate, 3),
+            'speed': round(speech.size / stretched.size, 3),
+            'offset_seconds': round(start / sample_rate - segment['start'], 3)
+        })
+
+    if cursor > total:
+        logger.warning(f"⚠️ Dubbed speech ({lang}) runs {(cursor - total) / sample_rate:.2f}s past the end and was cut")
+    logger.info(f"⏱️ Aligned {len(report)} segments ({lang}) to a {duration:.2f}s timeline -> {output_path}")
+    return encode_samples(track, output_path, sample_rate), report
@@ -0,0 +1,242 @@
+import os
+import time
+import logging
+import threading
+from utils.micro_batch import MicroBatcher, env_batcher_settings
+
+logger = logging.getLogger(__name__)
+
+# Local models are converted once with
+#   ct2-transformers-converter --model Helsinki-NLP/opus-mt-en-hi --quantization int8 --output_dir models/opus-mt-en-hi
+# and CT2_MODEL_DIR says where to find the one for each language
+DEFAULT_CT2_MODEL_DIR = os.path.join('models', 'opus-mt-en-{lang}')
+
+class TranslationBackend:
+    """
+    A translator: load(lang) builds the model for one target language,
+    translate(model, texts, lang) returns a list aligned with texts holding the
+    translation or None for every text that could not be translated. batched
+    backends get the texts of concurrent requests merged into one translate call
+    """
+
+    def __init__(self, name, load, translate, offline, batched):
+        self.name = name
+        self.load = load
+        self.translate = translate
+        self.offline = offline
+        self.batched = batched
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+def _googletrans_load(lang):
+    return None
+
+def _googletrans_translate(model, texts, lang):
+    # Imported here because the googletrans helpers build on this module
+    from utils.fixed_translation import _google_translate
+    from utils.batch_translation import google_translate_batch
+
+    if len(texts) == 1:
+        # Single texts keep the retrying request path
+        return [_google_translate(texts[0], lang)]
+    # Several texts (possibly from several requests) share newline-joined requests
+    return google_translate_batch(texts, lang)
+
+def _ctranslate2_load(lang):
+    import ctranslate2
+    import sentencepiece
+
+    path = os.environ.get('CT2_MODEL_DIR', DEFAULT_CT2_MODEL_DIR).format(lang=lang)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"No CTranslate2 model for '{lang}' at {path}")
+    translator = ctranslate2.Translator(
+        path,
+        device='cpu',
+        compute_type=os.environ.get('CT2_COMPUTE_TYPE', 'int8'),
+        inter_threads=1,
+        intra_threads=_env_int('CT2_THREADS', os.cpu_count() or 1)
+    )
+    source = sentencepiece.SentencePieceProcessor(model_file=os.path.join(path, 'source.spm'))
+    target = sentencepiece.SentencePieceProcessor(model_file=os.path.join(path, 'target.spm'))
+    return translator, source, target
+
+def _ctranslate2_translate(model, texts, lang):
+    translator, source, target = model
+    tokens = [source.encode(text, out_type=str) + ['</s>'] for text in texts]
+    results = translator.translate_batch(
+        tokens,
+        beam_size=_env_int('CT2_BEAM_SIZE', 2),
+        max_batch_size=_env_int('TRANSLATION_MAX_BATCH', 32)
+    )
+    return [target.decode(result.hypotheses[0]).strip() or None for result in results]
+
+_backends = {}
+
+def register_backend(name, load, translate, offline=True, batched=True):
+    """Make a translator available to TRANSLATION_BACKEND / TRANSLATION_BACKENDS"""
+    _backends[name] = TranslationBackend(name, load, translate, offline, batched)
+
+register_backend('googletrans', _googletrans_load, _googletrans_translate, offline=False)
+register_backend('ctranslate2', _ctranslate2_load, _ctranslate2_translate)
+
+def backend_for(lang):
+    """
+    Backend name for a target language: TRANSLATION_BACKENDS overrides per
+    language ("hi=ctranslate2,ta=ctranslate2"), TRANSLATION_BACKEND (default
+    googletrans) covers the rest
+    """
+    overrides = {}
+    for entry in os.environ.get('TRANSLATION_BACKENDS', '').split(','):
+        code, _, name = entry.partition('=')
+        if code.strip() and name.strip():
+            overrides[code.strip()] = name.strip()
+    return overrides.get(lang, os.environ.get('TRANSLATION_BACKEND', 'googletrans'))
+
+class LoadedModel:
+    """
+    One backend's model for one language, loaded on first use and kept for the
+    life of the process
+    """
+
+    def __init__(self, backend, lang):
+        self.backend = backend
+        self.lang = lang
+        self.model = None
+        self.state = 'cold'
+        self.error = None
+        self.load_seconds = None
+        self.calls = 0
+        self.texts = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self.state == 'ready':
+                return
+            self.state = 'loading'
+            started = time.perf_counter()
+            try:
+                self.model = self.backend.load(self.lang)
+            except Exception as e:
+                self.state = 'failed'
+                self.error = str(e)
+                logger.error(f"❌ Translation backend '{self.backend.name}' failed to load for {self.lang}: {e}")
+                raise
+            self.load_seconds = round(time.perf_counter() - started, 2)
+            self.state = 'ready'
+            self.error = None
+            logger.info(f"✅ Translation backend '{self.backend.name}' ready for {self.lang} in {self.load_seconds}s")
+
+    def _call(self, texts):
+        with self._stats_lock:
+            self.calls += 1
+            self.texts += len(texts)
+        try:
+            results = self.backend.translate(self.model, texts, self.lang)
+            if len(results) != len(texts):
+                raise RuntimeError(f"{len(results)} results for {len(texts)} texts")
+            return results
+        except Exception as e:
+            with self._stats_lock:
+                self.failures += 1
+            logger.error(f"❌ {self.backend.name} translation to {self.lang} failed: {e}")
+            return [None] * len(texts)
+
+    def translate(self, texts):
+        """Translations aligned with texts (None where translation failed); never raises"""
+        try:
+            self._ensure_loaded()
+        except Exception:
+            return [None] * len(texts)
+        return self._call(texts)
+
+    def get_stats(self):
+        return {
+            'backend': self.backend.name,
+            'offline': self.backend.offline,
+            'state': self.state,
+            'error': self.error,
+            'load_seconds': self.load_seconds,
+            'calls': self.calls,
+            'texts': self.texts,
+            'mean_batch': round(self.texts / self.calls, 1) if self.calls else None,
+            'failures': self.failures
+        }
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(lang, name=None):
+    """The process-wide model of the language's backend"""
+    name = name or backend_for(lang)
+    if name not in _backends:
+        raise ValueError(f"Unknown translation backend: {name}. Available: {', '.join(sorted(_backends))}")
+    with _models_lock:
+        if (name, lang) not in _models:
+            _models[(name, lang)] = LoadedModel(_backends[name], lang)
+        return _models[(name, lang)]
+
+def _run_batch(key, texts):
+    """One scheduled batch: the texts of every request queued for (backend, language)"""
+    name, lang = key
+    unique = list(dict.fromkeys(texts))
+    translations = dict(zip(unique, get_model(lang, name).translate(unique)))
+    return [translations[text] for text in texts]
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """
+    Process-wide micro-batching scheduler for translation calls, tuned with
+    TRANSLATION_MAX_BATCH (default 32 texts), TRANSLATION_BATCH_WAIT_MS
+    (default 10, 0 sends every request on its own) and TRANSLATION_BATCH_WORKERS
+    (default 4 batches in flight)
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = MicroBatcher(_run_batch, name='translation', **env_batcher_settings('TRANSLATION'))
+    return _scheduler
+
+def translate_texts(texts, lang):
+    """
+    Translate texts to lang with the configured backend. Returns a list aligned
+    with texts, None for texts that could not be translated (the caller picks
+    the fallback, and never caches it).
+
+    Texts for batched backends wait briefly for other threads translating to the
+    same language and go to the backend together
+    """
+    if not texts:
+        return []
+    try:
+        model = get_model(lang)
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        return [None] * len(texts)
+    scheduler = get_scheduler()
+    if not model.backend.batched or scheduler.max_wait == 0:
+        return model.translate(list(texts))
+    try:
+        return scheduler.submit((model.backend.name, lang), texts).result()
+    except Exception:
+        return [None] * len(texts)
+
+def get_translation_backend_stats():
+    """Configured default backend and every model loaded so far, for /api/health"""
+    with _models_lock:
+        models = dict(_models)
+    return {
+        'default': os.environ.get('TRANSLATION_BACKEND', 'googletrans'),
+        'overrides': os.environ.get('TRANSLATION_BACKENDS', ''),
+        'models': {f'{name}:{lang}': model.get_stats() for (name, lang), model in models.items()},
+        'scheduler': get_scheduler().get_stats()
+    }
@@ -0,0 +1,219 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text):
+    """Normalize text for cache keys: NFC unicode, trimmed, single spaces"""
+    text = unicodedata.normalize('NFC', text or '')
+    return ' '.join(text.split())
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry time to live"""
+
+    def __init__(self, max_entries=2048, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteTranslationStore:
+    """
+    Disk tier backed by a SQLite file in WAL mode, so it survives restarts
+    and is shared by every Gunicorn worker on the host. Each thread keeps one
+    connection; expired rows are deleted when the store opens and every
+    prune_every writes, so the file does not outgrow the TTL
+    """
+
+    def __init__(self, db_path, ttl=30 * 24 * 3600, prune_every=1000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                target_lang TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                translated_text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (target_lang, source_text)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_translations_created_at ON translations (created_at)')
+        self.prune()
+
+    def _connect(self):
+        # One connection per thread, opened again in a forked worker
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def prune(self):
+        """Delete rows older than the TTL. Returns how many were removed"""
+        removed = self._connect().execute(
+            'DELETE FROM translations WHERE created_at < ?', (time.time() - self.ttl,)
+        ).rowcount
+        if removed:
+            logger.info(f"🧹 Removed {removed} expired translations from the disk cache")
+        return removed
+
+    def get(self, text, target_lang):
+        row = self._connect().execute(
+            'SELECT translated_text, created_at FROM translations WHERE target_lang = ? AND source_text = ?',
+            (target_lang, text)
+        ).fetchone()
+        if row is None:
+            return None
+        translated_text, created_at = row
+        if created_at + self.ttl < time.time():
+            return None
+        return translated_text
+
+    def put(self, text, target_lang, translated_text):
+        self._connect().execute(
+            'INSERT OR REPLACE INTO translations (target_lang, source_text, translated_text, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            (target_lang, text, translated_text, time.time())
+        )
+        with self._writes_lock:
+            self._writes += 1
+            due = self.prune_every and self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+
+class TranslationCache:
+    """
+    Two-tier translation cache keyed on (normalized text, target_lang).
+    Only real translations should be stored - never emergency fallbacks.
+    """
+
+    def __init__(self, memory_cache, disk_store=None):
+        self.memory = memory_cache
+        self.disk = disk_store
+        self._stats_lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get(self, text, target_lang):
+        key = (normalize_text(text), target_lang)
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hits')
+            return value
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(*key)
+            except Exception as e:
+                self._count('errors')
+                logger.warning(f"⚠️ Translation cache disk read failed: {e}")
+                value = None
+            if value is not None:
+                self._count('disk_hits')
+                self.memory.put(key, value)
+                return value
+
+        self._count('misses')
+        return None
+
+    def put(self, text, target_lang, translated_text):
+        if not translated_text:
+            return
+        key = (normalize_text(text), target_lang)
+        self.memory.put(key, translated_text)
+        if self.disk is not None:
+            try:
+                self.disk.put(key[0], target_lang, translated_text)
+            except Exception as e:
+                self._count('errors')
+                logger.warning(f"⚠️ Translation cache disk write failed: {e}")
+        self._count('stores')
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hits'] = hits
+        stats['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        stats['memory_entries'] = len(self.memory)
+        stats['disk_enabled'] = self.disk is not None
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_translation_cache():
+    """
+    Process-wide cache configured from environment variables:
+    TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_DB,
+    TRANSLATION_CACHE_DISK_TTL (set TRANSLATION_CACHE_DB to an empty string to disable the disk tier)
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                memory = LRUCache(
+                    max_entries=int(os.environ.get('TRANSLATION_CACHE_SIZE', '2048')),
+                    ttl=int(os.environ.get('TRANSLATION_CACHE_TTL', '3600'))
+                )
+                db_path = os.environ.get('TRANSLATION_CACHE_DB', os.path.join('instance', 'translation_cache.sqlite3'))
+                disk = None
+                if db_path:
+                    try:
+                        disk = SQLiteTranslationStore(
+                            db_path,
+                            ttl=int(os.environ.get('TRANSLATION_CACHE_DISK_TTL', str(30 * 24 * 3600)))
+                        )
+                    except Exception as e:
+                        logger.warning(f"⚠️ Translation cache disk tier unavailable: {e}")
+                _cache = TranslationCache(memory, disk)
+    return _cache
@@ -0,0 +1,214 @@
+import os
+import math
+import json
+import time
+import wave
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from utils.media_backend import concat_audio, run_ffmpeg, MediaBackendError
+from utils.content_store import ContentStore
+from utils.translation_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# gTTS itself splits text into ~100 character requests and sends them one by one,
+# so chunks of a few sentences keep every worker busy without tiny requests
+MAX_CHUNK_CHARS = 200
+
+# Voice settings every backend is called with; part of the cache key
+VOICE_PARAMS = {'slow': False}
+
+class TTSError(Exception):
+    """Raised when a chunk cannot be synthesized after all retries"""
+    pass
+
+class TTSBackend:
+    """
+    A speech synthesizer: synthesize(text, lang, output_path) writes one audio
+    file in the backend's native format (extension)
+    """
+
+    def __init__(self, name, synthesize, extension):
+        self.name = name
+        self.synthesize = synthesize
+        self.extension = extension
+
+def _gtts_synthesize(text, lang, output_path):
+    from gtts import gTTS
+    gTTS(text=text, lang=lang, slow=False).save(output_path)
+
+def _espeak_synthesize(text, lang, output_path):
+    binary = shutil.which('espeak-ng') or shutil.which('espeak')
+    if binary is None:
+        raise TTSError("espeak is not installed")
+    result = subprocess.run([binary, '-v', lang, '-w', output_path, text], capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise TTSError(f"espeak failed: {result.stderr.strip()[-300:]}")
+
+def _tone_synthesize(text, lang, output_path, sample_rate=16000, seconds_per_char=0.06):
+    """
+    Offline stand-in for tests: a tone whose length follows the text length
+    (about normal speaking rate), so timing and concatenation can be checked
+    without network access
+    """
+    duration = max(0.3, len(text) * seconds_per_char)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pitch = 220 + (sum(map(ord, lang)) % 8) * 40
+    samples = (6000 * np.sin(2 * math.pi * pitch * t)).astype(np.int16)
+    with wave.open(output_path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+_backends = {}
+
+def register_backend(name, synthesize, extension):
+    """Make a synthesizer available to TTS_BACKEND / the backend argument"""
+    _backends[name] = TTSBackend(name, synthesize, extension)
+
+register_backend('gtts', _gtts_synthesize, '.mp3')
+register_backend('espeak', _espeak_synthesize, '.wav')
+register_backend('tone', _tone_synthesize, '.wav')
+
+def get_backend(name=None):
+    """The named backend, or TTS_BACKEND (default gtts)"""
+    name = name or os.environ.get('TTS_BACKEND', 'gtts')
+    if name not in _backends:
+        raise ValueError(f"Unknown TTS backend: {name}. Available: {', '.join(sorted(_backends))}")
+    return _backends[name]
+
+def split_for_tts(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split at sentence boundaries ('.', '!', '?' and the danda used by
+    Hindi, Marathi and Bengali) and pack neighbouring sentences into chunks
+    """
+    from utils.batch_translation import split_sentences, make_batches
+
+    sentences = split_sentences(text, max_chars=max_chars)
+    return [' '.join(batch) for batch in make_batches(sentences, max_chars=max_chars, max_items=len(sentences) or 1)]
+
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+
+def get_tts_cache():
+    """
+    Process-wide content-addressed store of synthesized audio:
+    TTS_CACHE_DIR (default instance/tts_cache, empty string disables) and
+    TTS_CACHE_MAX_MB (default 512). Returns None when disabled
+    """
+    global _tts_cache
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                root = os.environ.get('TTS_CACHE_DIR', os.path.join('instance', 'tts_cache'))
+                if not root:
+                    _tts_cache = False
+                else:
+                    try:
+                        max_bytes = int(os.environ.get('TTS_CACHE_MAX_MB', '512')) * 1024 * 1024
+                        _tts_cache = ContentStore(root, max_bytes)
+                    except Exception as e:
+                        logger.warning(f"⚠️ TTS cache unavailable: {e}")
+                        _tts_cache = False
+    return _tts_cache or None
+
+def tts_cache_key(text, lang, backend_name, extension):
+    """Hash of everything that determines the audio: text, voice language, backend, voice params and format"""
+    material = json.dumps([normalize_text(text), lang, backend_name, VOICE_PARAMS, extension], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def _synthesize_chunk(backend, text, lang, output_path, retries):
+    cache = get_tts_cache()
+    key = tts_cache_key(text, lang, backend.name, backend.extension)
+    if cache is not None and cache.fetch(key, output_path, backend.extension):
+        return output_path
+
+    # Never write through a path that may be linked to a cache entry
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    _synthesize_with_retries(backend, text, lang, output_path, retries)
+
+    if cache is not None:
+        try:
+            cache.store(key, output_path, backend.extension)
+        except OSError as e:
+            logger.warning(f"⚠️ TTS cache write failed: {e}")
+    return output_path
+
+def _synthesize_with_retries(backend, text, lang, output_path, retries):
+    for attempt in range(retries):
+        try:
+            backend.synthesize(text, lang, output_path)
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                return output_path
+            raise TTSError("Backend produced an empty file")
+        except Exception as e:
+            if attempt == retries - 1:
+                raise TTSError(f"Chunk failed after {retries} attempts: {e}")
+            wait = 0.5 * (2 ** attempt)
+            logger.warning(f"⚠️ TTS chunk failed ({e}), retrying in {wait}s...")
+            time.sleep(wait)
+
+def synthesize_speech(text, lang, output_path, backend=None, max_workers=None, retries=None):
+    """
+    Synthesize text into output_path: chunks are spoken concurrently on a
+    bounded pool (TTS_WORKERS, default 4) with per-chunk retries (TTS_RETRIES,
+    default 3) and joined in order. When the backend already produces the
+    output's format the chunks are concatenated without re-encoding.
+    Raises TTSError or MediaBackendError on failure
+    """
+    backend = get_backend(backend)
+    max_workers = max_workers or int(os.environ.get('TTS_WORKERS', '4'))
+    retries = retries or int(os.environ.get('TTS_RETRIES', '3'))
+
+    chunks = split_for_tts(text)
+    if not chunks:
+        raise TTSError("No text provided for text-to-speech")
+
+    output_ext = os.path.splitext(output_path)[1].lower()
+    same_format = output_ext == backend.extension
+    if len(chunks) == 1 and same_format:
+        return _synthesize_chunk(backend, chunks[0], lang, output_path, retries)
+
+    # Repeated transcripts are served straight from the cache
+    cache = get_tts_cache()
+    key = tts_cache_key(text, lang, backend.name, output_ext)
+    if cache is not None and cache.fetch(key, output_path, output_ext):
+        logger.info(f"♻️ TTS cache hit: {output_path}")
+        return output_path
+
+    work_dir = tempfile.mkdtemp(prefix='tts-')
+    try:
+        paths = [os.path.join(work_dir, f'chunk_{i:04d}{backend.extension}') for i in range(len(chunks))]
+        logger.info(f"🗣️ Synthesizing {len(chunks)} chunks with {backend.name} ({min(max_workers, len(chunks))} workers)")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(_synthesize_chunk, backend, chunk, lang, path, retries)
+                for chunk, path in zip(chunks, paths)
+            ]
+            paths = [future.result() for future in futures]
+
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        if len(paths) == 1:
+            run_ffmpeg(['-i', paths[0], output_path])
+        else:
+            concat_audio(paths, output_path, copy=same_format)
+        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            raise MediaBackendError(f"Output file is missing or empty: {output_path}")
+
+        if cache is not None:
+            try:
+                cache.store(key, output_path, output_ext)
+            except OSError as e:
+                logger.warning(f"⚠️ TTS cache write failed: {e}")
+        return output_path
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
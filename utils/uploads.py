@@ -0,0 +1,55 @@
+import os
+import hashlib
+import logging
+import tempfile
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+def copy_and_hash(stream, dst_file, chunk_size=CHUNK_SIZE):
+    """Copy a binary stream into an open file, hashing it on the way. Returns (sha256 hex, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        dst_file.write(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+def upload_extension(filename):
+    return os.path.splitext(secure_filename(filename or ''))[1].lower()
+
+def spool_upload(file_storage, upload_dir):
+    """
+    Write an upload to a uniquely named file, hashing it while it streams.
+    Returns (path, sha256 hex); the caller removes the file
+    """
+    fd, path = tempfile.mkstemp(dir=upload_dir, prefix='upload_', suffix=upload_extension(file_storage.filename))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            digest, size = copy_and_hash(file_storage.stream, f)
+    except Exception:
+        os.remove(path)
+        raise
+    logger.info(f"💾 Upload spooled: {path} ({size} bytes, sha256 {digest[:12]})")
+    return path, digest
+
+def save_upload_by_hash(file_storage, upload_dir):
+    """
+    Store an upload as upload_<sha256><ext>. Identical files map to the same
+    path, and concurrent uploads of the same name can no longer clobber each other.
+    Returns (path, sha256 hex)
+    """
+    temp_path, digest = spool_upload(file_storage, upload_dir)
+    path = os.path.join(upload_dir, f"upload_{digest}{upload_extension(file_storage.filename)}")
+    if os.path.exists(path):
+        os.remove(temp_path)
+        logger.info(f"♻️ Upload already stored: {path}")
+    else:
+        os.replace(temp_path, path)
+    return path, digest
@@ -1,12 +1,14 @@
 import os
 import logging
 import tempfile
-from utils.fixed_translation import translate_text
-from utils.audio_processing import speech_to_text, text_to_speech
+from utils.batch_translation import translate_batch_with_fallbacks
+from utils.audio_processing import text_to_speech
+from utils.dubbing import run_dubbing_pipeline, join_segment_audio
+from utils.speech_segmentation import stitch_transcript
 from utils.audio_video_utils import extract_audio_from_video, cleanup_temp_files
+from utils.media_backend import mux_audio
+from utils.subtitles import map_segments, estimate_cues, write_subtitles
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 def extract_audio_from_video_wrapper(video_path, output_path=None):
@@ -30,36 +32,24 @@ def extract_audio_from_video_wrapper(video_path, output_path=None):
                 f.write("dummy audio")
         return output_path
 
-def generate_subtitles(text, target_lang):
+def generate_subtitles(text, target_lang, segments=None, translations=None, fmt='srt'):
     """
-    Generate subtitle file (.srt) from translated text.
+    Generate subtitle file (.srt or .vtt) from translated text.
+    With segments (from transcription) and their translations the cues use the
+    real timestamps; otherwise timing is estimated from reading speed.
     """
     try:
         logger.info(f"Generating subtitles in {target_lang}")
         
-        # Create a temporary SRT file
-        temp_srt_path = tempfile.mktemp(suffix='.srt')
-        
-        # Split text into sentences for subtitles
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        
-        with open(temp_srt_path, 'w', encoding='utf-8') as f:
-            for i, sentence in enumerate(sentences):
-                if not sentence.strip():
-                    continue
-                    
-                # Calculate simple timings (4 seconds per subtitle)
-                start_time = i * 4
-                end_time = (i + 1) * 4
-                
-                # Format timings as HH:MM:SS,mmm
-                start_str = f"00:00:{start_time:02d},000"
-                end_str = f"00:00:{end_time:02d},000"
-                
-                # Write subtitle entry
-                f.write(f"{i+1}\n")
-                f.write(f"{start_str} --> {end_str}\n")
-                f.write(f"{sentence.strip()}\n\n")
+        # Create a temporary subtitle file
+        temp_srt_path = tempfile.mktemp(suffix=f'.{fmt}')
+        
+        if segments and translations:
+            cues = map_segments([s for s in segments if s['text']], translations)
+        else:
+            cues = estimate_cues(text)
+        
+        write_subtitles(cues, temp_srt_path, fmt)
         
         logger.info(f"Subtitles generated: {temp_srt_path}")
         return temp_srt_path
@@ -67,39 +57,16 @@ def generate_subtitles(text, target_lang):
     except Exception as e:
         logger.error(f"Error generating subtitles: {str(e)}")
         # Return a dummy subtitle file path
-        return tempfile.mktemp(suffix='.srt')
+        return tempfile.mktemp(suffix=f'.{fmt}')
 
 def create_dubbed_video(video_path, translated_audio_path, output_path):
     """
-    Create a new video with dubbed audio using moviepy
+    Create a new video with dubbed audio (video stream copied, audio re-encoded)
     """
     try:
         logger.info(f"Creating dubbed video: {video_path} + {translated_audio_path}")
         
-        from moviepy.editor import VideoFileClip, AudioFileClip
-        
-        # Load video and audio
-        video_clip = VideoFileClip(video_path)
-        audio_clip = AudioFileClip(translated_audio_path)
-        
-        # Set the audio of the video to the translated audio
-        final_clip = video_clip.set_audio(audio_clip)
-        
-        # Write the final video
-        final_clip.write_videofile(
-            output_path,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True,
-            verbose=False,
-            logger=None
-        )
-        
-        # Close clips to free memory
-        video_clip.close()
-        audio_clip.close()
-        final_clip.close()
+        mux_audio(video_path, translated_audio_path, output_path)
         
         logger.info(f"Dubbed video created: {output_path}")
         return output_path
@@ -120,26 +87,25 @@ def process_video(video_path, target_lang='hi'):
         
         temp_files = []
         
-        # Step 1: Extract audio from video
-        audio_path = extract_audio_from_video_wrapper(video_path)
-        temp_files.append(audio_path)
-        logger.info(f"Audio extracted: {audio_path}")
-        
-        # Step 2: Convert speech to English text
-        original_text = speech_to_text(audio_path)
+        # Steps 1-4: recognize, translate and synthesize segment by segment,
+        # with the stages overlapping instead of running one after another
+        chunk_prefix = os.path.splitext(tempfile.mktemp())[0]
+        segments, _ = run_dubbing_pipeline(video_path, target_lang, translate_batch_with_fallbacks, text_to_speech, chunk_prefix,
+                                           on_segment=lambda segment: temp_files.extend(segment['audio_paths'].values()))
+        original_text = stitch_transcript(segments)
         logger.info(f"Original English text: {original_text}")
         
-        # Step 3: Translate the text
-        translated_text = translate_text(original_text, target_lang)
+        spoken_segments = [s for s in segments if s['text']]
+        translations = [s['translations'].get(target_lang, '') for s in spoken_segments]
+        translated_text = ' '.join(text for text in translations if text)
         logger.info(f"Translated text: {translated_text}")
         
-        # Step 4: Generate translated audio
-        translated_audio_path = text_to_speech(translated_text, target_lang)
+        translated_audio_path = join_segment_audio(segments, target_lang, tempfile.mktemp(suffix='.mp3'))
         temp_files.append(translated_audio_path)
         logger.info(f"Translated audio: {translated_audio_path}")
         
         # Step 5: Generate subtitles
-        subtitles_path = generate_subtitles(translated_text, target_lang)
+        subtitles_path = generate_subtitles(translated_text, target_lang, spoken_segments, translations)
         temp_files.append(subtitles_path)
         logger.info(f"Subtitles generated: {subtitles_path}")
         
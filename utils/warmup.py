@@ -0,0 +1,53 @@
+import os
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Libraries the request paths import on first use. Importing them here, after
+# the server is up, keeps them off both the boot path and the first request
+WARMUP_MODULES = ('googletrans', 'speech_recognition', 'gtts')
+
+_stats_lock = threading.Lock()
+_stats = {'state': 'idle', 'modules': {}, 'seconds': None}
+
+def warmup_enabled():
+    """STARTUP_WARMUP=0 leaves every library to be imported by the first request that needs it"""
+    return os.environ.get('STARTUP_WARMUP', '1').lower() not in ('0', 'false', 'no')
+
+def _import_all(modules):
+    started = time.perf_counter()
+    for name in modules:
+        module_started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            result = round(time.perf_counter() - module_started, 3)
+        except Exception as e:
+            logger.warning(f"⚠️ Warmup could not import {name}: {e}")
+            result = f'failed: {e}'
+        with _stats_lock:
+            _stats['modules'][name] = result
+    with _stats_lock:
+        _stats['state'] = 'done'
+        _stats['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"✅ Warmup imported {len(modules)} modules in {_stats['seconds']}s")
+
+def warm_imports(modules=WARMUP_MODULES, background=True):
+    """Import the heavy libraries ahead of the first request (in a daemon thread by default)"""
+    if not warmup_enabled():
+        return
+    with _stats_lock:
+        if _stats['state'] != 'idle':
+            return
+        _stats['state'] = 'running'
+    if background:
+        threading.Thread(target=_import_all, args=(tuple(modules),), name='import-warmup', daemon=True).start()
+    else:
+        _import_all(tuple(modules))
+
+def get_warmup_stats():
+    """Warmup state and per-module import seconds for /api/health"""
+    with _stats_lock:
+        return {'state': _stats['state'], 'seconds': _stats['seconds'], 'modules': dict(_stats['modules'])}